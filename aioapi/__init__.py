@@ -1,5 +1,15 @@
 from .routedef import delete, get, head, options, patch, post, put, view
-from .typedefs import Body, PathParam, QueryParam
+from .typedefs import (
+    Body,
+    BodyLimit,
+    CookieParam,
+    Depends,
+    File,
+    Form,
+    HeaderParam,
+    PathParam,
+    QueryParam,
+)
 
 __all__ = (
     "delete",
@@ -11,6 +21,12 @@ __all__ = (
     "put",
     "view",
     "Body",
+    "BodyLimit",
+    "CookieParam",
+    "Depends",
+    "File",
+    "Form",
+    "HeaderParam",
     "PathParam",
     "QueryParam",
 )
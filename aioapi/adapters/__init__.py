@@ -0,0 +1,56 @@
+# `pydantic` v1 and v2 have very different APIs, so everything depending on a
+# particular version lives behind this package and the rest of `AIOAPI` works
+# with both of them.
+from pydantic import VERSION
+
+__all__ = (
+    "PYDANTIC_V2",
+    "dump_model",
+    "errors_of",
+    "field_types_of",
+    "form_error",
+    "json_default",
+    "json_dumper",
+    "json_error",
+    "json_validator",
+    "list_fields_of",
+    "model_validator",
+    "models_schemas",
+    "relocate_errors",
+    "validate_as",
+)
+
+PYDANTIC_V2 = not str(VERSION).startswith("1.")
+
+if PYDANTIC_V2:  # pragma: no cover
+    from aioapi.adapters.v2 import (
+        dump_model,
+        errors_of,
+        field_types_of,
+        form_error,
+        json_default,
+        json_dumper,
+        json_error,
+        json_validator,
+        list_fields_of,
+        model_validator,
+        models_schemas,
+        relocate_errors,
+        validate_as,
+    )
+else:
+    from aioapi.adapters.v1 import (  # type: ignore
+        dump_model,
+        errors_of,
+        field_types_of,
+        form_error,
+        json_default,
+        json_dumper,
+        json_error,
+        json_validator,
+        list_fields_of,
+        model_validator,
+        models_schemas,
+        relocate_errors,
+        validate_as,
+    )
@@ -0,0 +1,136 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from pydantic import BaseModel, ValidationError, parse_obj_as
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import JsonError, PydanticValueError
+from pydantic.fields import SHAPE_SINGLETON
+from pydantic.json import pydantic_encoder
+from pydantic.schema import (
+    get_flat_models_from_models,
+    get_model_name_map,
+    model_process_schema,
+)
+
+__all__ = (
+    "FormError",
+    "dump_model",
+    "errors_of",
+    "field_types_of",
+    "form_error",
+    "json_default",
+    "json_dumper",
+    "json_error",
+    "json_validator",
+    "list_fields_of",
+    "model_validator",
+    "models_schemas",
+    "relocate_errors",
+    "validate_as",
+)
+
+Loc = Tuple[Union[int, str], ...]
+
+dump_model = BaseModel.dict
+json_default = pydantic_encoder
+
+
+class FormError(PydanticValueError):
+    code = "form"
+    msg_template = "Invalid form"
+
+
+def model_validator(model: Type[BaseModel]) -> Callable[[Any], Any]:
+    return model.parse_obj
+
+
+def validate_as(type_: Any, value: Any) -> Any:
+    return parse_obj_as(type_, value)
+
+
+def json_validator(type_: Any) -> Optional[Callable[[bytes], Any]]:
+    # Bodies are decoded by a JSON backend and validated as any other data.
+    return None
+
+
+def json_dumper(type_: Any) -> Optional[Callable[[Any], bytes]]:
+    # Responses are dumped to Python objects and encoded by a JSON backend.
+    return None
+
+
+def json_error(loc: Loc, model: Any) -> ValidationError:
+    return ValidationError([ErrorWrapper(JsonError(), loc=loc)], model)
+
+
+def form_error(loc: Loc, model: Any) -> ValidationError:
+    return ValidationError([ErrorWrapper(FormError(), loc=loc)], model)
+
+
+def relocate_errors(
+    e: ValidationError, relocate: Callable[[Loc], Loc], model: Any
+) -> ValidationError:
+    return ValidationError(_relocate_errors(e.raw_errors, relocate), model)
+
+
+def _relocate_errors(
+    errors: Sequence[Any], relocate: Callable[[Loc], Loc]
+) -> List[Any]:
+    relocated: List[Any] = []
+    for error in errors:
+        if isinstance(error, ErrorWrapper):
+            relocated.append(ErrorWrapper(error.exc, loc=relocate(error.loc_tuple())))
+        else:
+            relocated.append(_relocate_errors(error, relocate))
+
+    return relocated
+
+
+def errors_of(e: ValidationError) -> List[Dict[str, Any]]:
+    return cast(List[Dict[str, Any]], e.errors())
+
+
+def list_fields_of(model: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(
+        field.alias
+        for field in model.__fields__.values()
+        if field.shape != SHAPE_SINGLETON
+    )
+
+
+def field_types_of(model: Type[BaseModel]) -> Tuple[Any, ...]:
+    # Types of sequence fields are types of their items.
+    return tuple(field.type_ for field in model.__fields__.values())
+
+
+def models_schemas(
+    models: Iterable[Type[BaseModel]], *, ref_prefix: str
+) -> Tuple[Dict[Type[BaseModel], Dict[str, Any]], Dict[str, Any]]:
+    # Models are processed together, so models sharing a name get unique names
+    # in definitions. Given models themselves are not a part of definitions.
+    models = tuple(models)
+    name_map = get_model_name_map(
+        get_flat_models_from_models(models).difference(models)
+    )
+
+    schemas = {}
+    definitions: Dict[str, Any] = {}
+    for model in models:
+        schema, model_definitions, _ = model_process_schema(
+            model, model_name_map=name_map, ref_prefix=ref_prefix
+        )
+        schemas[model] = schema
+        definitions.update(model_definitions)
+
+    return schemas, definitions
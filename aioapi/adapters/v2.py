@@ -0,0 +1,264 @@
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from pydantic import BaseModel, TypeAdapter, ValidationError  # type: ignore
+from pydantic.json_schema import models_json_schema  # type: ignore
+from pydantic_core import InitErrorDetails, PydanticCustomError, to_jsonable_python
+
+__all__ = (
+    "dump_model",
+    "errors_of",
+    "field_types_of",
+    "form_error",
+    "json_default",
+    "json_dumper",
+    "json_error",
+    "json_validator",
+    "list_fields_of",
+    "model_validator",
+    "models_schemas",
+    "relocate_errors",
+    "validate_as",
+)
+
+Loc = Tuple[Union[int, str], ...]
+
+dump_model = BaseModel.model_dump  # type: ignore
+json_default = to_jsonable_python
+
+_SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+# Errors are rendered the same way whatever version of `pydantic` is installed,
+# so native types of `pydantic` v2 errors are mapped to messages and types of
+# `pydantic` v1 ones. Messages are formatted with contexts of errors.
+_V1_ERRORS: Dict[str, Tuple[str, str]] = {
+    "missing": ("field required", "value_error.missing"),
+    "int_parsing": ("value is not a valid integer", "type_error.integer"),
+    "int_type": ("value is not a valid integer", "type_error.integer"),
+    "float_parsing": ("value is not a valid float", "type_error.float"),
+    "float_type": ("value is not a valid float", "type_error.float"),
+    "bool_parsing": ("value could not be parsed to a boolean", "type_error.bool"),
+    "bool_type": ("value could not be parsed to a boolean", "type_error.bool"),
+    "string_type": ("str type expected", "type_error.str"),
+    "uuid_parsing": ("value is not a valid uuid", "type_error.uuid"),
+    "uuid_type": ("value is not a valid uuid", "type_error.uuid"),
+    "list_type": ("value is not a valid list", "type_error.list"),
+    "dict_type": ("value is not a valid dict", "type_error.dict"),
+    "model_type": ("value is not a valid dict", "type_error.dict"),
+    "model_attributes_type": ("value is not a valid dict", "type_error.dict"),
+    "greater_than": (
+        "ensure this value is greater than {gt}",
+        "value_error.number.not_gt",
+    ),
+    "greater_than_equal": (
+        "ensure this value is greater than or equal to {ge}",
+        "value_error.number.not_ge",
+    ),
+    "less_than": ("ensure this value is less than {lt}", "value_error.number.not_lt"),
+    "less_than_equal": (
+        "ensure this value is less than or equal to {le}",
+        "value_error.number.not_le",
+    ),
+    "string_too_short": (
+        "ensure this value has at least {min_length} characters",
+        "value_error.any_str.min_length",
+    ),
+    "string_too_long": (
+        "ensure this value has at most {max_length} characters",
+        "value_error.any_str.max_length",
+    ),
+    "json_invalid": ("Invalid JSON", "value_error.json"),
+    "form_invalid": ("Invalid form", "value_error.form"),
+}
+# Errors raised by validators keep their own messages, `pydantic` v2 prefixes
+# them.
+_V1_PREFIXED_ERRORS = {
+    "value_error": "Value error, ",
+    "assertion_error": "Assertion failed, ",
+}
+
+
+def model_validator(model: Type[BaseModel]) -> Callable[[Any], Any]:
+    return model.model_validate  # type: ignore
+
+
+def _type_adapter(type_: Any) -> Any:
+    try:
+        return _cached_type_adapter(type_)
+    except TypeError:
+        # Some types, e.g. annotated by unhashable metadata, can't be cached.
+        return TypeAdapter(type_)
+
+
+@lru_cache(maxsize=None)
+def _cached_type_adapter(type_: Any) -> Any:
+    return TypeAdapter(type_)
+
+
+def validate_as(type_: Any, value: Any) -> Any:
+    return _type_adapter(type_).validate_python(value)
+
+
+def json_validator(type_: Any) -> Optional[Callable[[bytes], Any]]:
+    # `pydantic-core` decodes and validates raw bytes in one pass, so there is
+    # no intermediate Python representation of a body.
+    return _type_adapter(type_).validate_json
+
+
+def json_dumper(type_: Any) -> Optional[Callable[[Any], bytes]]:
+    # `pydantic-core` serializes objects straight to JSON bytes, so there is no
+    # intermediate Python representation of a response.
+    return _type_adapter(type_).dump_json
+
+
+def json_error(loc: Loc, model: Any) -> ValidationError:
+    return _validation_error("json_invalid", "Invalid JSON", loc, model)
+
+
+def form_error(loc: Loc, model: Any) -> ValidationError:
+    return _validation_error("form_invalid", "Invalid form", loc, model)
+
+
+def _validation_error(type_: str, msg: str, loc: Loc, model: Any) -> ValidationError:
+    return ValidationError.from_exception_data(  # type: ignore
+        _title_of(model),
+        [InitErrorDetails(type=PydanticCustomError(type_, msg), loc=loc, input=None)],
+    )
+
+
+def relocate_errors(
+    e: ValidationError, relocate: Callable[[Loc], Loc], model: Any
+) -> ValidationError:
+    # Errors can't be changed in place, so they are created again, with their
+    # types, messages and contexts as is.
+    return ValidationError.from_exception_data(  # type: ignore
+        _title_of(model),
+        [
+            InitErrorDetails(
+                type=PydanticCustomError(
+                    error["type"], _escape(error["msg"]), error.get("ctx")
+                ),
+                loc=relocate(error["loc"]),
+                input=error.get("input"),
+            )
+            for error in e.errors(include_url=False)  # type: ignore
+        ],
+    )
+
+
+def _escape(msg: str) -> str:
+    # Messages are templates formatted with contexts.
+    return msg.replace("{", "{{").replace("}", "}}")
+
+
+def _title_of(model: Any) -> str:
+    return getattr(model, "__name__", str(model))
+
+
+def errors_of(e: ValidationError) -> List[Dict[str, Any]]:
+    # Inputs and contexts may contain anything, even values which can't be
+    # serialized, only the fields rendered by `AIOAPI` are kept.
+    return [
+        {"loc": error["loc"], **_v1_error_of(error)}
+        for error in e.errors(include_url=False)  # type: ignore
+    ]
+
+
+def _v1_error_of(error: Mapping[str, Any]) -> Dict[str, str]:
+    type_ = error["type"]
+    msg = error["msg"]
+    if type_ in _V1_ERRORS:
+        template, v1_type = _V1_ERRORS[type_]
+        try:
+            return {"msg": template.format(**error.get("ctx", {})), "type": v1_type}
+        except (KeyError, IndexError):
+            return {"msg": msg, "type": v1_type}
+    if type_ in _V1_PREFIXED_ERRORS:
+        prefix = _V1_PREFIXED_ERRORS[type_]
+        return {
+            "msg": msg[len(prefix) :] if msg.startswith(prefix) else msg,
+            "type": type_,
+        }
+
+    if type_.startswith(("type_error", "value_error")):
+        # Custom errors, e.g. the one of `File`, are already of `pydantic` v1
+        # shape.
+        return {"msg": msg, "type": type_}
+
+    # Other errors keep their messages, their types are only split into type and
+    # value errors.
+    return {
+        "msg": msg,
+        "type": "type_error" if type_.endswith("_type") else "value_error",
+    }
+
+
+def list_fields_of(model: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(
+        field.alias or name
+        for name, field in model.model_fields.items()  # type: ignore
+        if _item_type_of(field.annotation) is not None
+    )
+
+
+def field_types_of(model: Type[BaseModel]) -> Tuple[Any, ...]:
+    # Types of sequence fields are types of their items.
+    types = []
+    for field in model.model_fields.values():  # type: ignore
+        item_type = _item_type_of(field.annotation)
+        types.append(field.annotation if item_type is None else item_type)
+
+    return tuple(types)
+
+
+def _item_type_of(type_: Any) -> Optional[Any]:
+    origin = get_origin(type_)
+    if origin is Union:
+        # Optional sequences are sequences too.
+        for arg in get_args(type_):
+            item_type = _item_type_of(arg)
+            if item_type is not None:
+                return item_type
+    elif origin in _SEQUENCE_TYPES:
+        args = get_args(type_)
+        return args[0] if args else Any
+
+    return None
+
+
+def models_schemas(
+    models: Iterable[Type[BaseModel]], *, ref_prefix: str
+) -> Tuple[Dict[Type[BaseModel], Dict[str, Any]], Dict[str, Any]]:
+    # Models are processed together, so models sharing a name get unique names
+    # in definitions. Given models themselves are not a part of definitions, their
+    # schemas are inlined.
+    models = tuple(models)
+    refs, top = models_json_schema(
+        [(model, "validation") for model in models],
+        ref_template=f"{ref_prefix}{{model}}",
+    )
+    definitions = dict(top.get("$defs", {}))
+
+    schemas = {}
+    for model in models:
+        ref = refs[(model, "validation")]["$ref"]
+        schemas[model] = definitions[ref[len(ref_prefix) :]]
+    for model in models:
+        ref = refs[(model, "validation")]["$ref"]
+        definitions.pop(ref[len(ref_prefix) :], None)
+
+    return schemas, definitions
@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+__all__ = ("LRUCache",)
+
+_Clock = Callable[[], float]
+_Entry = Tuple[Any, Optional[float], int]
+
+
+class LRUCache:
+    __slots__ = (
+        "_maxsize",
+        "_maxbytes",
+        "_ttl",
+        "_clock",
+        "_data",
+        "_nbytes",
+        "_hits",
+        "_misses",
+    )
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def maxbytes(self) -> Optional[int]:
+        return self._maxbytes
+
+    @property
+    def ttl(self) -> Optional[float]:
+        return self._ttl
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        maxbytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        clock: _Clock = time.monotonic,
+    ) -> None:
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} maxsize={self._maxsize} "
+            f"maxbytes={self._maxbytes} ttl={self._ttl} size={len(self._data)} "
+            f"nbytes={self._nbytes} hits={self._hits} misses={self._misses}>"
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            value, expires_at, _ = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return default
+
+        if expires_at is not None and expires_at <= self._clock():
+            self._pop(key)
+            self._misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self._hits += 1
+
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        nbytes: int = 0,
+        ttl: Optional[float] = None,
+    ) -> None:
+        # Values larger than the whole cache would just flush it.
+        if self._maxbytes is not None and nbytes > self._maxbytes:
+            return
+
+        ttl = ttl if ttl is not None else self._ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+
+        self._pop(key)
+        self._data[key] = (value, expires_at, nbytes)
+        self._nbytes += nbytes
+
+        while len(self._data) > self._maxsize or (
+            self._maxbytes is not None and self._nbytes > self._maxbytes
+        ):
+            _, (_, _, evicted_nbytes) = self._data.popitem(last=False)
+            self._nbytes -= evicted_nbytes
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._nbytes = 0
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._nbytes -= entry[2]
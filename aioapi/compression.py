@@ -0,0 +1,206 @@
+import asyncio
+import gzip
+import zlib
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from aiohttp import hdrs, web
+from aiohttp.web_response import ContentCoding
+
+from aioapi.cache import LRUCache
+from aioapi.options import HandlerOptions
+from aioapi.response_cache import Responder, etag_matches
+from aioapi.responses import JSONStreamResponse
+
+__all__ = (
+    "CODINGS",
+    "compile_response_compression",
+    "compress",
+    "negotiate_encoding",
+)
+
+COMPRESSED_CACHE_MAXSIZE = 128
+COMPRESSED_CACHE_MAXBYTES = 8 * 1024 * 1024
+
+_NEGOTIATION_CACHE_MAXSIZE = 64
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    # Bodies are compressed on every request, so levels favour speed over ratio.
+    # Gzip headers carry no timestamp, so the same body is always compressed to
+    # the same bytes.
+    "gzip": partial(gzip.compress, compresslevel=6, mtime=0),
+    "deflate": partial(zlib.compress, level=6),
+}
+
+# Streamed bodies are compressed by `aiohttp` itself, chunk by chunk.
+_STREAM_CODINGS = {
+    "gzip": ContentCoding.gzip,
+    "deflate": ContentCoding.deflate,
+}
+
+_COMPRESSIBLE_CONTENT_TYPES = frozenset(
+    (
+        "application/javascript",
+        "application/json",
+        "application/x-ndjson",
+        "application/xml",
+    )
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    _COMPRESSORS["br"] = partial(brotli.compress, quality=4)
+
+# Codings in order of preference, used when a client accepts several of them
+# equally.
+CODINGS = tuple(c for c in ("br", "gzip", "deflate") if c in _COMPRESSORS)
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    # May run in an executor, possibly in another process, so only a body and
+    # a name of a coding are passed in.
+    return _COMPRESSORS[coding](body)
+
+
+def negotiate_encoding(
+    accept_encoding: Optional[str], codings: Sequence[str]
+) -> Optional[str]:
+    # Picks the coding of `codings` with the highest quality, ties are broken by
+    # the order of `codings`. `None` stands for the identity coding.
+    if not accept_encoding:
+        return None
+
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            k, _, v = param.strip().partition("=")
+            if k.strip() == "q":
+                try:
+                    quality = float(v)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    default = qualities.get("*", 0.0)
+    best: Optional[str] = None
+    best_quality = 0.0
+    for coding in codings:
+        quality = qualities.get(coding, default)
+        if quality > best_quality:
+            best = coding
+            best_quality = quality
+
+    return best
+
+
+def compile_response_compression(
+    respond: Responder, *, options: HandlerOptions
+) -> Responder:
+    # Clients send only a handful of distinct `Accept-Encoding` headers, so
+    # negotiation results are memoized per route.
+    negotiated: Dict[Optional[str], Optional[str]] = {}
+    # Bodies of cacheable responses are the same as long as their tags are, so
+    # they are compressed once per coding.
+    compressed = LRUCache(
+        maxsize=COMPRESSED_CACHE_MAXSIZE, maxbytes=COMPRESSED_CACHE_MAXBYTES
+    )
+    min_size = options.compress_min_size
+    executor = options.offload_executor
+    offload_min_size = options.compress_offload_min_size
+
+    def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+        try:
+            return negotiated[accept_encoding]
+        except KeyError:
+            pass
+
+        coding = negotiate_encoding(accept_encoding, CODINGS)
+        if len(negotiated) < _NEGOTIATION_CACHE_MAXSIZE:
+            negotiated[accept_encoding] = coding
+        return coding
+
+    async def compress_body(body: bytes, coding: str) -> bytes:
+        if executor is not None and len(body) >= offload_min_size:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, compress, body, coding
+            )
+
+        return compress(body, coding)
+
+    async def respond_compressed(
+        request: web.Request, args: tuple, kwargs: Dict[str, Any]
+    ) -> web.StreamResponse:
+        resp = await respond(request, args, kwargs)
+        if resp.status == 304:
+            _add_vary(resp)
+            return resp
+        if resp.prepared or hdrs.CONTENT_ENCODING in resp.headers:
+            return resp
+
+        if isinstance(resp, JSONStreamResponse):
+            # Streams are compressed as they are written, unless the coding can't
+            # be streamed.
+            _add_vary(resp)
+            coding = negotiate(request.headers.get(hdrs.ACCEPT_ENCODING))
+            if coding in _STREAM_CODINGS:
+                resp.enable_compression(_STREAM_CODINGS[coding])
+            return resp
+
+        body = getattr(resp, "body", None)
+        if (
+            type(resp) is not web.Response
+            or not isinstance(body, bytes)
+            or len(body) < min_size
+            or not _is_compressible(resp.content_type)
+        ):
+            return resp
+
+        _add_vary(resp)
+        coding = negotiate(request.headers.get(hdrs.ACCEPT_ENCODING))
+        if coding is None:
+            return resp
+
+        etag = resp.headers.get(hdrs.ETAG)
+        if etag is None:
+            resp.body = await compress_body(body, coding)
+        else:
+            # Representations differ, so do their tags.
+            etag = f'{etag[:-1]}-{coding}"'
+            if etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), etag):
+                return web.Response(
+                    status=304,
+                    headers={hdrs.ETAG: etag, hdrs.VARY: resp.headers[hdrs.VARY]},
+                )
+
+            encoded = compressed.get(etag)
+            if encoded is None:
+                encoded = await compress_body(body, coding)
+                compressed.set(etag, encoded, nbytes=len(encoded))
+            resp.body = encoded
+            resp.headers[hdrs.ETAG] = etag
+
+        resp.headers[hdrs.CONTENT_ENCODING] = coding
+        return resp
+
+    return respond_compressed
+
+
+def _is_compressible(content_type: str) -> bool:
+    return (
+        content_type.startswith("text/")
+        or content_type in _COMPRESSIBLE_CONTENT_TYPES
+        or content_type.endswith(("+json", "+xml"))
+    )
+
+
+def _add_vary(resp: web.StreamResponse) -> None:
+    vary = resp.headers.get(hdrs.VARY)
+    if vary is None:
+        resp.headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+    elif hdrs.ACCEPT_ENCODING.lower() not in vary.lower():
+        resp.headers[hdrs.VARY] = f"{vary}, {hdrs.ACCEPT_ENCODING}"
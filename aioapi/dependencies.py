@@ -0,0 +1,315 @@
+import asyncio
+import inspect
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from weakref import finalize
+
+from aiohttp import web
+
+from aioapi.inspect.exceptions import (
+    HandlerDependencyCycleError,
+    HandlerDependencyScopeError,
+    HandlerParamUnknownTypeError,
+)
+from aioapi.inspect.inspector import param_of
+from aioapi.typedefs import Depends
+
+__all__ = (
+    "DependenciesResolver",
+    "close_dependencies",
+    "compile_dependencies",
+    "setup_dependencies",
+)
+
+DependenciesResolver = Callable[
+    [web.Request], Awaitable[Tuple[Dict[str, Any], List[Any]]]
+]
+
+_FROM_REQUEST = object()
+_FROM_APP = object()
+
+_SYNC = "sync"
+_GEN = "gen"
+_ASYNC = "async"
+_ASYNC_GEN = "async_gen"
+
+_AppValues = Dict[Callable[..., Any], "asyncio.Future[Any]"]
+
+# Applications are not hashable, so their state is kept by their ids and dropped
+# as soon as an application is garbage collected.
+_app_states: Dict[int, Tuple[_AppValues, List[Any]]] = {}
+
+
+class _Provider:
+    __slots__ = ("func", "kind", "scope", "args", "level")
+
+    def __init__(
+        self,
+        *,
+        func: Callable[..., Any],
+        scope: str,
+        args: Tuple[Tuple[str, Any], ...],
+        level: int,
+    ) -> None:
+        self.func = func
+        self.kind = _kind_of(func)
+        self.scope = scope
+        self.args = args
+        self.level = level
+
+    @property
+    def is_async(self) -> bool:
+        return self.scope == "app" or self.kind in (_ASYNC, _ASYNC_GEN)
+
+
+def setup_dependencies(app: web.Application) -> None:
+    # Application scoped providers which yield are finalized on application
+    # cleanup.
+    async def on_cleanup(app: web.Application) -> None:
+        _, cleanups = _app_states.pop(id(app), ({}, []))
+        await close_dependencies(cleanups)
+
+    app.on_cleanup.append(on_cleanup)
+
+
+def compile_dependencies(
+    mapping: Dict[str, Depends], *, handler_name: str
+) -> DependenciesResolver:
+    # Providers are resolved layer by layer, a provider lands on a layer right
+    # after the last of its own dependencies. Providers of the same layer don't
+    # depend on each other, so asynchronous ones are awaited concurrently. Every
+    # provider is called at most once per request, however many parameters
+    # depend on it.
+    providers: Dict[Callable[..., Any], _Provider] = {}
+    roots = tuple(
+        (k, _inspect_provider(depends, k, (), providers, handler_name))
+        for k, depends in mapping.items()
+    )
+
+    levels: Dict[int, List[_Provider]] = defaultdict(list)
+    for provider in providers.values():
+        levels[provider.level].append(provider)
+    layers = tuple(
+        (
+            tuple(p for p in levels[level] if not p.is_async),
+            tuple(p for p in levels[level] if p.is_async),
+        )
+        for level in sorted(levels)
+    )
+
+    async def resolve(request: web.Request) -> Tuple[Dict[str, Any], List[Any]]:
+        values: Dict[_Provider, Any] = {}
+        cleanups: List[Any] = []
+        try:
+            for sync_providers, async_providers in layers:
+                # Synchronous providers are called right away, without any
+                # round trips to the event loop.
+                for provider in sync_providers:
+                    values[provider] = _call_sync(
+                        provider, _build_kwargs(provider, request, values), cleanups
+                    )
+                if async_providers:
+                    await _resolve_async(async_providers, request, values, cleanups)
+        except BaseException:
+            await close_dependencies(cleanups)
+            raise
+
+        return {k: values[provider] for k, provider in roots}, cleanups
+
+    return resolve
+
+
+def _inspect_provider(
+    depends: Depends,
+    param: str,
+    path: Tuple[Any, ...],
+    providers: Dict[Callable[..., Any], _Provider],
+    handler_name: str,
+) -> _Provider:
+    func = depends.provider
+    provider = providers.get(func)
+    if provider is not None:
+        return provider
+    if func in path:
+        raise HandlerDependencyCycleError(handler=handler_name, param=param)
+
+    name = _name_of(func)
+    args: List[Tuple[str, Any]] = []
+    level = 0
+    for p in inspect.signature(func).parameters.values():
+        if isinstance(p.default, Depends):
+            dependency = _inspect_provider(
+                p.default, p.name, path + (func,), providers, handler_name
+            )
+            if depends.scope == "app" and dependency.scope == "request":
+                raise HandlerDependencyScopeError(handler=name, param=p.name)
+
+            args.append((p.name, dependency))
+            level = max(level, dependency.level + 1)
+        elif param_of(type_=p.annotation, is_=web.Application):
+            args.append((p.name, _FROM_APP))
+        elif param_of(type_=p.annotation, is_=web.Request):
+            if depends.scope == "app":
+                raise HandlerDependencyScopeError(handler=name, param=p.name)
+
+            args.append((p.name, _FROM_REQUEST))
+        else:
+            raise HandlerParamUnknownTypeError(handler=name, param=p.name)
+
+    provider = providers[func] = _Provider(
+        func=func, scope=depends.scope, args=tuple(args), level=level
+    )
+    return provider
+
+
+async def _resolve_async(
+    providers: Tuple[_Provider, ...],
+    request: web.Request,
+    values: Dict[_Provider, Any],
+    cleanups: List[Any],
+) -> None:
+    if len(providers) == 1:
+        provider = providers[0]
+        values[provider] = await _call_async(provider, request, values, cleanups)
+        return
+
+    # All providers are awaited even if some of them fail, so everything they
+    # have opened is finalized.
+    results = await asyncio.gather(
+        *(_call_async(provider, request, values, cleanups) for provider in providers),
+        return_exceptions=True,
+    )
+    for provider, result in zip(providers, results):
+        if isinstance(result, BaseException):
+            raise result
+        values[provider] = result
+
+
+async def close_dependencies(cleanups: List[Any]) -> None:
+    # Providers are finalized in reverse order, so a provider is finalized
+    # before providers it depends on.
+    error = None
+    for gen in reversed(cleanups):
+        try:
+            if inspect.isasyncgen(gen):
+                await gen.__anext__()
+            else:
+                next(gen)
+        except (StopIteration, StopAsyncIteration):
+            continue
+        except Exception as e:
+            error = error or e
+        else:
+            error = error or RuntimeError(f"Provider {gen!r} yielded twice")
+
+    cleanups.clear()
+    if error is not None:
+        raise error
+
+
+def _build_kwargs(
+    provider: _Provider, request: web.Request, values: Dict[_Provider, Any]
+) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {}
+    for k, source in provider.args:
+        if source is _FROM_REQUEST:
+            kwargs[k] = request
+        elif source is _FROM_APP:
+            kwargs[k] = request.app
+        else:
+            kwargs[k] = values[source]
+
+    return kwargs
+
+
+def _call_sync(provider: _Provider, kwargs: Dict[str, Any], cleanups: List[Any]) -> Any:
+    if provider.kind == _GEN:
+        gen = provider.func(**kwargs)
+        value = next(gen)
+        cleanups.append(gen)
+        return value
+
+    return provider.func(**kwargs)
+
+
+async def _call_async(
+    provider: _Provider,
+    request: web.Request,
+    values: Dict[_Provider, Any],
+    cleanups: List[Any],
+) -> Any:
+    kwargs = _build_kwargs(provider, request, values)
+    if provider.scope == "app":
+        return await _call_app_scoped(provider, request.app, kwargs)
+
+    return await _call(provider, kwargs, cleanups)
+
+
+async def _call(
+    provider: _Provider, kwargs: Dict[str, Any], cleanups: List[Any]
+) -> Any:
+    if provider.kind == _ASYNC:
+        return await provider.func(**kwargs)
+    if provider.kind == _ASYNC_GEN:
+        gen = provider.func(**kwargs)
+        value = await gen.__anext__()
+        cleanups.append(gen)
+        return value
+
+    return _call_sync(provider, kwargs, cleanups)
+
+
+async def _call_app_scoped(
+    provider: _Provider, app: web.Application, kwargs: Dict[str, Any]
+) -> Any:
+    futures, cleanups = _app_state(app)
+    future = futures.get(provider.func)
+    if future is not None:
+        if future.done():
+            return future.result()
+
+        # The value is being resolved by another request, it's shielded, so
+        # cancellation of this request doesn't affect others.
+        return await asyncio.shield(future)
+
+    future = futures[provider.func] = asyncio.get_event_loop().create_future()
+    try:
+        value = await _call(provider, kwargs, cleanups)
+    except BaseException as e:
+        # Failed providers are called again by the next request.
+        del futures[provider.func]
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            # Mark the exception as retrieved, there may be no other waiters.
+            future.exception()
+        raise
+
+    future.set_result(value)
+    return value
+
+
+def _app_state(app: web.Application) -> Tuple[_AppValues, List[Any]]:
+    key = id(app)
+    state = _app_states.get(key)
+    if state is None:
+        state = _app_states[key] = ({}, [])
+        finalize(app, _app_states.pop, key, None)
+
+    return state
+
+
+def _kind_of(func: Callable[..., Any]) -> str:
+    if inspect.isasyncgenfunction(func):
+        return _ASYNC_GEN
+    if inspect.iscoroutinefunction(func):
+        return _ASYNC
+    if inspect.isgeneratorfunction(func):
+        return _GEN
+
+    return _SYNC
+
+
+def _name_of(func: Callable[..., Any]) -> str:
+    return f"{func.__module__}.{getattr(func, '__qualname__', repr(func))}"
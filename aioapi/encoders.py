@@ -0,0 +1,55 @@
+from collections.abc import AsyncIterator
+from typing import Any, Callable, Optional
+
+from aiohttp import web
+
+from aioapi.adapters import dump_model, json_dumper
+from aioapi.inspect.inspector import is_model, param_of
+from aioapi.jsonlib import JSONBackend
+from aioapi.responses import JSONStreamResponse
+
+__all__ = ("ResponseEncoder", "compile_response_encoder")
+
+ResponseEncoder = Callable[[Any], web.StreamResponse]
+
+
+def compile_response_encoder(
+    type_: Any, backend: JSONBackend, *, native: bool = True
+) -> Optional[ResponseEncoder]:
+    if type_ is None:
+        return None
+
+    dumps = backend.dumps
+
+    if param_of(type_=type_, is_=AsyncIterator):
+
+        def encode_stream(obj: Any) -> web.StreamResponse:
+            return JSONStreamResponse(obj, dumps=dumps)
+
+        return encode_stream
+
+    # Routes with an explicit JSON backend keep encoding responses by it.
+    dump_json = json_dumper(type_) if native else None
+    if dump_json is not None:
+
+        def encode_json(obj: Any) -> web.StreamResponse:
+            return web.Response(body=dump_json(obj), content_type="application/json")
+
+        return encode_json
+
+    if is_model(type_):
+
+        def encode_model(obj: Any) -> web.StreamResponse:
+            return web.Response(
+                body=dumps(dump_model(obj)), content_type="application/json"
+            )
+
+        return encode_model
+
+    def encode_models(obj: Any) -> web.StreamResponse:
+        return web.Response(
+            body=dumps([dump_model(item) for item in obj]),
+            content_type="application/json",
+        )
+
+    return encode_models
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type, Union
+
+from pydantic import ValidationError, create_model
+
+from aioapi.adapters import (
+    errors_of,
+    json_error,
+    json_validator,
+    list_fields_of,
+    model_validator,
+    relocate_errors,
+    validate_as,
+)
+from aioapi.inspect.inspector import (
+    create_flat_request_model,
+    create_request_model,
+    is_model,
+)
+
+__all__ = (
+    "ValidationEngine",
+    "ValidationEngineUnknownError",
+    "get_engine",
+    "register_engine",
+    "set_default_engine",
+)
+
+Loc = Tuple[Union[int, str], ...]
+
+
+@dataclass(frozen=True)
+class ValidationEngine:
+    name: str
+    # Builds a request type out of handler parameters, see
+    # `aioapi.inspect.inspector.create_request_model`.
+    create_request_type: Callable[..., Optional[Any]]
+    # The same for the flat layout, `None` if an engine has no such layout.
+    create_flat_request_type: Optional[Callable[..., Optional[Any]]]
+    # Returns a function validating decoded data against a type.
+    validator: Callable[[Any], Callable[[Any], Any]]
+    # Returns a function decoding and validating raw JSON at once, or `None` if
+    # bodies are decoded by a JSON backend first.
+    json_validator: Callable[[Any], Optional[Callable[[bytes], Any]]]
+    # Returns names of parameters declared as sequences, given a mapping of
+    # parameter names to `(type, default)` pairs.
+    list_fields_of: Callable[[Dict[str, Any]], FrozenSet[str]]
+    # Raised by validators, both must be subclasses of `ValueError`.
+    error_type: Type[Exception]
+    json_error: Callable[[Loc, Any], Exception]
+    relocate_errors: Callable[[Any, Callable[[Loc], Loc], Any], Exception]
+    # Renders errors as `{"loc": ..., "msg": ..., "type": ...}` dictionaries.
+    errors_of: Callable[[Any], List[Dict[str, Any]]]
+
+
+class ValidationEngineUnknownError(Exception):
+    __slots__ = ("_name",)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __init__(self, *, name: str) -> None:
+        self._name = name
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self._name}>"
+
+
+_engines: Dict[str, ValidationEngine] = {}
+_default_engine_name = "pydantic"
+
+
+def register_engine(engine: ValidationEngine) -> None:
+    _engines[engine.name] = engine
+
+
+def set_default_engine(name: str) -> None:
+    global _default_engine_name
+
+    get_engine(name)
+    _default_engine_name = name
+
+
+def get_engine(name: Optional[str] = None) -> ValidationEngine:
+    name = name or _default_engine_name
+    try:
+        return _engines[name]
+    except KeyError:
+        raise ValidationEngineUnknownError(name=name) from None
+
+
+def _pydantic_validator(type_: Any) -> Callable[[Any], Any]:
+    if is_model(type_):
+        return model_validator(type_)
+
+    return partial(validate_as, type_)
+
+
+def _pydantic_list_fields_of(mapping: Dict[str, Any]) -> FrozenSet[str]:
+    return list_fields_of(create_model("Fields", **mapping))  # type: ignore
+
+
+register_engine(
+    ValidationEngine(
+        name="pydantic",
+        create_request_type=create_request_model,
+        create_flat_request_type=create_flat_request_model,
+        validator=_pydantic_validator,
+        json_validator=json_validator,
+        list_fields_of=_pydantic_list_fields_of,
+        error_type=ValidationError,
+        json_error=json_error,
+        relocate_errors=relocate_errors,
+        errors_of=errors_of,
+    )
+)
+
+# Unlike JSON backends, engines validate data differently, so `msgspec` is never
+# picked by default, routes opt in with `validation_engine="msgspec"`.
+try:
+    from aioapi.engines import structs
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    register_engine(
+        ValidationEngine(
+            name="msgspec",
+            create_request_type=structs.create_request_type,
+            create_flat_request_type=None,
+            validator=structs.validator,
+            json_validator=structs.json_validator,
+            list_fields_of=structs.list_fields_of,
+            error_type=structs.StructValidationError,
+            json_error=structs.json_error,
+            relocate_errors=structs.relocate_errors,
+            errors_of=structs.errors_of,
+        )
+    )
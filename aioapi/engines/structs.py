@@ -0,0 +1,178 @@
+import re
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import msgspec
+
+from aioapi.inspect.inspector import REQUIRED
+
+__all__ = (
+    "StructValidationError",
+    "create_request_type",
+    "errors_of",
+    "json_error",
+    "json_validator",
+    "list_fields_of",
+    "relocate_errors",
+    "validator",
+)
+
+Loc = Tuple[Union[int, str], ...]
+
+_Mapping = Dict[str, Any]
+
+# `msgspec` reports the first error only, as a message like
+# "Expected `int`, got `str` - at `$.path.user_id`".
+_ERROR_PATH_SEPARATOR = " - at `$"
+_ERROR_PATH_PART_RE = re.compile(r"\.([^.\[]+)|\[([^\]]*)\]")
+_MISSING_FIELD_RE = re.compile(r"^Object missing required field `(.+)`$")
+
+_SEQUENCE_TYPES = (list, tuple, set, frozenset)
+
+
+class StructValidationError(ValueError):
+    __slots__ = ("_errors",)
+
+    def __init__(self, errors: List[Dict[str, Any]]) -> None:
+        super().__init__(errors)
+        self._errors = errors
+
+    def errors(self) -> List[Dict[str, Any]]:
+        return self._errors
+
+
+def create_request_type(
+    body_pair: Optional[Tuple[str, Any]],
+    path_mapping: _Mapping,
+    query_mapping: _Mapping,
+    *,
+    header_mapping: Optional[_Mapping] = None,
+    cookie_mapping: Optional[_Mapping] = None,
+) -> Optional[Any]:
+    # The same nested layout as the one of `pydantic` models, so errors have the
+    # same locations whatever engine a route uses.
+    fields: List[Tuple[Any, ...]] = []
+    if body_pair:
+        _, (body_type, default) = body_pair
+        fields.append(_field("body", body_type, default))
+
+    for k, mapping in (
+        ("path", path_mapping),
+        ("query", query_mapping),
+        ("header", header_mapping),
+        ("cookie", cookie_mapping),
+    ):
+        if not mapping:
+            continue
+
+        fields.append(
+            (
+                k,
+                msgspec.defstruct(
+                    k.title(),
+                    [_field(name, *pair) for name, pair in mapping.items()],
+                    kw_only=True,
+                ),
+            )
+        )
+
+    return msgspec.defstruct("Request", fields, kw_only=True) if fields else None
+
+
+def _field(name: str, type_: Any, default: Any) -> Tuple[Any, ...]:
+    return (name, type_) if default is REQUIRED else (name, type_, default)
+
+
+def validator(type_: Any) -> Callable[[Any], Any]:
+    # Path, query, header and cookie values are strings, so they are converted
+    # leniently, e.g. `"42"` is a valid `int`, the same way `pydantic` does.
+    convert = partial(msgspec.convert, type=type_, strict=False)
+
+    def validate(value: Any) -> Any:
+        try:
+            return convert(value)
+        except msgspec.ValidationError as e:
+            raise StructValidationError([_error_of(str(e))]) from e
+
+    return validate
+
+
+def json_validator(type_: Any) -> Optional[Callable[[bytes], Any]]:
+    # Bodies are decoded straight into structs, malformed bodies raise
+    # `msgspec.DecodeError`, which is a `ValueError` too.
+    decode = msgspec.json.Decoder(type_, strict=False).decode
+
+    def validate_json(data: bytes) -> Any:
+        try:
+            return decode(data)
+        except msgspec.ValidationError as e:
+            raise StructValidationError([_error_of(str(e))]) from e
+
+    return validate_json
+
+
+def json_error(loc: Loc, model: Any) -> StructValidationError:
+    return StructValidationError(
+        [{"loc": loc, "msg": "Invalid JSON", "type": "value_error.json"}]
+    )
+
+
+def relocate_errors(
+    e: StructValidationError, relocate: Callable[[Loc], Loc], model: Any
+) -> StructValidationError:
+    return StructValidationError(
+        [{**error, "loc": relocate(error["loc"])} for error in e.errors()]
+    )
+
+
+def errors_of(e: StructValidationError) -> List[Dict[str, Any]]:
+    return e.errors()
+
+
+def _error_of(message: str) -> Dict[str, Any]:
+    msg, separator, path = message.partition(_ERROR_PATH_SEPARATOR)
+    loc: Loc = ()
+    if separator:
+        loc = tuple(
+            int(index) if index.isdigit() else index or key
+            for key, index in _ERROR_PATH_PART_RE.findall(path.rstrip("`"))
+        )
+
+    # `msgspec` reports missing fields at their parents, while `pydantic` reports
+    # them at the fields themselves, so errors look the same for both engines.
+    match = _MISSING_FIELD_RE.match(msg)
+    if match is not None:
+        return {
+            "loc": loc + (match.group(1),),
+            "msg": "field required",
+            "type": "value_error.missing",
+        }
+
+    return {"loc": loc, "msg": msg, "type": "value_error"}
+
+
+def list_fields_of(mapping: _Mapping) -> FrozenSet[str]:
+    return frozenset(k for k, (type_, _) in mapping.items() if _is_sequence(type_))
+
+
+def _is_sequence(type_: Any) -> bool:
+    # `Annotated` types keep the annotated type in `__origin__`.
+    if getattr(type_, "__metadata__", None) is not None:
+        return _is_sequence(type_.__origin__)
+
+    origin = get_origin(type_)
+    if origin is Union:
+        return any(_is_sequence(arg) for arg in get_args(type_))
+
+    return origin in _SEQUENCE_TYPES
@@ -1,16 +1,31 @@
+from typing import Any, Callable, Dict, List
+
 from aiohttp import web
-from pydantic import ValidationError
+
+from aioapi.adapters import errors_of as pydantic_errors_of
 
 __all__ = ("HTTPBadRequest",)
 
 
 class HTTPBadRequest(web.HTTPBadRequest):
-    __slots__ = ("_validation_error",)
+    __slots__ = ("_validation_error", "_errors_of")
 
     @property
-    def validation_error(self) -> ValidationError:
+    def validation_error(self) -> Exception:
         return self._validation_error
 
-    def __init__(self, *, validation_error: ValidationError, **kwargs) -> None:
+    def __init__(
+        self,
+        *,
+        validation_error: Exception,
+        errors_of: Callable[[Any], List[Dict[str, Any]]] = pydantic_errors_of,
+        **kwargs,
+    ) -> None:
+        # Errors of validation engines other than `pydantic` come with a function
+        # rendering them, see `aioapi.engines.ValidationEngine`.
         self._validation_error = validation_error
+        self._errors_of = errors_of
         super().__init__(**kwargs)
+
+    def errors(self) -> List[Dict[str, Any]]:
+        return self._errors_of(self._validation_error)
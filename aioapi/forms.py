@@ -0,0 +1,152 @@
+import tempfile
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+from aiohttp import BodyPartReader, web
+
+from aioapi.typedefs import File
+
+__all__ = (
+    "FILE_CHUNK_SIZE",
+    "FILE_SPOOL_MAX_SIZE",
+    "FORM_CONTENT_TYPES",
+    "close_files",
+    "read_form",
+)
+
+FILE_CHUNK_SIZE = 64 * 1024
+# Files up to this size are kept in memory, larger ones are rolled over to disk.
+FILE_SPOOL_MAX_SIZE = 1024 * 1024
+
+FORM_CONTENT_TYPES = frozenset(
+    ("multipart/form-data", "application/x-www-form-urlencoded")
+)
+
+_SizeChecker = Callable[[int], None]
+
+
+async def read_form(
+    request: web.Request,
+    *,
+    list_fields: FrozenSet[str],
+    check_size: Optional[_SizeChecker] = None,
+) -> Dict[str, Any]:
+    # Raises `ValueError` on malformed forms. Repeated fields are collected only
+    # for `list_fields`, other fields get the first value, just like
+    # `MultiDict.getone` does.
+    content_type = request.content_type
+    if content_type == "multipart/form-data":
+        values = await _read_multipart(request, check_size)
+    elif content_type == "application/x-www-form-urlencoded":
+        values = await _read_urlencoded(request, check_size)
+    else:
+        raise web.HTTPUnsupportedMediaType()
+
+    return {
+        k: field_values if k in list_fields else field_values[0]
+        for k, field_values in values.items()
+    }
+
+
+async def _read_urlencoded(
+    request: web.Request, check_size: Optional[_SizeChecker]
+) -> Dict[str, List[Any]]:
+    # Such forms can't contain files. Without a limit they are read by `aiohttp`
+    # itself, which limits bodies by `client_max_size`, otherwise they are read
+    # chunk by chunk, so chunked bodies are limited the same way multipart ones
+    # are.
+    body: Union[bytes, bytearray]
+    if check_size is None:
+        body = await request.read()
+    else:
+        body = bytearray()
+        async for chunk in request.content.iter_any():
+            body += chunk
+            check_size(len(body))
+
+    charset = request.charset or "utf-8"
+    values: Dict[str, List[Any]] = {}
+    for k, v in parse_qsl(
+        body.rstrip().decode(charset), keep_blank_values=True, encoding=charset
+    ):
+        values.setdefault(k, []).append(v)
+
+    return values
+
+
+async def _read_multipart(
+    request: web.Request, check_size: Optional[_SizeChecker]
+) -> Dict[str, List[Any]]:
+    values: Dict[str, List[Any]] = {}
+    size = 0
+
+    reader = await request.multipart()
+    try:
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            if not isinstance(part, BodyPartReader) or part.name is None:
+                # Nested and unnamed parts can't be mapped to form fields.
+                await part.release()
+                continue
+
+            value: Any
+            if part.filename is None:
+                data = await part.read(decode=True)
+                size += len(data)
+                if check_size is not None:
+                    check_size(size)
+                value = data.decode(part.get_charset(default="utf-8"))
+            else:
+                value, size = await _spool_file(part, size, check_size)
+
+            values.setdefault(part.name, []).append(value)
+    except BaseException:
+        # Files spooled before a malformed or too large part are never seen by
+        # a handler.
+        close_files(values)
+        raise
+
+    return values
+
+
+async def _spool_file(
+    part: BodyPartReader, size: int, check_size: Optional[_SizeChecker]
+) -> Tuple[File, int]:
+    file = tempfile.SpooledTemporaryFile(max_size=FILE_SPOOL_MAX_SIZE)
+    file_size = 0
+    try:
+        while True:
+            chunk = await part.read_chunk(FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            file_size += len(chunk)
+            if check_size is not None:
+                check_size(size + file_size)
+            file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+
+    file.seek(0)
+    uploaded = File(
+        file=file,  # type: ignore
+        size=file_size,
+        filename=part.filename,
+        content_type=part.headers.get("Content-Type"),
+    )
+    return uploaded, size + file_size
+
+
+def close_files(form: Any) -> None:
+    # Accepts both validated forms and raw values read by `read_form`.
+    values = form if isinstance(form, dict) else getattr(form, "__dict__", {})
+    for value in values.values():
+        if isinstance(value, File):
+            value.close()
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, File):
+                    item.close()
@@ -1,192 +1,1154 @@
-import json
+import asyncio
+import copy
+import datetime
+import decimal
+import enum
+import inspect
+import operator
+import time
+import uuid
 from dataclasses import dataclass
-from typing import Awaitable, Callable, Dict, Iterator, Tuple, Union, cast
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+from weakref import WeakKeyDictionary
 
 from aiohttp import hdrs, web
 from aiohttp.abc import AbstractView
 from aiohttp.web_routedef import _HandlerType, _SimpleHandler
+from multidict import istr
 from pydantic import BaseModel, ValidationError
 
+from aioapi.adapters import (
+    form_error,
+    json_error,
+    list_fields_of,
+    model_validator,
+    relocate_errors,
+)
+from aioapi.cache import LRUCache
+from aioapi.compression import compile_response_compression
+from aioapi.dependencies import close_dependencies, compile_dependencies
+from aioapi.encoders import compile_response_encoder
+from aioapi.engines import ValidationEngine, get_engine
 from aioapi.exceptions import HTTPBadRequest
+from aioapi.forms import close_files, read_form
 from aioapi.inspect.entities import HandlerMeta
-from aioapi.inspect.inspector import HandlerInspector, param_of
-from aioapi.typedefs import Body, PathParam, QueryParam
+from aioapi.inspect.inspector import (
+    HandlerInspector,
+    flat_field_name,
+    header_name,
+    param_of,
+    split_flat_field_name,
+)
+from aioapi.jsonlib import JSONBackend, get_backend
+from aioapi.metrics import PHASE_TIMINGS_KEY, MetricsSink, PhaseTimings
+from aioapi.offload import MALFORMED, decode_and_validate
+from aioapi.options import HandlerOptions, HandlerOptionsConflictError
+from aioapi.response_cache import Responder, compile_response_cache
+from aioapi.responses import JSONStreamResponse
+from aioapi.streams import NDJSON_CONTENT_TYPES, iter_json_array, iter_ndjson
+from aioapi.typedefs import (
+    Body,
+    CookieParam,
+    Form,
+    HeaderParam,
+    PathParam,
+    QueryParam,
+)
 
 __all__ = ("wraps", "wraps_simple", "wraps_method")
 
 _HandlerCallable = Callable[..., Awaitable]
-_HandlerParams = Union[Body, PathParam, QueryParam, web.Application, web.Request]
+_HandlerParams = Union[
+    Body,
+    CookieParam,
+    Form,
+    HeaderParam,
+    PathParam,
+    QueryParam,
+    web.Application,
+    web.Request,
+]
 _HandlerKwargs = Dict[str, _HandlerParams]
 
-_GenRawDataResult = Tuple[str, dict]
-_GenRawDataCallable = Callable[[web.Request], Awaitable[_GenRawDataResult]]
+_Getter = Callable[[web.Request], _HandlerParams]
+_Extractor = Callable[[web.Request], Awaitable[_HandlerKwargs]]
+_BodyReader = Callable[[web.Request], Awaitable[Any]]
+_Pipeline = Callable[[web.Request, tuple], Awaitable[web.StreamResponse]]
+_Validator = Callable[[web.Request, Any], Any]
+_Assigner = Callable[[Any, _HandlerKwargs], None]
+_InspectedMetas = Dict[Tuple[Optional[str], bool, str], HandlerMeta]
 
-_GenKwargsResult = Iterator[Tuple[str, _HandlerParams]]
-_GenKwargsCallable = Callable[[HandlerMeta, BaseModel], _GenKwargsResult]
+DEFAULT_OPTIONS = HandlerOptions()
 
+_NO_PHASE_TIMINGS = (0.0, 0.0, 0.0, None)
 
-@dataclass(frozen=True)
-class DataGenerators:
-    raw: Tuple[_GenRawDataCallable, ...]
-    kwargs: Tuple[_GenKwargsCallable, ...]
+VIEW_DISPATCH_ATTR = "_aioapi_dispatch"
+VIEW_OPTIONS_ATTR = "_aioapi_options"
+
+_inspected: "WeakKeyDictionary[Any, _InspectedMetas]" = WeakKeyDictionary()
+
+# Cached validated values of these types are shared by requests as is, values of
+# other types are copied, so handlers changing them don't change the cache.
+_IMMUTABLE_TYPES = (
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    tuple,
+    frozenset,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    decimal.Decimal,
+    enum.Enum,
+    uuid.UUID,
+)
 
 
-def wraps(handler: _HandlerType) -> _HandlerType:
+def wraps(
+    handler: _HandlerType, *, options: HandlerOptions = DEFAULT_OPTIONS
+) -> _HandlerType:
     try:
         issubclass(handler, AbstractView)  # type: ignore
     except TypeError:
-        return wraps_simple(cast(_SimpleHandler, handler))
+        return wraps_simple(cast(_SimpleHandler, handler), options=options)
 
-    for method in hdrs.METH_ALL:
-        method = method.lower()
+    view = cast(Type[AbstractView], handler)
+    view_name = f"{view.__module__}.{view.__name__}"
+    # Views are wrapped in place, so a view served on multiple paths is wrapped
+    # only once and all its routes must share the same options.
+    if VIEW_DISPATCH_ATTR in vars(view):
+        if vars(view)[VIEW_OPTIONS_ATTR] != options:
+            raise HandlerOptionsConflictError(handler=view_name)
+        return handler
 
-        handler_callable = getattr(handler, method, None)
+    dispatch: Dict[str, _HandlerCallable] = {}
+    for method in hdrs.METH_ALL:
+        handler_callable = getattr(view, method.lower(), None)
         if handler_callable is None:
             continue
 
-        handler_name = (
-            f"{handler.__module__}.{handler.__name__}"  # type: ignore
-            f".{handler_callable.__name__}"
+        # Methods inherited from another wrapped view are already wrapped, with
+        # options of that view.
+        if _is_wrapped(handler_callable):
+            owner = next(c for c in view.__mro__ if method.lower() in vars(c))
+            if vars(owner).get(VIEW_OPTIONS_ATTR, options) != options:
+                raise HandlerOptionsConflictError(handler=view_name)
+        else:
+            handler_name = f"{view_name}.{handler_callable.__name__}"
+            handler_callable = wraps_method(
+                handler=handler_callable, handler_name=handler_name, options=options
+            )
+            setattr(view, method.lower(), handler_callable)
+
+        dispatch[method] = handler_callable
+
+    setattr(view, VIEW_DISPATCH_ATTR, dispatch)
+    setattr(view, VIEW_OPTIONS_ATTR, options)
+    # Views with custom dispatching are left as is.
+    iter_owner = next((c for c in view.__mro__ if "_iter" in vars(c)), None)
+    if iter_owner is web.View or VIEW_DISPATCH_ATTR in vars(iter_owner or object):
+        view._iter = _compile_view_dispatcher(view, dispatch)  # type: ignore
+
+    return handler
+
+
+def _is_wrapped(handler: Callable) -> bool:
+    return hasattr(handler, "handler_meta") or hasattr(handler, "warmup")
+
+
+def _compile_view_dispatcher(
+    view: Type[AbstractView], dispatch: Dict[str, _HandlerCallable]
+) -> Callable[[web.View], Awaitable[web.StreamResponse]]:
+    # Replaces `web.View._iter`, which looks methods up using `getattr` on every
+    # request and collects allowed methods on every `405 Method Not Allowed`.
+    dispatch = dict(dispatch)
+    if hdrs.METH_OPTIONS not in dispatch:
+        allow = ",".join(sorted({*dispatch, hdrs.METH_OPTIONS}))
+
+        async def options(self: web.View) -> web.StreamResponse:
+            return web.Response(headers={hdrs.ALLOW: allow})
+
+        dispatch[hdrs.METH_OPTIONS] = options
+
+    allowed_methods = frozenset(dispatch)
+    view_iter = web.View._iter
+
+    async def dispatch_method(self: web.View) -> web.StreamResponse:
+        if type(self) is not view:
+            # Subclasses may override methods, they are dispatched as usual.
+            return await view_iter(self)
+
+        method = dispatch.get(self.request.method)
+        if method is None:
+            raise web.HTTPMethodNotAllowed(self.request.method, allowed_methods)
+
+        return await method(self)
+
+    return dispatch_method
+
+
+def wraps_simple(
+    handler: _SimpleHandler, *, options: HandlerOptions = DEFAULT_OPTIONS
+) -> _SimpleHandler:
+    if options.lazy:
+        return cast(
+            _SimpleHandler,
+            _wraps_lazily(partial(_wraps_simple, handler, options=options)),
         )
-        setattr(
-            handler,
-            method,
-            wraps_method(handler=handler_callable, handler_name=handler_name),
+
+    return _wraps_simple(handler, options=options)
+
+
+def wraps_method(
+    *,
+    handler: _HandlerCallable,
+    handler_name: str,
+    options: HandlerOptions = DEFAULT_OPTIONS,
+) -> _HandlerCallable:
+    if options.lazy:
+        return _wraps_lazily(
+            partial(
+                _wraps_method,
+                handler=handler,
+                handler_name=handler_name,
+                options=options,
+            )
         )
 
-    return handler
+    return _wraps_method(handler=handler, handler_name=handler_name, options=options)
+
+
+def _wraps_lazily(compile_handler: Callable[[], _HandlerCallable]) -> _HandlerCallable:
+    # Inspection of a handler and creation of its models is postponed until the
+    # first request, or until `aioapi.warmup.warmup_handlers` is called.
+    compiled: Optional[_HandlerCallable] = None
+
+    def warmup() -> _HandlerCallable:
+        nonlocal compiled
+        if compiled is None:
+            compiled = compile_handler()
+
+        return compiled
 
+    async def wrapped(*args: Any) -> web.StreamResponse:
+        return await (compiled or warmup())(*args)
 
-def wraps_simple(handler: _SimpleHandler) -> _SimpleHandler:
+    wrapped.warmup = warmup  # type: ignore
+    return wrapped
+
+
+def _wraps_simple(
+    handler: _SimpleHandler, *, options: HandlerOptions
+) -> _SimpleHandler:
+    started_at = time.perf_counter()
     handler_casted = cast(_HandlerCallable, handler)
-    handler_meta = HandlerInspector(handler=handler_casted)()
-    data_generators = _get_data_generators(handler_meta)
+    handler_meta = _inspect(handler_casted, options=options)
+    validation_cache = _create_validation_cache(handler_meta, options=options)
+    extract_kwargs = _compile_extractor(
+        handler_meta, options=options, validation_cache=validation_cache
+    )
+    respond = _compile_responder(handler_casted, handler_meta, options=options)
+    handle = _compile_pipeline(handler_meta, extract_kwargs, respond)
 
     async def wrapped(request: web.Request) -> web.StreamResponse:
-        kwargs = await _handle_kwargs(handler_meta, data_generators, request)
-        resp = await handler_casted(**kwargs)
-
-        return resp
+        return await handle(request, ())
 
+    _annotate(wrapped, handler_meta, validation_cache, started_at)
     return wrapped
 
 
-def wraps_method(*, handler: _HandlerCallable, handler_name: str) -> _HandlerCallable:
-    handler_meta = HandlerInspector(handler=handler, handler_name=handler_name)()
-    data_generators = _get_data_generators(handler_meta)
+def _wraps_method(
+    *, handler: _HandlerCallable, handler_name: str, options: HandlerOptions
+) -> _HandlerCallable:
+    started_at = time.perf_counter()
+    handler_meta = _inspect(handler, handler_name=handler_name, options=options)
+    validation_cache = _create_validation_cache(handler_meta, options=options)
+    extract_kwargs = _compile_extractor(
+        handler_meta, options=options, validation_cache=validation_cache
+    )
+    respond = _compile_responder(handler, handler_meta, options=options)
+    handle = _compile_pipeline(handler_meta, extract_kwargs, respond)
 
     async def wrapped(self) -> web.StreamResponse:
-        kwargs = await _handle_kwargs(handler_meta, data_generators, self.request)
-        resp = await handler(self, **kwargs)
+        return await handle(self.request, (self,))
+
+    _annotate(wrapped, handler_meta, validation_cache, started_at)
+    return wrapped
+
+
+def _inspect(
+    handler: _HandlerCallable,
+    *,
+    handler_name: Optional[str] = None,
+    options: HandlerOptions,
+) -> HandlerMeta:
+    # The same handler is often registered several times, e.g. a view served on
+    # multiple paths, there is no need to inspect it and create its models again.
+    engine = get_engine(options.validation_engine)
+    metas = _inspected.setdefault(handler, {})
+    key = (handler_name, options.flat_validation, engine.name)
+    try:
+        return metas[key]
+    except KeyError:
+        pass
+
+    meta = metas[key] = HandlerInspector(
+        handler=handler,
+        handler_name=handler_name,
+        flat=options.flat_validation,
+        engine=engine,
+    )()
+    return meta
+
+
+def _annotate(
+    wrapped: Callable,
+    meta: HandlerMeta,
+    validation_cache: Optional[LRUCache],
+    started_at: float,
+) -> None:
+    wrapped.handler_meta = meta  # type: ignore
+    wrapped.validation_cache = validation_cache  # type: ignore
+    wrapped.compile_time = time.perf_counter() - started_at  # type: ignore
+
+
+def _compile_responder(
+    handler: _HandlerCallable, meta: HandlerMeta, *, options: HandlerOptions
+) -> Responder:
+    handler = _ensure_coroutine_function(handler)
+    encode_response = compile_response_encoder(
+        meta.response_type,
+        get_backend(options.json_backend),
+        native=options.json_backend is None,
+    )
+
+    async def call(
+        request: web.Request, args: tuple, kwargs: _HandlerKwargs
+    ) -> web.StreamResponse:
+        resp = await handler(*args, **kwargs)
+        if encode_response is not None and not isinstance(resp, web.StreamResponse):
+            resp = encode_response(resp)
 
         return resp
 
-    return wrapped
+    respond: Responder = call
+    if meta.request_body_form:
+        respond = _compile_files_closer(respond, meta)
+    if options.response_cache_ttl is not None:
+        respond = compile_response_cache(respond, meta, options=options)
+    if options.compress:
+        # Compression wraps the response cache, so the cache keeps plain bodies
+        # and compressed ones are reused by their tags.
+        respond = compile_response_compression(respond, options=options)
+    if options.metrics_sink is not None:
+        respond = _compile_timed_responder(respond, meta, options.metrics_sink)
+
+    return respond
+
+
+def _compile_pipeline(
+    meta: HandlerMeta, extract_kwargs: _Extractor, respond: Responder
+) -> _Pipeline:
+    # Request processing is a small graph of steps: parameters extraction and
+    # dependencies resolution are independent, the handler depends on both of
+    # them. Synchronous steps, e.g. validation, are fused into extraction, so
+    # only steps doing I/O are run concurrently.
+    if not meta.dependencies_mapping:
+
+        async def handle(request: web.Request, args: tuple) -> web.StreamResponse:
+            return await respond(request, args, await extract_kwargs(request))
+
+        return handle
+
+    resolve = compile_dependencies(meta.dependencies_mapping, handler_name=meta.name)
+    if meta.request_body_pair is None:
+        # Extraction doesn't wait for anything, so there is nothing to overlap
+        # with and dependencies are resolved only for valid requests.
+
+        async def extract_and_resolve(
+            request: web.Request,
+        ) -> Tuple[_HandlerKwargs, Tuple[Dict[str, Any], List[Any]]]:
+            kwargs = await extract_kwargs(request)
+            return kwargs, await resolve(request)
+
+    else:
+        form_key = meta.request_body_pair[0] if meta.request_body_form else None
+
+        async def extract_and_resolve(
+            request: web.Request,
+        ) -> Tuple[_HandlerKwargs, Tuple[Dict[str, Any], List[Any]]]:
+            # Dependencies are resolved while a request body is being received.
+            kwargs, resolved = await asyncio.gather(
+                extract_kwargs(request), resolve(request), return_exceptions=True
+            )
+            if isinstance(resolved, BaseException):
+                if form_key is not None and not isinstance(kwargs, BaseException):
+                    # Files of a spooled form never reach the handler.
+                    close_files(kwargs[form_key].cleaned)  # type: ignore
+                raise resolved
+            if isinstance(kwargs, BaseException):
+                await close_dependencies(resolved[1])
+                raise kwargs
+
+            return kwargs, resolved
+
+    async def handle_with_dependencies(
+        request: web.Request, args: tuple
+    ) -> web.StreamResponse:
+        kwargs, (values, cleanups) = await extract_and_resolve(request)
+        kwargs.update(values)
+        if not cleanups:
+            return await respond(request, args, kwargs)
+
+        try:
+            resp = await respond(request, args, kwargs)
+        except BaseException:
+            await close_dependencies(cleanups)
+            raise
+
+        if _is_deferred_stream(resp):
+            resp.add_cleanup(partial(close_dependencies, cleanups))  # type: ignore
+        else:
+            await close_dependencies(cleanups)
+
+        return resp
+
+    return handle_with_dependencies
+
+
+def _compile_files_closer(respond: Responder, meta: HandlerMeta) -> Responder:
+    form_key = meta.request_body_pair[0]  # type: ignore
+
+    async def respond_and_close_files(
+        request: web.Request, args: tuple, kwargs: _HandlerKwargs
+    ) -> web.StreamResponse:
+        # Uploaded files are spooled to temporary files, which are removed as
+        # soon as the handler is done with them.
+        try:
+            resp = await respond(request, args, kwargs)
+        except BaseException:
+            close_files(kwargs[form_key].cleaned)  # type: ignore
+            raise
+
+        form = kwargs[form_key].cleaned  # type: ignore
+        if _is_deferred_stream(resp):
+            resp.add_cleanup(partial(_close_files, form))  # type: ignore
+        else:
+            close_files(form)
 
+        return resp
+
+    return respond_and_close_files
+
+
+def _is_deferred_stream(resp: web.StreamResponse) -> bool:
+    # Streams returned by handlers are written after handlers return, so
+    # everything the handler used must stay open until they are.
+    return isinstance(resp, JSONStreamResponse) and not resp.prepared
+
+
+async def _close_files(form: Any) -> None:
+    close_files(form)
 
-async def _handle_kwargs(
-    meta: HandlerMeta, data_generators: DataGenerators, request: web.Request
-) -> _HandlerKwargs:
-    kwargs_composed = _compose_kwargs(meta, request)
-    kwargs_validated = await _validate_kwargs(meta, data_generators, request)
 
-    return dict(**kwargs_composed, **kwargs_validated)
+def _compile_timed_responder(
+    respond: Responder, meta: HandlerMeta, sink: MetricsSink
+) -> Responder:
+    name = meta.name
+    perf_counter = time.perf_counter
+
+    async def respond_timed(
+        request: web.Request, args: tuple, kwargs: _HandlerKwargs
+    ) -> web.StreamResponse:
+        started_at = perf_counter()
+        resp = await respond(request, args, kwargs)
+        handler_time = perf_counter() - started_at
+
+        # Extraction phases are skipped for handlers without parameters to
+        # validate and for hits of the validation cache.
+        read_body, validate, build_kwargs, request_size = request.get(
+            PHASE_TIMINGS_KEY, _NO_PHASE_TIMINGS
+        )
+        sink(
+            name,
+            PhaseTimings(
+                read_body=read_body,
+                validate=validate,
+                build_kwargs=build_kwargs,
+                handler=handler_time,
+                request_size=request_size,
+                response_size=resp.content_length,
+            ),
+        )
+
+        return resp
 
+    return respond_timed
+
+
+def _ensure_coroutine_function(handler: _HandlerCallable) -> _HandlerCallable:
+    if not inspect.isasyncgenfunction(handler):
+        return handler
+
+    # Asynchronous generators are streamed to clients, so here we just need to
+    # hand the generator over to the response encoder.
+    async def call(*args, **kwargs) -> Any:
+        return handler(*args, **kwargs)
+
+    return call
+
+
+def _create_validation_cache(
+    meta: HandlerMeta, *, options: HandlerOptions
+) -> Optional[LRUCache]:
+    # Only path and query parameters are cached, request body is unique for almost
+    # every request, so routes with body are always validated.
+    if (
+        not options.validation_cache_size
+        or meta.request_type is None
+        or meta.request_body_pair is not None
+    ):
+        return None
+
+    return LRUCache(
+        maxsize=options.validation_cache_size, ttl=options.validation_cache_ttl
+    )
+
+
+@dataclass(frozen=True)
+class _ExtractionSteps:
+    # Extraction is split into steps, so they can be composed differently, e.g.
+    # timed one by one when instrumentation is enabled.
+    getters: Tuple[Tuple[str, _Getter], ...]
+    # Names of query parameters and whether they are sequences, shared by
+    # validators and the validation cache.
+    query_keys: Tuple[Tuple[str, bool], ...] = ()
+    read_body: Optional[_BodyReader] = None
+    validate: Optional[_Validator] = None
+    assign: Optional[_Assigner] = None
 
-def _compose_kwargs(meta: HandlerMeta, request: web.Request) -> _HandlerKwargs:
-    composed: _HandlerKwargs = {}
+
+def _compile_extractor(
+    meta: HandlerMeta,
+    *,
+    options: HandlerOptions,
+    validation_cache: Optional[LRUCache] = None,
+) -> _Extractor:
+    # Everything that depends only on the handler signature is resolved here,
+    # once, so per-request closures do the bare minimum of work.
+    steps = _compile_extraction_steps(meta, options=options)
+    validate = steps.validate
+    assign = steps.assign
+    extract: _Extractor
+    if validate is None or assign is None:
+        getters = steps.getters
+
+        async def extract_getters(request: web.Request) -> _HandlerKwargs:
+            return {k: getter(request) for k, getter in getters}
+
+        extract = extract_getters
+    elif options.metrics_sink is not None:
+        extract = _compile_timed_extractor(steps, validate, assign)
+    else:
+        extract = _compile_steps_extractor(steps, validate, assign)
+
+    if validation_cache is not None:
+        return _compile_cached_extractor(meta, steps, extract, validation_cache)
+
+    return extract
+
+
+def _compile_extraction_steps(
+    meta: HandlerMeta, *, options: HandlerOptions
+) -> _ExtractionSteps:
+    backend = get_backend(options.json_backend)
+    engine = get_engine(options.validation_engine)
+    getters = (
+        *_gen_component_getters(meta),
+        *_gen_body_stream_getters(meta, backend, _body_max_size(meta, options)),
+    )
+    request_type = meta.request_type
+    if request_type is None:
+        return _ExtractionSteps(getters=getters)
+
+    read_body: Optional[_BodyReader] = None
+    if meta.request_body_form:
+        read_body = _compile_form_reader(meta, _body_max_size(meta, options))
+    elif meta.request_body_pair is not None:
+        read_body = _compile_body_reader(
+            backend,
+            engine,
+            meta,
+            options=options,
+            max_size=_body_max_size(meta, options),
+        )
+    # Finding sequences may require building a model, so it is done once.
+    query_keys = _query_keys(meta, engine)
+    validate: _Validator
+    assign: _Assigner
+    if meta.request_flat:
+        validate = _compile_flat_validator(meta, request_type, engine, query_keys)
+        assign = _compile_flat_assigner(meta)
+    else:
+        validate = _compile_nested_validator(meta, request_type, engine, query_keys)
+        assign = _compile_nested_assigner(meta)
+    if meta.request_body_form:
+        validate = _compile_form_validator(validate)
+
+    return _ExtractionSteps(
+        getters=getters,
+        query_keys=query_keys,
+        read_body=read_body,
+        validate=validate,
+        assign=assign,
+    )
+
+
+def _body_max_size(meta: HandlerMeta, options: HandlerOptions) -> Optional[int]:
+    # Limit declared for a route overrides the one declared by a handler.
+    if options.body_max_size is not None:
+        return options.body_max_size
+
+    return meta.request_body_max_size
+
+
+def _compile_steps_extractor(
+    steps: _ExtractionSteps, validate: _Validator, assign: _Assigner
+) -> _Extractor:
+    getters = steps.getters
+    read_body = steps.read_body
+
+    if read_body is None:
+
+        async def extract(request: web.Request) -> _HandlerKwargs:
+            kwargs = {k: getter(request) for k, getter in getters}
+            assign(validate(request, None), kwargs)
+            return kwargs
+
+        return extract
+
+    async def extract_with_body(request: web.Request) -> _HandlerKwargs:
+        kwargs = {k: getter(request) for k, getter in getters}
+        assign(validate(request, await read_body(request)), kwargs)  # type: ignore
+        return kwargs
+
+    return extract_with_body
+
+
+def _compile_timed_extractor(
+    steps: _ExtractionSteps, validate: _Validator, assign: _Assigner
+) -> _Extractor:
+    getters = steps.getters
+    read_body = steps.read_body
+    perf_counter = time.perf_counter
+
+    async def extract(request: web.Request) -> _HandlerKwargs:
+        started_at = perf_counter()
+        kwargs = {k: getter(request) for k, getter in getters}
+        body = await read_body(request) if read_body is not None else None
+        read_at = perf_counter()
+        cleaned = validate(request, body)
+        validated_at = perf_counter()
+        assign(cleaned, kwargs)
+        # Timings are picked up by the timed responder, once the handler is done.
+        request[PHASE_TIMINGS_KEY] = (
+            read_at - started_at,
+            validated_at - read_at,
+            perf_counter() - validated_at,
+            _request_size(request) if read_body is not None else None,
+        )
+        return kwargs
+
+    return extract
+
+
+def _request_size(request: web.Request) -> Optional[int]:
+    content_length = request.content_length
+    if content_length is None and request._read_bytes is not None:
+        return len(request._read_bytes)
+
+    return content_length
+
+
+def _query_keys(
+    meta: HandlerMeta, engine: ValidationEngine
+) -> Tuple[Tuple[str, bool], ...]:
+    # Only declared parameters are read from the query, all values of repeated
+    # parameters are collected only for parameters declared as sequences.
+    if not meta.request_query_mapping:
+        return ()
+
+    list_keys = engine.list_fields_of(meta.request_query_mapping)
+    return tuple((k, k in list_keys) for k in meta.request_query_mapping)
+
+
+def _header_keys(meta: HandlerMeta) -> Tuple[Tuple[str, istr], ...]:
+    # Header names are converted to their canonical case-insensitive form once,
+    # so every lookup hits `CIMultiDict` directly.
+    return tuple((k, istr(header_name(k))) for k in meta.request_header_mapping or ())
+
+
+def _compile_nested_validator(
+    meta: HandlerMeta,
+    request_type: Any,
+    engine: ValidationEngine,
+    query_keys: Tuple[Tuple[str, bool], ...],
+) -> _Validator:
+    has_body = meta.request_body_pair is not None
+    has_path = bool(meta.request_path_mapping)
+    header_keys = _header_keys(meta)
+    cookie_keys = tuple(meta.request_cookie_mapping or ())
+    validate_request = engine.validator(request_type)
+    error_type = engine.error_type
+    errors_of = engine.errors_of
+
+    def validate(request: web.Request, body: Any) -> Any:
+        raw: Dict[str, Any] = {}
+        if has_body:
+            raw["body"] = body
+        if has_path:
+            raw["path"] = request.match_info
+        if query_keys:
+            query = request.query
+            raw["query"] = {
+                k: query.getall(k) if is_list else query[k]
+                for k, is_list in query_keys
+                if k in query
+            }
+        if header_keys:
+            headers = request.headers
+            raw["header"] = {k: headers[h] for k, h in header_keys if h in headers}
+        if cookie_keys:
+            cookies = request.cookies
+            raw["cookie"] = {k: cookies[k] for k in cookie_keys if k in cookies}
+
+        try:
+            return validate_request(raw)
+        except error_type as e:
+            raise HTTPBadRequest(validation_error=e, errors_of=errors_of) from e
+
+    return validate
+
+
+def _compile_nested_assigner(meta: HandlerMeta) -> _Assigner:
+    body_key = meta.request_body_pair[0] if meta.request_body_pair else None
+    wrap_body = Form if meta.request_body_form else Body
+    path_keys = tuple(meta.request_path_mapping or ())
+    query_keys = tuple(meta.request_query_mapping or ())
+    header_keys = tuple(meta.request_header_mapping or ())
+    cookie_keys = tuple(meta.request_cookie_mapping or ())
+
+    def assign(cleaned: Any, kwargs: _HandlerKwargs) -> None:
+        if body_key is not None:
+            kwargs[body_key] = wrap_body(cleaned.body)
+        if path_keys:
+            path = cleaned.path
+            for k in path_keys:
+                kwargs[k] = PathParam(getattr(path, k))
+        if query_keys:
+            query = cleaned.query
+            for k in query_keys:
+                kwargs[k] = QueryParam(getattr(query, k))
+        if header_keys:
+            header = cleaned.header
+            for k in header_keys:
+                kwargs[k] = HeaderParam(getattr(header, k))
+        if cookie_keys:
+            cookie = cleaned.cookie
+            for k in cookie_keys:
+                kwargs[k] = CookieParam(getattr(cookie, k))
+
+    return assign
+
+
+def _compile_cached_extractor(
+    meta: HandlerMeta, steps: _ExtractionSteps, extract: _Extractor, cache: LRUCache
+) -> _Extractor:
+    getters = steps.getters
+    path_keys = tuple(meta.request_path_mapping or ())
+    query_keys = steps.query_keys
+    header_keys = _header_keys(meta)
+    cookie_keys = tuple(meta.request_cookie_mapping or ())
+    cached_keys = (
+        path_keys
+        + tuple(k for k, _ in query_keys)
+        + tuple(k for k, _ in header_keys)
+        + cookie_keys
+    )
+
+    async def extract_cached(request: web.Request) -> _HandlerKwargs:
+        # Only declared parameters are a part of the key, so unrelated query
+        # parameters, e.g. cache busters, don't pollute the cache.
+        match_info = request.match_info
+        query = request.query
+        key: Tuple[Any, ...] = (
+            tuple(match_info.get(k) for k in path_keys),
+            tuple(
+                tuple(query.getall(k, ())) if is_list else query.get(k)
+                for k, is_list in query_keys
+            ),
+        )
+        if header_keys:
+            headers = request.headers
+            key += (tuple(headers.get(h) for _, h in header_keys),)
+        if cookie_keys:
+            cookies = request.cookies
+            key += (tuple(cookies.get(k) for k in cookie_keys),)
+
+        cached = cache.get(key)
+        if cached is None:
+            kwargs = await extract(request)
+            # The request that fills the cache gets its own copies too.
+            cache.set(key, {k: _copy_param(kwargs[k]) for k in cached_keys})
+            return kwargs
+
+        kwargs = {k: getter(request) for k, getter in getters}
+        for k, param in cached.items():
+            kwargs[k] = _copy_param(param)
+        return kwargs
+
+    return extract_cached
+
+
+def _copy_param(param: Any) -> Any:
+    # Mutable values, e.g. models and lists, are copied shallowly.
+    if isinstance(param.cleaned, _IMMUTABLE_TYPES):
+        return param
+
+    return type(param)(copy.copy(param.cleaned))
+
+
+def _compile_flat_validator(
+    meta: HandlerMeta,
+    request_type: Any,
+    engine: ValidationEngine,
+    query_keys: Tuple[Tuple[str, bool], ...],
+) -> _Validator:
+    has_body = meta.request_body_pair is not None
+    path_fields = tuple(
+        (k, flat_field_name("path", k)) for k in meta.request_path_mapping or ()
+    )
+    query_fields = tuple(
+        (k, flat_field_name("query", k), is_list) for k, is_list in query_keys
+    )
+    header_fields = tuple(
+        (h, flat_field_name("header", k)) for k, h in _header_keys(meta)
+    )
+    cookie_fields = tuple(
+        (k, flat_field_name("cookie", k)) for k in meta.request_cookie_mapping or ()
+    )
+    validate_request = engine.validator(request_type)
+    error_type = engine.error_type
+    errors_of = engine.errors_of
+    relocate_errors_of = engine.relocate_errors
+
+    def validate(request: web.Request, body: Any) -> Any:
+        raw: Dict[str, Any] = {}
+        if has_body:
+            raw["body"] = body
+        if path_fields:
+            match_info = request.match_info
+            for k, field in path_fields:
+                if k in match_info:
+                    raw[field] = match_info[k]
+        if query_fields:
+            query = request.query
+            for k, field, is_list in query_fields:
+                if k in query:
+                    raw[field] = query.getall(k) if is_list else query[k]
+        if header_fields:
+            headers = request.headers
+            for h, field in header_fields:
+                if h in headers:
+                    raw[field] = headers[h]
+        if cookie_fields:
+            cookies = request.cookies
+            for k, field in cookie_fields:
+                if k in cookies:
+                    raw[field] = cookies[k]
+
+        try:
+            return validate_request(raw)
+        except error_type as e:
+            raise HTTPBadRequest(
+                validation_error=relocate_errors_of(e, _unflatten_loc, request_type),
+                errors_of=errors_of,
+            ) from e
+
+    return validate
+
+
+def _compile_flat_assigner(meta: HandlerMeta) -> _Assigner:
+    body_key = meta.request_body_pair[0] if meta.request_body_pair else None
+    wrap_body = Form if meta.request_body_form else Body
+    path_fields = tuple(
+        (k, flat_field_name("path", k)) for k in meta.request_path_mapping or ()
+    )
+    query_fields = tuple(
+        (k, flat_field_name("query", k)) for k in meta.request_query_mapping or ()
+    )
+    header_fields = tuple(
+        (k, flat_field_name("header", k)) for k in meta.request_header_mapping or ()
+    )
+    cookie_fields = tuple(
+        (k, flat_field_name("cookie", k)) for k in meta.request_cookie_mapping or ()
+    )
+
+    def assign(cleaned: Any, kwargs: _HandlerKwargs) -> None:
+        values = cleaned.__dict__
+        if body_key is not None:
+            kwargs[body_key] = wrap_body(values["body"])
+        for k, field in path_fields:
+            kwargs[k] = PathParam(values[field])
+        for k, field in query_fields:
+            kwargs[k] = QueryParam(values[field])
+        for k, field in header_fields:
+            kwargs[k] = HeaderParam(values[field])
+        for k, field in cookie_fields:
+            kwargs[k] = CookieParam(values[field])
+
+    return assign
+
+
+def _unflatten_loc(loc: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    # Restore the `("query", "name")` error locations of the nested layout, so
+    # error responses don't depend on the chosen validation mode.
+    return split_flat_field_name(str(loc[0])) + loc[1:]
+
+
+def _gen_component_getters(meta: HandlerMeta) -> Iterator[Tuple[str, _Getter]]:
     if meta.components_mapping is None:
-        return composed
+        return
 
     for k, type_ in meta.components_mapping.items():
         if param_of(type_=type_, is_=web.Application):
-            composed[k] = request.app
+            yield k, operator.attrgetter("app")
         elif param_of(type_=type_, is_=web.Request):  # pragma: no branch
-            composed[k] = request
+            yield k, _identity
 
-    return composed
 
+def _gen_body_stream_getters(
+    meta: HandlerMeta, backend: JSONBackend, max_size: Optional[int]
+) -> Iterator[Tuple[str, _Getter]]:
+    if meta.request_body_stream_pair is None:
+        return
 
-async def _validate_kwargs(
-    meta: HandlerMeta, data_generators: DataGenerators, request: web.Request
-) -> _HandlerKwargs:
-    validated: _HandlerKwargs = {}
-    if meta.request_type is None:
-        return validated
+    k, item_type = meta.request_body_stream_pair
+    iter_items = _compile_body_stream(item_type, backend, max_size)
 
-    raw = {}
-    for raw_data_generator in data_generators.raw:
-        k, raw_data = await raw_data_generator(request)
-        raw[k] = raw_data
+    def get_body_stream(request: web.Request) -> Body:
+        # Requests declaring too large bodies are rejected before the handler
+        # is called.
+        content_length = request.content_length
+        if max_size is not None and content_length is not None:
+            _check_body_size(content_length, max_size)
 
-    try:
-        cleaned = cast(BaseModel, meta.request_type).parse_obj(raw)
-    except ValidationError as e:
-        raise HTTPBadRequest(validation_error=e) from e
+        return Body(iter_items(request))
+
+    yield k, get_body_stream
 
-    for kwargs_data_generator in data_generators.kwargs:
-        for k, param in kwargs_data_generator(meta, cleaned):
-            validated[k] = param
 
-    return validated
+def _compile_body_stream(
+    item_type: Type[BaseModel], backend: JSONBackend, max_size: Optional[int]
+) -> Callable[[web.Request], AsyncIterator[BaseModel]]:
+    loads = backend.loads
+    parse_item = model_validator(item_type)
+
+    async def iter_items(request: web.Request) -> AsyncIterator[BaseModel]:
+        chunks: AsyncIterator[bytes] = request.content.iter_any()
+        if max_size is not None:
+            chunks = _iter_limited(chunks, max_size)
+        items = (
+            iter_ndjson(chunks, loads)
+            if request.content_type in NDJSON_CONTENT_TYPES
+            else iter_json_array(chunks, loads)
+        )
+
+        index = 0
+        while True:
+            try:
+                item = await items.__anext__()
+            except StopAsyncIteration:
+                return
+            except ValueError as e:
+                raise HTTPBadRequest(
+                    validation_error=json_error(("body", index), item_type)
+                ) from e
 
+            try:
+                cleaned = parse_item(item)
+            except ValidationError as e:
+                raise HTTPBadRequest(
+                    validation_error=relocate_errors(
+                        e, partial(operator.add, ("body", index)), item_type
+                    )
+                ) from e
 
-def _get_data_generators(meta: HandlerMeta) -> DataGenerators:
-    return DataGenerators(
-        raw=tuple(_gen_raw_data_generators(meta)),
-        kwargs=tuple(_gen_kwargs_data_generators(meta)),
+            yield cleaned
+            index += 1
+
+    return iter_items
+
+
+async def _iter_limited(
+    chunks: AsyncIterator[bytes], max_size: int
+) -> AsyncIterator[bytes]:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        _check_body_size(size, max_size)
+        yield chunk
+
+
+def _identity(request: web.Request) -> web.Request:
+    return request
+
+
+def _compile_body_reader(
+    backend: JSONBackend,
+    engine: ValidationEngine,
+    meta: HandlerMeta,
+    *,
+    options: HandlerOptions,
+    max_size: Optional[int],
+) -> _BodyReader:
+    loads = backend.loads
+    backend_name = backend.name
+    request_type = meta.request_type
+    body_type = meta.request_body_pair[1][0]  # type: ignore
+    engine_name = engine.name
+    # Backends chosen for a route explicitly are always used to decode bodies.
+    validate_json = (
+        engine.json_validator(body_type) if options.json_backend is None else None
     )
+    executor = options.offload_executor
+    offload_min_size = options.offload_min_size
 
+    def malformed() -> HTTPBadRequest:
+        return HTTPBadRequest(
+            validation_error=engine.json_error(("body",), request_type),
+            errors_of=engine.errors_of,
+        )
 
-def _gen_raw_data_generators(meta: HandlerMeta) -> Iterator[_GenRawDataCallable]:
-    if meta.request_body_pair:
-        yield _gen_body_raw_data
+    async def read_body(request: web.Request) -> Any:
+        body = (
+            await request.read()
+            if max_size is None
+            else await _read_limited(request, max_size)
+        )
+        if not body:
+            return {}
 
-    if meta.request_path_mapping:
-        yield _gen_path_raw_data
+        if executor is not None and len(body) >= offload_min_size:
+            # Large bodies are decoded and validated in the executor, so the event
+            # loop only has to check already validated values.
+            status, value = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                decode_and_validate,
+                body,
+                backend_name,
+                body_type,
+                engine_name,
+            )
+            if status == MALFORMED:
+                raise malformed()
 
-    if meta.request_query_mapping:
-        yield _gen_query_raw_data
+            return value
 
+        if validate_json is not None:
+            # Bodies are decoded and validated at once, the request model gets an
+            # already validated body, so its validation is cheap. Invalid bodies are
+            # decoded as usual, so their errors are reported along with errors of
+            # other parameters.
+            try:
+                return validate_json(body)
+            except ValueError:
+                pass
 
-async def _gen_body_raw_data(request: web.Request) -> _GenRawDataResult:
-    try:
-        raw = await request.json()
-    except json.JSONDecodeError:
-        raw = {}
+        # Raw bytes are decoded directly, without an intermediate `str` copy.
+        # Malformed bodies are rejected right away, there is no point to validate
+        # anything else.
+        try:
+            return loads(body)
+        except ValueError as e:
+            raise malformed() from e
 
-    return "body", raw
+    return read_body
 
 
-async def _gen_path_raw_data(request: web.Request) -> _GenRawDataResult:
-    return "path", dict(request.match_info)
+def _compile_form_reader(meta: HandlerMeta, max_size: Optional[int]) -> _BodyReader:
+    request_type = meta.request_type
+    list_fields = list_fields_of(meta.request_body_pair[1][0])  # type: ignore
+    check_size = (
+        partial(_check_body_size, max_size=max_size) if max_size is not None else None
+    )
 
+    async def read_body(request: web.Request) -> Any:
+        content_length = request.content_length
+        if check_size is not None and content_length is not None:
+            check_size(content_length)
 
-async def _gen_query_raw_data(request: web.Request) -> _GenRawDataResult:
-    return "query", dict(request.query)
+        try:
+            return await read_form(
+                request, list_fields=list_fields, check_size=check_size
+            )
+        except ValueError as e:
+            raise HTTPBadRequest(
+                validation_error=form_error(("body",), request_type)
+            ) from e
 
+    return read_body
 
-def _gen_kwargs_data_generators(meta: HandlerMeta) -> Iterator[_GenKwargsCallable]:
-    if meta.request_body_pair:
-        yield _gen_body_kwargs
 
-    if meta.request_path_mapping:
-        yield _gen_path_kwargs
+def _compile_form_validator(validate: _Validator) -> _Validator:
+    def validate_form(request: web.Request, form: Any) -> Any:
+        # Files of invalid forms never reach a handler, so they are closed here.
+        try:
+            return validate(request, form)
+        except BaseException:
+            close_files(form)
+            raise
 
-    if meta.request_query_mapping:
-        yield _gen_query_kwargs
+    return validate_form
 
 
-def _gen_body_kwargs(meta: HandlerMeta, cleaned: BaseModel) -> _GenKwargsResult:
-    k, _ = cast(tuple, meta.request_body_pair)
-    yield k, Body(cleaned.body)  # type: ignore
+async def _read_limited(request: web.Request, max_size: int) -> bytes:
+    content_length = request.content_length
+    if content_length is not None:
+        # Payload is never longer than declared, so the whole body can be read
+        # once the declared length is checked.
+        _check_body_size(content_length, max_size)
+        return await request.read()
 
+    # Chunked bodies are read chunk by chunk and reading is aborted as soon as
+    # the limit is crossed.
+    body = bytearray()
+    async for chunk in request.content.iter_any():
+        body += chunk
+        _check_body_size(len(body), max_size)
 
-def _gen_path_kwargs(_meta: HandlerMeta, cleaned: BaseModel) -> _GenKwargsResult:
-    for k, v in cleaned.path:  # type: ignore
-        yield k, PathParam(v)
+    # Keep the body available to anyone calling `request.read()` later.
+    request._read_bytes = bytes(body)
+    return request._read_bytes
 
 
-def _gen_query_kwargs(_meta: HandlerMeta, cleaned: BaseModel) -> _GenKwargsResult:
-    for k, v in cleaned.query:  # type: ignore
-        yield k, QueryParam(v)
+def _check_body_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        raise web.HTTPRequestEntityTooLarge(max_size=max_size, actual_size=size)
@@ -10,7 +10,15 @@ __all__ = ("HandlerMeta",)
 class HandlerMeta:
     name: str
     components_mapping: Optional[Dict[str, Any]] = None
+    dependencies_mapping: Optional[Dict[str, Any]] = None
     request_type: Optional[Type[BaseModel]] = None
     request_body_pair: Optional[Tuple[str, Any]] = None
+    request_body_stream_pair: Optional[Tuple[str, Any]] = None
+    request_body_max_size: Optional[int] = None
+    request_body_form: bool = False
     request_path_mapping: Optional[Dict[str, Any]] = None
     request_query_mapping: Optional[Dict[str, Any]] = None
+    request_header_mapping: Optional[Dict[str, Any]] = None
+    request_cookie_mapping: Optional[Dict[str, Any]] = None
+    request_flat: bool = False
+    response_type: Optional[Any] = None
@@ -1,7 +1,10 @@
 __all__ = (
+    "HandlerDependencyCycleError",
+    "HandlerDependencyScopeError",
     "HandlerInspectorError",
     "HandlerMultipleBodyError",
     "HandlerParamUnknownTypeError",
+    "HandlerResponseCacheError",
 )
 
 
@@ -35,3 +38,15 @@ class HandlerMultipleBodyError(HandlerInspectorError):
 
 class HandlerParamUnknownTypeError(HandlerInspectorError):
     pass
+
+
+class HandlerDependencyCycleError(HandlerInspectorError):
+    pass
+
+
+class HandlerDependencyScopeError(HandlerInspectorError):
+    pass
+
+
+class HandlerResponseCacheError(HandlerInspectorError):
+    pass
@@ -1,36 +1,84 @@
 import inspect
+from collections.abc import AsyncGenerator, AsyncIterator
 from functools import partial
-from typing import Any, Awaitable, Callable, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator as TypingAsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
-from aiohttp.web import Application, Request
-from pydantic import Required, create_model
+from aiohttp.web import Application, Request, StreamResponse
+from pydantic import BaseModel, create_model
 
 from aioapi.inspect.entities import HandlerMeta
 from aioapi.inspect.exceptions import (
     HandlerMultipleBodyError,
     HandlerParamUnknownTypeError,
 )
-from aioapi.typedefs import Body, PathParam, QueryParam
+from aioapi.typedefs import (
+    Body,
+    BodyLimit,
+    CookieParam,
+    Depends,
+    Form,
+    HeaderParam,
+    PathParam,
+    QueryParam,
+)
 
-__all__ = ("HandlerInspector", "param_of")
+if TYPE_CHECKING:  # pragma: no cover
+    from aioapi.engines import ValidationEngine
+
+__all__ = (
+    "HandlerInspector",
+    "param_of",
+    "flat_field_name",
+    "header_name",
+    "split_flat_field_name",
+)
 
 NOT_INITIALIZED = object()
+# Required fields are declared using an ellipsis by all `pydantic` versions.
+REQUIRED = ...
+FLAT_FIELD_SEPARATOR = "__"
+
+_Mapping = Dict[str, Any]
 
 
 class HandlerInspector:
-    __slots__ = ("_handler", "_handler_name")
+    __slots__ = ("_handler", "_handler_name", "_flat", "_engine")
 
     def __init__(
-        self, *, handler: Callable[..., Awaitable], handler_name: Optional[str] = None
+        self,
+        *,
+        handler: Callable[..., Awaitable],
+        handler_name: Optional[str] = None,
+        flat: bool = False,
+        engine: Optional["ValidationEngine"] = None,
     ) -> None:
         self._handler = handler
         self._handler_name = handler_name or f"{handler.__module__}.{handler.__name__}"
+        self._flat = flat
+        self._engine = engine
 
     def __call__(self) -> HandlerMeta:
         components_mapping = {}
+        dependencies_mapping = {}
         body_pair = None
+        body_stream_pair = None
+        body_max_size = None
+        body_form = False
         path_mapping = {}
         query_mapping = {}
+        header_mapping = {}
+        cookie_mapping = {}
 
         signature = inspect.signature(self._handler)
         for param in signature.parameters.values():
@@ -42,63 +90,253 @@ class HandlerInspector:
             param_type = param.annotation
             param_of_type = partial(param_of, type_=param_type)
 
-            if param_of_type(is_=Application) or param_of_type(is_=Request):
+            if isinstance(param.default, Depends):
+                # Dependencies are recognized by their default value, so their
+                # annotations are free to describe provided values.
+                dependencies_mapping[param_name] = param.default
+            elif param_of_type(is_=Application) or param_of_type(is_=Request):
                 components_mapping[param_name] = param_type
             elif param_of_type(is_=Body):
                 # We allow only one parameter of body type, so if there are more
                 # parameters of body type we will raise a corresponding error.
-                if body_pair is not None:
+                if body_pair is not None or body_stream_pair is not None:
                     raise HandlerMultipleBodyError(
                         handler=self._handler_name, param=param_name
                     )
 
+                body_inner_type, body_max_size = inspect_body_type(
+                    inspect_param_inner_type(param_type)
+                )
+                if param_of(type_=body_inner_type, is_=AsyncIterator):
+                    # Streamed bodies are validated item by item while handler
+                    # iterates over them, so they are not a part of request model.
+                    item_type = inspect_param_inner_type(body_inner_type)
+                    if not is_model(item_type):
+                        raise HandlerParamUnknownTypeError(
+                            handler=self._handler_name, param=param_name
+                        )
+
+                    body_stream_pair = (param_name, item_type)
+                else:
+                    body_pair = (
+                        param_name,
+                        (body_inner_type, inspect_param_default(param.default)),
+                    )
+            elif param_of_type(is_=Form):
+                if body_pair is not None or body_stream_pair is not None:
+                    raise HandlerMultipleBodyError(
+                        handler=self._handler_name, param=param_name
+                    )
+
+                form_type, body_max_size = inspect_body_type(
+                    inspect_param_inner_type(param_type)
+                )
+                if not is_model(form_type):
+                    raise HandlerParamUnknownTypeError(
+                        handler=self._handler_name, param=param_name
+                    )
+
+                # Forms are validated as a request body, they are just read
+                # differently.
                 body_pair = (
                     param_name,
-                    inspect_param_type(param_type, inspect_default=param.default),
+                    (form_type, inspect_param_default(param.default)),
                 )
+                body_form = True
             elif param_of_type(is_=PathParam):
                 path_mapping[param_name] = inspect_param_type(param_type)
             elif param_of_type(is_=QueryParam):
                 query_mapping[param_name] = inspect_param_type(
                     param_type, inspect_default=param.default
                 )
+            elif param_of_type(is_=HeaderParam):
+                header_mapping[param_name] = inspect_param_type(
+                    param_type, inspect_default=param.default
+                )
+            elif param_of_type(is_=CookieParam):
+                cookie_mapping[param_name] = inspect_param_type(
+                    param_type, inspect_default=param.default
+                )
             else:
                 raise HandlerParamUnknownTypeError(
                     handler=self._handler_name, param=param_name
                 )
 
-        request_mapping = {}
-        if body_pair:
-            _, body_type = body_pair
-            request_mapping["body"] = body_type
-
-        for k, mapping in (("path", path_mapping), ("query", query_mapping)):
-            if not mapping:
-                continue
-
-            request_mapping[k] = (
-                create_model(
-                    k.title(), **{k: v for k, v in mapping.items()}  # type: ignore
-                ),
-                Required,
-            )
-
-        request_type = (
-            create_model("Request", **request_mapping)  # type: ignore
-            if request_mapping
-            else None
+        # Request types are built by a validation engine, `pydantic` models are
+        # built unless another engine is given. Engines without the flat layout
+        # always build the nested one.
+        flat = self._flat
+        create: Callable[..., Optional[Any]]
+        if self._engine is None:
+            create = create_flat_request_model if flat else create_request_model
+        elif flat and self._engine.create_flat_request_type is not None:
+            create = self._engine.create_flat_request_type
+        else:
+            flat = False
+            create = self._engine.create_request_type
+        request_type = create(
+            body_pair,
+            path_mapping,
+            query_mapping,
+            header_mapping=header_mapping,
+            cookie_mapping=cookie_mapping,
         )
 
         return HandlerMeta(
             name=self._handler_name,
+            response_type=inspect_response_type(
+                signature.return_annotation,
+                is_async_gen=inspect.isasyncgenfunction(self._handler),
+            ),
             components_mapping=components_mapping or None,
+            dependencies_mapping=dependencies_mapping or None,
             request_type=request_type,
             request_body_pair=body_pair,
+            request_body_stream_pair=body_stream_pair,
+            request_body_max_size=body_max_size,
+            request_body_form=body_form,
             request_path_mapping=path_mapping or None,
             request_query_mapping=query_mapping or None,
+            request_header_mapping=header_mapping or None,
+            request_cookie_mapping=cookie_mapping or None,
+            request_flat=flat,
         )
 
 
+def create_request_model(
+    body_pair: Optional[Tuple[str, Any]],
+    path_mapping: _Mapping,
+    query_mapping: _Mapping,
+    *,
+    header_mapping: Optional[_Mapping] = None,
+    cookie_mapping: Optional[_Mapping] = None,
+) -> Optional[Type[BaseModel]]:
+    request_mapping = {}
+    if body_pair:
+        _, body_type = body_pair
+        request_mapping["body"] = body_type
+
+    for k, mapping in (
+        ("path", path_mapping),
+        ("query", query_mapping),
+        ("header", header_mapping),
+        ("cookie", cookie_mapping),
+    ):
+        if not mapping:
+            continue
+
+        request_mapping[k] = (
+            create_model(
+                k.title(), **{k: v for k, v in mapping.items()}  # type: ignore
+            ),
+            REQUIRED,
+        )
+
+    return (
+        create_model("Request", **request_mapping)  # type: ignore
+        if request_mapping
+        else None
+    )
+
+
+def create_flat_request_model(
+    body_pair: Optional[Tuple[str, Any]],
+    path_mapping: _Mapping,
+    query_mapping: _Mapping,
+    *,
+    header_mapping: Optional[_Mapping] = None,
+    cookie_mapping: Optional[_Mapping] = None,
+) -> Optional[Type[BaseModel]]:
+    # All request parameters live in a single model, so validation of a request
+    # builds exactly one model instance. Parameters are namespaced by source to
+    # avoid clashes, e.g. `path__id` and `query__id`.
+    request_mapping = {}
+    if body_pair:
+        _, body_type = body_pair
+        request_mapping["body"] = body_type
+
+    for source, mapping in (
+        ("path", path_mapping),
+        ("query", query_mapping),
+        ("header", header_mapping),
+        ("cookie", cookie_mapping),
+    ):
+        for k, v in (mapping or {}).items():
+            request_mapping[flat_field_name(source, k)] = v
+
+    return (
+        create_model("FlatRequest", **request_mapping)  # type: ignore
+        if request_mapping
+        else None
+    )
+
+
+def flat_field_name(source: str, name: str) -> str:
+    return f"{source}{FLAT_FIELD_SEPARATOR}{name}"
+
+
+def header_name(name: str) -> str:
+    # Parameter `x_request_id` stands for `X-Request-Id` header.
+    return name.replace("_", "-")
+
+
+def split_flat_field_name(field_name: str) -> Tuple[str, ...]:
+    return tuple(field_name.split(FLAT_FIELD_SEPARATOR, 1))
+
+
+def inspect_response_type(type_, *, is_async_gen: bool = False) -> Any:
+    # Only pydantic models, lists and asynchronous iterators of them are serialized
+    # by `AIOAPI`, handlers with any other return annotation are expected to build
+    # responses themselves. Asynchronous generators are always streamed.
+    if param_of(type_=type_, is_=Union):
+        # Ready responses are passed through anyway, so e.g. handlers declared as
+        # `-> Union[User, web.Response]` are serialized as `-> User`.
+        args = [arg for arg in type_.__args__ if not is_response(arg)]
+        if len(args) == 1 and len(args) < len(type_.__args__):
+            type_ = args[0]
+
+    if is_model(type_):
+        return type_
+
+    if param_of(type_=type_, is_=list) and is_model(inspect_param_inner_type(type_)):
+        return type_
+
+    if param_of(type_=type_, is_=AsyncIterator) or param_of(
+        type_=type_, is_=AsyncGenerator
+    ):
+        item_type = inspect_param_inner_type(type_)
+        if is_model(item_type):
+            return TypingAsyncIterator[item_type]  # type: ignore
+
+    if is_async_gen:
+        return TypingAsyncIterator[Any]
+
+    return None
+
+
+def inspect_body_type(type_) -> Tuple[Any, Optional[int]]:
+    # `Annotated` types keep their metadata in `__metadata__` and the annotated
+    # type in `__origin__`, so there is no need to import `Annotated` itself.
+    metadata = getattr(type_, "__metadata__", None)
+    if metadata is None:
+        return type_, None
+
+    max_size = None
+    for item in metadata:
+        if isinstance(item, BodyLimit):
+            max_size = item.max_size
+
+    return type_.__origin__, max_size
+
+
+def is_model(type_) -> bool:
+    return inspect.isclass(type_) and issubclass(type_, BaseModel)
+
+
+def is_response(type_) -> bool:
+    return inspect.isclass(type_) and issubclass(type_, StreamResponse)
+
+
 def param_of(*, type_, is_) -> bool:
     return getattr(type_, "__origin__", type_) is is_
 
@@ -111,7 +349,7 @@ def inspect_param_type(
         (
             inspect_param_default(inspect_default)
             if inspect_default is not NOT_INITIALIZED
-            else Required
+            else REQUIRED
         ),
     )
 
@@ -122,6 +360,6 @@ def inspect_param_inner_type(type_) -> Any:
 
 def inspect_param_default(default: Any) -> Any:
     if default == inspect.Signature.empty:
-        return Required
+        return REQUIRED
 
     return getattr(default, "cleaned", default)
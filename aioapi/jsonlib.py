@@ -0,0 +1,113 @@
+import json
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from aioapi.adapters import json_default
+
+__all__ = (
+    "JSONBackend",
+    "JSONBackendUnknownError",
+    "get_backend",
+    "register_backend",
+    "set_default_backend",
+)
+
+
+@dataclass(frozen=True)
+class JSONBackend:
+    name: str
+    # Must accept raw bytes and raise `ValueError` (or its subclass) on bad input.
+    loads: Callable[[bytes], Any]
+    # Must return encoded bytes, types unknown to the backend (e.g. `Decimal` or
+    # pydantic models) are passed to `aioapi.adapters.json_default`.
+    dumps: Callable[[Any], bytes]
+
+
+class JSONBackendUnknownError(Exception):
+    __slots__ = ("_name",)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __init__(self, *, name: str) -> None:
+        self._name = name
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} name={self._name}>"
+
+
+_backends: Dict[str, JSONBackend] = {}
+_default_backend_name = "json"
+
+
+def register_backend(backend: JSONBackend) -> None:
+    _backends[backend.name] = backend
+
+
+def set_default_backend(name: str) -> None:
+    global _default_backend_name
+
+    get_backend(name)
+    _default_backend_name = name
+
+
+def get_backend(name: Optional[str] = None) -> JSONBackend:
+    name = name or _default_backend_name
+    try:
+        return _backends[name]
+    except KeyError:
+        raise JSONBackendUnknownError(name=name) from None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=json_default).encode()
+
+
+register_backend(JSONBackend(name="json", loads=json.loads, dumps=_json_dumps))
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+
+    def _ujson_dumps(obj: Any) -> bytes:
+        return ujson.dumps(obj, default=json_default).encode()
+
+    register_backend(JSONBackend(name="ujson", loads=ujson.loads, dumps=_ujson_dumps))
+    _default_backend_name = "ujson"
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    register_backend(
+        JSONBackend(
+            name="msgspec",
+            loads=msgspec.json.decode,
+            dumps=msgspec.json.Encoder(enc_hook=json_default).encode,
+        )
+    )
+    _default_backend_name = "msgspec"
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    register_backend(
+        JSONBackend(
+            name="orjson",
+            loads=orjson.loads,
+            dumps=partial(
+                orjson.dumps, default=json_default, option=orjson.OPT_NON_STR_KEYS
+            ),
+        )
+    )
+    _default_backend_name = "orjson"
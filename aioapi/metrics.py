@@ -0,0 +1,193 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import hdrs, web
+
+__all__ = (
+    "DEFAULT_SECONDS_BUCKETS",
+    "DEFAULT_SIZE_BUCKETS",
+    "PHASES",
+    "PHASE_TIMINGS_KEY",
+    "Histogram",
+    "HistogramSink",
+    "MetricsSink",
+    "PhaseTimings",
+    "metrics_handler",
+)
+
+PHASE_TIMINGS_KEY = "aioapi_phase_timings"
+
+PHASES = ("read_body", "validate", "build_kwargs", "handler")
+
+DEFAULT_SECONDS_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+DEFAULT_SIZE_BUCKETS = (
+    1024,
+    4 * 1024,
+    16 * 1024,
+    64 * 1024,
+    256 * 1024,
+    1024 * 1024,
+    4 * 1024 * 1024,
+    16 * 1024 * 1024,
+)
+
+# Prometheus text exposition format announces its version as a media type
+# parameter.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass(frozen=True)
+class PhaseTimings:
+    read_body: float
+    validate: float
+    build_kwargs: float
+    handler: float
+    request_size: Optional[int] = None
+    response_size: Optional[int] = None
+
+
+MetricsSink = Callable[[str, PhaseTimings], None]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # The last counter is for values greater than any bucket, `+Inf`.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[int]:
+        cumulative = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+
+        return cumulative
+
+
+class HistogramSink:
+    # Keeps histograms of phases durations and payload sizes in memory, per
+    # handler. Histograms can be rendered using Prometheus text format.
+    def __init__(
+        self,
+        *,
+        seconds_buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+    ) -> None:
+        self._seconds_buckets = seconds_buckets
+        self._size_buckets = size_buckets
+        self._phases: Dict[Tuple[str, str], Histogram] = {}
+        self._sizes: Dict[Tuple[str, str], Histogram] = {}
+
+    def __call__(self, name: str, timings: PhaseTimings) -> None:
+        phases = self._phases
+        for phase in PHASES:
+            key = (name, phase)
+            histogram = phases.get(key)
+            if histogram is None:
+                histogram = phases[key] = Histogram(self._seconds_buckets)
+            histogram.observe(getattr(timings, phase))
+
+        for direction, size in (
+            ("request", timings.request_size),
+            ("response", timings.response_size),
+        ):
+            if size is None:
+                continue
+
+            key = (name, direction)
+            histogram = self._sizes.get(key)
+            if histogram is None:
+                histogram = self._sizes[key] = Histogram(self._size_buckets)
+            histogram.observe(size)
+
+    def phase(self, name: str, phase: str) -> Optional[Histogram]:
+        return self._phases.get((name, phase))
+
+    def size(self, name: str, direction: str) -> Optional[Histogram]:
+        return self._sizes.get((name, direction))
+
+    def clear(self) -> None:
+        self._phases.clear()
+        self._sizes.clear()
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        _render_histograms(
+            lines,
+            "aioapi_phase_seconds",
+            "Time spent in request processing phases.",
+            "phase",
+            self._phases,
+        )
+        _render_histograms(
+            lines,
+            "aioapi_payload_bytes",
+            "Size of request and response bodies.",
+            "direction",
+            self._sizes,
+        )
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def metrics_handler(
+    sink: HistogramSink,
+) -> Callable[[web.Request], Awaitable[web.Response]]:
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(
+            body=sink.render_prometheus().encode(),
+            headers={hdrs.CONTENT_TYPE: PROMETHEUS_CONTENT_TYPE},
+        )
+
+    return handler
+
+
+def _render_histograms(
+    lines: List[str],
+    metric: str,
+    help_: str,
+    label: str,
+    histograms: Dict[Tuple[str, str], Histogram],
+) -> None:
+    if not histograms:
+        return
+
+    lines.append(f"# HELP {metric} {help_}")
+    lines.append(f"# TYPE {metric} histogram")
+    for (name, value), histogram in sorted(histograms.items()):
+        labels = f'handler="{_escape(name)}",{label}="{_escape(value)}"'
+        cumulative = histogram.cumulative_counts()
+        for bound, count in zip(histogram.buckets, cumulative):
+            lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+        lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
@@ -1,26 +1,72 @@
 import json
+from typing import Optional
 
 from aiohttp import web
 
+from aioapi.cache import LRUCache
 from aioapi.exceptions import HTTPBadRequest
+from aioapi.jsonlib import get_backend
+from aioapi.response_cache import RESPONSE_CACHE_KEY
 
-__all__ = ("validation_error_middleware",)
-
-
-@web.middleware
-async def validation_error_middleware(request, handler):
-    try:
-        resp = await handler(request)
-    except HTTPBadRequest as e:
-        raise web.HTTPBadRequest(
-            content_type="application/json",
-            text=json.dumps(
-                {
-                    "type": "validation_error",
-                    "title": "Your request parameters didn't validate.",
-                    "invalid_params": e.validation_error.errors(),
-                }
-            ),
-        )
-
-    return resp
+__all__ = (
+    "create_validation_error_middleware",
+    "response_cache_middleware",
+    "validation_error_middleware",
+)
+
+RESPONSE_CACHE_MAXSIZE = 1024
+RESPONSE_CACHE_MAXBYTES = 64 * 1024 * 1024
+
+
+VALIDATION_ERROR_TITLE = "Your request parameters didn't validate."
+
+
+def create_validation_error_middleware(
+    *, max_errors: Optional[int] = None, json_backend: Optional[str] = None
+):
+    # The envelope never changes, so only errors are encoded per request. The
+    # response is returned instead of raising another exception.
+    prefix = (
+        b'{"type":"validation_error","title":'
+        + json.dumps(VALIDATION_ERROR_TITLE).encode()
+        + b',"invalid_params":'
+    )
+    suffix = b"}"
+
+    @web.middleware
+    async def middleware(request, handler):
+        try:
+            return await handler(request)
+        except HTTPBadRequest as e:
+            errors = e.errors()
+            if max_errors is not None:
+                errors = errors[:max_errors]
+
+            return web.Response(
+                status=400,
+                body=prefix + get_backend(json_backend).dumps(errors) + suffix,
+                content_type="application/json",
+            )
+
+    return middleware
+
+
+validation_error_middleware = create_validation_error_middleware()
+
+
+def response_cache_middleware(
+    *,
+    maxsize: int = RESPONSE_CACHE_MAXSIZE,
+    maxbytes: Optional[int] = RESPONSE_CACHE_MAXBYTES,
+):
+    cache = LRUCache(maxsize=maxsize, maxbytes=maxbytes)
+
+    @web.middleware
+    async def middleware(request, handler):
+        # Routes declared with `response_cache_ttl` look the cache up themselves,
+        # right after their parameters are validated.
+        request[RESPONSE_CACHE_KEY] = cache
+        return await handler(request)
+
+    middleware.cache = cache  # type: ignore
+    return middleware
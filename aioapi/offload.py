@@ -0,0 +1,30 @@
+from typing import Any, Optional, Tuple
+
+from aioapi.engines import get_engine
+from aioapi.jsonlib import get_backend
+
+__all__ = ("DECODED", "MALFORMED", "VALIDATED", "decode_and_validate")
+
+VALIDATED = "validated"
+DECODED = "decoded"
+MALFORMED = "malformed"
+
+
+def decode_and_validate(
+    data: bytes, backend_name: str, type_: Any, engine_name: Optional[str] = None
+) -> Tuple[str, Any]:
+    # Runs in an executor, possibly in another process, so everything passed in
+    # and out must be picklable: raw bytes, names of a JSON backend and of
+    # a validation engine and a body type come in, a validated body comes out.
+    # Validation errors are rare, so instead of errors, which are not picklable,
+    # decoded data is returned to be validated once more by the caller.
+    try:
+        decoded = get_backend(backend_name).loads(data)
+    except ValueError:
+        return MALFORMED, None
+
+    engine = get_engine(engine_name)
+    try:
+        return VALIDATED, engine.validator(type_)(decoded)
+    except engine.error_type:
+        return DECODED, decoded
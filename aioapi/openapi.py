@@ -0,0 +1,355 @@
+import gzip
+import hashlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from aiohttp import hdrs, web
+from aiohttp.abc import AbstractView
+from pydantic import BaseModel, create_model
+
+from aioapi.adapters import field_types_of, models_schemas
+from aioapi.compression import negotiate_encoding
+from aioapi.forms import FORM_CONTENT_TYPES
+from aioapi.inspect.entities import HandlerMeta
+from aioapi.inspect.inspector import (
+    header_name,
+    inspect_param_inner_type,
+    is_model,
+    param_of,
+)
+from aioapi.jsonlib import get_backend
+from aioapi.middlewares import VALIDATION_ERROR_TITLE
+from aioapi.response_cache import etag_matches
+from aioapi.streams import NDJSON_CONTENT_TYPES
+from aioapi.typedefs import File
+
+__all__ = (
+    "OPENAPI_VERSION",
+    "OpenAPIDocument",
+    "build_openapi",
+    "setup_openapi",
+)
+
+OPENAPI_VERSION = "3.0.3"
+
+REF_PREFIX = "#/components/schemas/"
+
+VALIDATION_ERROR_SCHEMA = {
+    "title": "ValidationError",
+    "type": "object",
+    "properties": {
+        "type": {"type": "string", "enum": ["validation_error"]},
+        "title": {"type": "string", "example": VALIDATION_ERROR_TITLE},
+        "invalid_params": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "loc": {
+                        "type": "array",
+                        "items": {"oneOf": [{"type": "string"}, {"type": "integer"}]},
+                    },
+                    "msg": {"type": "string"},
+                    "type": {"type": "string"},
+                },
+                "required": ["loc", "msg", "type"],
+            },
+        },
+    },
+    "required": ["type", "title", "invalid_params"],
+}
+
+_PARAM_SOURCES = ("path", "query", "header", "cookie")
+
+_NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+@dataclass(frozen=True)
+class OpenAPIDocument:
+    # A document is serialized and compressed once, responses just pick one of
+    # prepared representations.
+    body: bytes
+    etag: str
+    gzipped_body: bytes
+    gzipped_etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "OpenAPIDocument":
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(
+            body=body,
+            etag=f'"{digest}"',
+            gzipped_body=gzip.compress(body, compresslevel=9, mtime=0),
+            gzipped_etag=f'"{digest}-gzip"',
+        )
+
+    def to_response(self, request: web.Request) -> web.Response:
+        gzipped = (
+            negotiate_encoding(request.headers.get(hdrs.ACCEPT_ENCODING), ("gzip",))
+            is not None
+        )
+        etag = self.gzipped_etag if gzipped else self.etag
+        headers: Dict[str, str] = {hdrs.ETAG: etag, hdrs.VARY: hdrs.ACCEPT_ENCODING}
+        if etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), etag):
+            return web.Response(status=304, headers=headers)
+
+        if gzipped:
+            headers[hdrs.CONTENT_ENCODING] = "gzip"
+        return web.Response(
+            body=self.gzipped_body if gzipped else self.body,
+            content_type="application/json",
+            headers=headers,
+        )
+
+
+def setup_openapi(
+    app: web.Application,
+    *,
+    title: str,
+    version: str,
+    description: Optional[str] = None,
+    path: str = "/openapi.json",
+    json_backend: Optional[str] = None,
+) -> None:
+    # Routes can't be changed once an application is frozen, so the document is
+    # built on startup and served as is until the application is stopped.
+    dumps = get_backend(json_backend).dumps
+    document: Optional[OpenAPIDocument] = None
+
+    def build() -> OpenAPIDocument:
+        return OpenAPIDocument.from_body(
+            dumps(
+                build_openapi(
+                    app, title=title, version=version, description=description
+                )
+            )
+        )
+
+    async def on_startup(app: web.Application) -> None:
+        nonlocal document
+        document = build()
+
+    async def handler(request: web.Request) -> web.Response:
+        # Until the application is frozen routes may still be added, so there is
+        # nothing to keep.
+        return (document or build()).to_response(request)
+
+    app.router.add_get(path, handler)
+    app.on_startup.append(on_startup)
+
+
+def build_openapi(
+    app: web.Application,
+    *,
+    title: str,
+    version: str,
+    description: Optional[str] = None,
+) -> Dict[str, Any]:
+    operations = list(_iter_operations(app))
+
+    # Models of all operations are processed together, so models sharing a name
+    # get unique names in components.
+    models: List[Type[BaseModel]] = [
+        model for _, _, _, op_models in operations for model in op_models.values()
+    ]
+    model_schemas, schemas = models_schemas(models, ref_prefix=REF_PREFIX)
+    schema_of = model_schemas.__getitem__
+
+    paths: Dict[str, Dict[str, Any]] = {}
+    operation_ids: Set[str] = set()
+    for method, path, meta, op_models in operations:
+        operation = _build_operation(
+            meta, op_models, schema_of, operation_id=_unique(meta.name, operation_ids)
+        )
+        if "400" in operation["responses"]:
+            schemas["ValidationError"] = VALIDATION_ERROR_SCHEMA
+        paths.setdefault(path, {})[method.lower()] = operation
+
+    info = {"title": title, "version": version}
+    if description is not None:
+        info["description"] = description
+
+    document: Dict[str, Any] = {
+        "openapi": OPENAPI_VERSION,
+        "info": info,
+        "paths": paths,
+    }
+    if schemas:
+        document["components"] = {"schemas": dict(sorted(schemas.items()))}
+
+    return document
+
+
+def _iter_operations(
+    app: web.Application,
+) -> Iterator[Tuple[str, str, HandlerMeta, Dict[str, Type[BaseModel]]]]:
+    handlers = [
+        (method, route.resource.canonical, handler)
+        for route in app.router.routes()
+        if route.resource is not None
+        for method, handler in _iter_route_handlers(route)
+    ]
+    # Routes declared with `allow_head` share their handler with an additional
+    # `HEAD` route, such routes are documented only once.
+    gets = {(path, h) for method, path, h in handlers if method == hdrs.METH_GET}
+
+    for method, path, handler in handlers:
+        if method == hdrs.METH_HEAD and (path, handler) in gets:
+            continue
+
+        warmup = getattr(handler, "warmup", None)
+        if warmup is not None:
+            handler = warmup()
+        meta: Optional[HandlerMeta] = getattr(handler, "handler_meta", None)
+        # Schemas are built by `pydantic`, so routes validated by other engines
+        # are not documented.
+        if meta is not None and (
+            meta.request_type is None or is_model(meta.request_type)
+        ):
+            yield method, path, meta, _models_of(meta)
+
+
+def _iter_route_handlers(
+    route: web.AbstractRoute,
+) -> Iterator[Tuple[str, Callable[..., Any]]]:
+    handler = route.handler
+    if isinstance(handler, type) and issubclass(handler, AbstractView):
+        for method in hdrs.METH_ALL:
+            method_handler = getattr(handler, method.lower(), None)
+            if method_handler is not None:
+                yield method, method_handler
+    else:
+        yield route.method, handler
+
+
+def _models_of(meta: HandlerMeta) -> Dict[str, Type[BaseModel]]:
+    # Every part of an operation is described by a model, so `pydantic` builds
+    # all schemas and references between them.
+    models: Dict[str, Type[BaseModel]] = {}
+    for source in _PARAM_SOURCES:
+        mapping = getattr(meta, f"request_{source}_mapping")
+        if mapping:
+            models[source] = create_model(source.title(), **mapping)  # type: ignore
+    if meta.request_body_pair is not None:
+        models["body"] = create_model(
+            "Body", body=meta.request_body_pair[1]  # type: ignore
+        )
+    elif meta.request_body_stream_pair is not None:
+        models["body"] = create_model(
+            "Body", body=(meta.request_body_stream_pair[1], ...)  # type: ignore
+        )
+    response_type = meta.response_type
+    if param_of(type_=response_type, is_=AsyncIterator):
+        response_type = _response_item_type(response_type)
+    if response_type is not None:
+        models["response"] = create_model(
+            "Response", response=(response_type, ...)  # type: ignore
+        )
+
+    return models
+
+
+def _build_operation(
+    meta: HandlerMeta,
+    models: Dict[str, Type[BaseModel]],
+    schema_of: Callable[[Type[BaseModel]], Dict[str, Any]],
+    *,
+    operation_id: str,
+) -> Dict[str, Any]:
+    operation: Dict[str, Any] = {"operationId": operation_id}
+
+    parameters = []
+    for source in _PARAM_SOURCES:
+        model = models.get(source)
+        if model is None:
+            continue
+
+        schema = schema_of(model)
+        required = set(schema.get("required", ()))
+        for k, param_schema in schema["properties"].items():
+            parameters.append(
+                {
+                    "name": header_name(k) if source == "header" else k,
+                    "in": source,
+                    "required": source == "path" or k in required,
+                    "schema": param_schema,
+                }
+            )
+    if parameters:
+        operation["parameters"] = parameters
+
+    if "body" in models:
+        schema = schema_of(models["body"])
+        operation["requestBody"] = {
+            "required": "body" in schema.get("required", ()),
+            "content": _body_content(meta, schema["properties"]["body"]),
+        }
+
+    responses: Dict[str, Any] = {"200": {"description": "Successful response"}}
+    if "response" in models:
+        schema = schema_of(models["response"])["properties"]["response"]
+        if param_of(type_=meta.response_type, is_=AsyncIterator):
+            content = _stream_content(schema)
+        else:
+            content = {"application/json": {"schema": schema}}
+        responses["200"]["content"] = content
+    if meta.request_type is not None or meta.request_body_stream_pair is not None:
+        responses["400"] = {
+            "description": "Validation error",
+            "content": {
+                "application/json": {"schema": {"$ref": f"{REF_PREFIX}ValidationError"}}
+            },
+        }
+    operation["responses"] = responses
+
+    return operation
+
+
+def _body_content(meta: HandlerMeta, schema: Dict[str, Any]) -> Dict[str, Any]:
+    if meta.request_body_stream_pair is not None:
+        return {
+            "application/json": {"schema": {"type": "array", "items": schema}},
+            **{
+                content_type: {"schema": schema}
+                for content_type in sorted(NDJSON_CONTENT_TYPES)
+            },
+        }
+
+    if meta.request_body_form:
+        form_type = meta.request_body_pair[1][0]  # type: ignore
+        has_files = File in field_types_of(form_type)
+        # Files can be uploaded only using multipart forms.
+        content_types = (
+            ("multipart/form-data",) if has_files else sorted(FORM_CONTENT_TYPES)
+        )
+        return {content_type: {"schema": schema} for content_type in content_types}
+
+    return {"application/json": {"schema": schema}}
+
+
+def _stream_content(schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "application/json": {"schema": {"type": "array", "items": schema}},
+        _NDJSON_CONTENT_TYPE: {"schema": schema},
+    }
+
+
+def _response_item_type(type_: Any) -> Optional[Any]:
+    # Streamed responses are documented by their items, items of streams of
+    # arbitrary objects can't be described.
+    item_type = inspect_param_inner_type(type_)
+    return item_type if is_model(item_type) else None
+
+
+def _unique(name: str, names: Set[str]) -> str:
+    # The same handler may be served on several paths, while operation ids must
+    # be unique within a document.
+    unique_name = name
+    i = 1
+    while unique_name in names:
+        i += 1
+        unique_name = f"{name}_{i}"
+    names.add(unique_name)
+
+    return unique_name
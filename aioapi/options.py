@@ -0,0 +1,71 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+from aioapi.metrics import MetricsSink
+
+__all__ = (
+    "COMPRESS_MIN_SIZE",
+    "COMPRESS_OFFLOAD_MIN_SIZE",
+    "OFFLOAD_MIN_SIZE",
+    "HandlerOptions",
+    "HandlerOptionsConflictError",
+    "split_options",
+)
+
+OFFLOAD_MIN_SIZE = 256 * 1024
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_OFFLOAD_MIN_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True)
+class HandlerOptions:
+    lazy: bool = False
+    flat_validation: bool = False
+    json_backend: Optional[str] = None
+    validation_engine: Optional[str] = None
+    validation_cache_size: int = 0
+    validation_cache_ttl: Optional[float] = None
+    response_cache_ttl: Optional[float] = None
+    response_cache_headers: Tuple[str, ...] = ()
+    body_max_size: Optional[int] = None
+    offload_executor: Optional[Executor] = None
+    offload_min_size: int = OFFLOAD_MIN_SIZE
+    compress: bool = False
+    compress_min_size: int = COMPRESS_MIN_SIZE
+    compress_offload_min_size: int = COMPRESS_OFFLOAD_MIN_SIZE
+    metrics_sink: Optional[MetricsSink] = None
+
+
+class HandlerOptionsConflictError(Exception):
+    # Raised when a handler wrapped in place, e.g. a class-based view, is routed
+    # again with different options.
+    __slots__ = ("_handler",)
+
+    @property
+    def handler(self) -> str:
+        return self._handler
+
+    def __init__(self, *, handler: str) -> None:
+        self._handler = handler
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} handler={self._handler}>"
+
+
+_HANDLER_OPTIONS_NAMES = frozenset(f.name for f in fields(HandlerOptions))
+
+
+def split_options(kwargs: Dict[str, Any]) -> Tuple[HandlerOptions, Dict[str, Any]]:
+    options = {}
+    rest = {}
+    for k, v in kwargs.items():
+        if k in _HANDLER_OPTIONS_NAMES:
+            options[k] = v
+        else:
+            rest[k] = v
+
+    return HandlerOptions(**options), rest
@@ -0,0 +1,190 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from aiohttp import hdrs, web
+from multidict import istr
+from pydantic import BaseModel
+
+from aioapi.cache import LRUCache
+from aioapi.inspect.entities import HandlerMeta
+from aioapi.inspect.exceptions import HandlerResponseCacheError
+from aioapi.inspect.inspector import header_name
+from aioapi.options import HandlerOptions
+
+__all__ = (
+    "RESPONSE_CACHE_KEY",
+    "CachedResponse",
+    "Responder",
+    "compile_response_cache",
+    "etag_matches",
+)
+
+RESPONSE_CACHE_KEY = "aioapi_response_cache"
+
+Responder = Callable[
+    [web.Request, tuple, Dict[str, Any]], Awaitable[web.StreamResponse]
+]
+
+_CACHEABLE_HEADERS = frozenset((hdrs.CONTENT_TYPE, hdrs.ETAG))
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    content_type: str
+    charset: Optional[str] = None
+
+    def to_response(self) -> web.Response:
+        return web.Response(
+            body=self.body,
+            content_type=self.content_type,
+            charset=self.charset,
+            headers={hdrs.ETAG: self.etag},
+        )
+
+
+def compile_response_cache(
+    respond: Responder, meta: HandlerMeta, *, options: HandlerOptions
+) -> Responder:
+    # Responses are cached using validated parameters, so e.g. `/users/01` and
+    # `/users/1` share the same entry. Cache itself is shared by all routes of an
+    # application and installed by `response_cache_middleware`.
+    _check_cacheable(meta, options)
+    name = meta.name
+    ttl = options.response_cache_ttl
+    validated_keys = tuple(
+        (
+            *((meta.request_body_pair[0],) if meta.request_body_pair else ()),
+            *(meta.request_path_mapping or ()),
+            *(meta.request_query_mapping or ()),
+            *(meta.request_header_mapping or ()),
+            *(meta.request_cookie_mapping or ()),
+        )
+    )
+    header_names = tuple(istr(h) for h in options.response_cache_headers)
+    # Responses differ by keyed headers, header and cookie parameters, so do
+    # representations kept by other caches, e.g. browsers and proxies.
+    vary_names = (
+        *header_names,
+        *(header_name(k) for k in meta.request_header_mapping or ()),
+        *((hdrs.COOKIE,) if meta.request_cookie_mapping else ()),
+    )
+    # Header names are case-insensitive, the first spelling of a name is kept.
+    unique_vary_names: Dict[str, str] = {}
+    for h in vary_names:
+        unique_vary_names.setdefault(h.lower(), h)
+    vary = ", ".join(unique_vary_names.values())
+
+    async def respond_cached(
+        request: web.Request, args: tuple, kwargs: Dict[str, Any]
+    ) -> web.StreamResponse:
+        cache: Optional[LRUCache] = request.get(RESPONSE_CACHE_KEY)
+        if cache is None:
+            return await respond(request, args, kwargs)
+
+        headers = request.headers
+        key = (
+            name,
+            tuple(freeze(kwargs[k].cleaned) for k in validated_keys),
+            tuple(headers.get(h) for h in header_names),
+        )
+        try:
+            cached = cache.get(key)
+        except TypeError:
+            # Some of validated values are not hashable.
+            return await respond(request, args, kwargs)
+
+        if cached is None:
+            resp = await respond(request, args, kwargs)
+            cached = to_cached_response(resp)
+            if cached is None:
+                return resp
+
+            cache.set(key, cached, nbytes=len(cached.body), ttl=ttl)
+            resp.headers[hdrs.ETAG] = cached.etag
+        else:
+            resp = cached.to_response()
+
+        if etag_matches(headers.get(hdrs.IF_NONE_MATCH), cached.etag):
+            resp = web.Response(status=304, headers={hdrs.ETAG: cached.etag})
+        if vary:
+            resp.headers[hdrs.VARY] = vary
+
+        return resp
+
+    return respond_cached
+
+
+def _check_cacheable(meta: HandlerMeta, options: HandlerOptions) -> None:
+    # Cache keys consist of validated parameters and declared headers only. The
+    # request itself and values of request scoped dependencies may depend on
+    # anything, so they are allowed only if a route declares headers responses
+    # depend on. Application scoped dependencies are the same for all requests.
+    # Streamed bodies and forms, whose files are read lazily, are never cached.
+    if meta.request_body_stream_pair is not None:
+        raise HandlerResponseCacheError(
+            handler=meta.name, param=meta.request_body_stream_pair[0]
+        )
+    if meta.request_body_form and meta.request_body_pair is not None:
+        raise HandlerResponseCacheError(
+            handler=meta.name, param=meta.request_body_pair[0]
+        )
+    if options.response_cache_headers:
+        return
+
+    for param, type_ in (meta.components_mapping or {}).items():
+        if type_ is web.Request:
+            raise HandlerResponseCacheError(handler=meta.name, param=param)
+    for param, depends in (meta.dependencies_mapping or {}).items():
+        if depends.scope == "request":
+            raise HandlerResponseCacheError(handler=meta.name, param=param)
+
+
+def to_cached_response(resp: web.StreamResponse) -> Optional[CachedResponse]:
+    # Only plain successful responses are cached, anything with cookies or custom
+    # headers may depend on things we know nothing about.
+    if (
+        type(resp) is not web.Response
+        or resp.status != 200
+        or resp.cookies
+        or not isinstance(resp.body, bytes)
+        or not _CACHEABLE_HEADERS.issuperset(resp.headers)
+    ):
+        return None
+
+    body = resp.body
+    return CachedResponse(
+        body=body,
+        etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        content_type=resp.content_type,
+        charset=resp.charset,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+
+    return False
+
+
+def freeze(value: Any) -> Hashable:
+    if isinstance(value, BaseModel):
+        return (type(value), freeze(value.__dict__))
+    if isinstance(value, dict):
+        return tuple((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(freeze(v) for v in value)
+
+    return value
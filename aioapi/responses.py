@@ -0,0 +1,105 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from aiohttp import hdrs, web
+from aiohttp.abc import AbstractStreamWriter
+from aiohttp.typedefs import LooseHeaders
+
+from aioapi.streams import NDJSON_CONTENT_TYPES
+
+__all__ = ("JSONStreamResponse",)
+
+STREAM_BATCH_SIZE = 64 * 1024
+
+
+class JSONStreamResponse(web.StreamResponse):
+    # Like `web.FileResponse` the response writes its body on `prepare`, so it can
+    # be returned from handlers and middlewares as any other response. Items are
+    # framed as a JSON array or, if client accepts it, as newline delimited JSON.
+    def __init__(
+        self,
+        items: AsyncIterator[Any],
+        *,
+        dumps: Callable[[Any], bytes],
+        status: int = 200,
+        reason: Optional[str] = None,
+        headers: Optional[LooseHeaders] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> None:
+        super().__init__(status=status, reason=reason, headers=headers)
+        self._items = items
+        self._dumps = dumps
+        self._batch_size = batch_size
+        self._cleanups: List[Callable[[], Awaitable[None]]] = []
+
+    def add_cleanup(self, cleanup: Callable[[], Awaitable[None]]) -> None:
+        # Items are produced while the body is written, so resources they use,
+        # e.g. dependencies of a handler, are released only once it is written.
+        self._cleanups.append(cleanup)
+
+    async def prepare(self, request: web.BaseRequest) -> Optional[AbstractStreamWriter]:
+        if self.prepared:
+            return await super().prepare(request)
+
+        ndjson = accepts_ndjson(request)
+        self.content_type = "application/x-ndjson" if ndjson else "application/json"
+
+        try:
+            writer = await super().prepare(request)
+            if ndjson:
+                await self._write_items(b"", b"\n", b"\n")
+            else:
+                await self._write_items(b"[", b",", b"]")
+        finally:
+            await self._run_cleanups()
+
+        return writer
+
+    async def _run_cleanups(self) -> None:
+        # Cleanups are run in order they are added, the same order `finally`
+        # blocks of nested responders run in.
+        error = None
+        for cleanup in self._cleanups:
+            try:
+                await cleanup()
+            except Exception as e:
+                error = error or e
+
+        self._cleanups.clear()
+        if error is not None:
+            raise error
+
+    async def _write_items(self, start: bytes, separator: bytes, end: bytes) -> None:
+        dumps = self._dumps
+        batch_size = self._batch_size
+
+        # Small items are batched to avoid a syscall per item, `write` waits for
+        # the transport to drain once its buffer is full.
+        batch = [start]
+        batch_len = 0
+        item_separator = b""
+        async for item in self._items:
+            encoded = dumps(item)
+            batch.append(item_separator)
+            batch.append(encoded)
+            batch_len += len(encoded)
+            item_separator = separator
+
+            if batch_len >= batch_size:
+                await self.write(b"".join(batch))
+                batch.clear()
+                batch_len = 0
+
+        batch.append(end)
+        await self.write(b"".join(batch))
+
+
+def accepts_ndjson(request: web.BaseRequest) -> bool:
+    accept = request.headers.get(hdrs.ACCEPT)
+    if not accept:
+        return False
+
+    for media_range in accept.split(","):
+        if media_range.split(";", 1)[0].strip() in NDJSON_CONTENT_TYPES:
+            return True
+
+    return False
@@ -5,6 +5,7 @@ from aiohttp.abc import AbstractView
 from aiohttp.web_routedef import RouteDef, _HandlerType
 
 from aioapi import handlers
+from aioapi.options import split_options
 
 __all__ = ("head", "options", "get", "post", "put", "patch", "delete", "view")
 
@@ -51,4 +52,5 @@ def view(path: str, handler: Type[AbstractView], **kwargs: Any) -> RouteDef:
 
 
 def route(method: str, path: str, handler: _HandlerType, **kwargs: Any) -> RouteDef:
-    return RouteDef(method, path, handlers.wraps(handler), kwargs)
+    options, kwargs = split_options(kwargs)
+    return RouteDef(method, path, handlers.wraps(handler, options=options), kwargs)
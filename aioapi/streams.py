@@ -0,0 +1,172 @@
+import re
+from typing import Any, AsyncIterator, Callable, List
+
+__all__ = (
+    "NDJSON_CONTENT_TYPES",
+    "JSONArraySplitter",
+    "iter_json_array",
+    "iter_ndjson",
+)
+
+NDJSON_CONTENT_TYPES = frozenset(
+    ("application/x-ndjson", "application/ndjson", "application/jsonl")
+)
+
+_Loads = Callable[[bytes], Any]
+
+_TOKEN_RE = re.compile(rb'[\[\]{}",]')
+_STRING_TOKEN_RE = re.compile(rb'["\\]')
+_WHITESPACE = b" \t\r\n"
+
+
+class JSONArraySplitter:
+    # Splits a top-level JSON array into raw items as bytes arrive, so only the
+    # item being received is kept in memory. Items themselves are not parsed,
+    # it's up to the caller to decode them with a JSON backend.
+    __slots__ = (
+        "_buf",
+        "_pos",
+        "_item_start",
+        "_depth",
+        "_in_string",
+        "_started",
+        "_finished",
+        "_items_count",
+    )
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+        self._item_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._started = False
+        self._finished = False
+        self._items_count = 0
+
+    def feed(self, data: bytes) -> List[bytes]:
+        if self._finished:
+            if data.strip(_WHITESPACE):
+                raise ValueError("Unexpected data after JSON array")
+
+            return []
+
+        items: List[bytes] = []
+        buf = self._buf
+        buf += data
+
+        pos = self._pos
+        while pos < len(buf):
+            if self._in_string:
+                pos = self._skip_string(pos)
+                continue
+
+            m = _TOKEN_RE.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+
+            pos = m.start()
+            token = m.group()
+            if not self._started:
+                if token != b"[" or buf[:pos].strip(_WHITESPACE):
+                    raise ValueError("JSON array expected")
+
+                self._started = True
+                self._item_start = pos + 1
+            elif token == b'"':
+                self._in_string = True
+            elif token in b"[{":
+                self._depth += 1
+            elif self._depth:
+                if token in b"]}":
+                    self._depth -= 1
+            elif token == b",":
+                items.append(self._pop_item(pos, allow_empty=False))
+            elif token == b"]":
+                self._finish(pos, items)
+                return items
+            else:
+                raise ValueError("Unexpected end of JSON object")
+
+            pos += 1
+
+        # Drop everything that has been already split out.
+        if not self._started:
+            if buf.strip(_WHITESPACE):
+                raise ValueError("JSON array expected")
+
+            self._item_start = len(buf)
+        del buf[: self._item_start]
+        self._pos = pos - self._item_start
+        self._item_start = 0
+
+        return items
+
+    def _skip_string(self, pos: int) -> int:
+        m = _STRING_TOKEN_RE.search(self._buf, pos)
+        if m is None:
+            return len(self._buf)
+
+        if m.group() == b"\\":
+            # Skip escaped character, it may be a quote.
+            return m.end() + 1
+
+        self._in_string = False
+        return m.end()
+
+    def _finish(self, pos: int, items: List[bytes]) -> None:
+        item = self._pop_item(pos, allow_empty=not self._items_count)
+        if item:
+            items.append(item)
+        if self._buf[pos + 1 :].strip(_WHITESPACE):
+            raise ValueError("Unexpected data after JSON array")
+
+        self._finished = True
+        self._buf.clear()
+        self._pos = self._item_start = 0
+
+    def close(self) -> None:
+        if not self._finished:
+            raise ValueError("Unexpected end of JSON array")
+
+    def _pop_item(self, pos: int, *, allow_empty: bool) -> bytes:
+        item = bytes(self._buf[self._item_start : pos]).strip(_WHITESPACE)
+        if not item and not allow_empty:
+            raise ValueError("Empty JSON array item")
+
+        self._item_start = pos + 1
+        self._items_count += 1
+
+        return item
+
+
+async def iter_json_array(
+    chunks: AsyncIterator[bytes], loads: _Loads
+) -> AsyncIterator[Any]:
+    splitter = JSONArraySplitter()
+    async for chunk in chunks:
+        for item in splitter.feed(chunk):
+            yield loads(item)
+
+    splitter.close()
+
+
+async def iter_ndjson(
+    chunks: AsyncIterator[bytes], loads: _Loads
+) -> AsyncIterator[Any]:
+    buf = bytearray()
+    async for chunk in chunks:
+        buf += chunk
+        end = buf.rfind(b"\n")
+        if end == -1:
+            continue
+
+        lines = bytes(buf[:end]).split(b"\n")
+        del buf[: end + 1]
+        for line in lines:
+            if line.strip(_WHITESPACE):
+                yield loads(line)
+
+    if buf.strip(_WHITESPACE):
+        yield loads(bytes(buf))
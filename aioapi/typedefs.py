@@ -1,11 +1,24 @@
-from typing import Generic, TypeVar
+from typing import IO, Any, Callable, Dict, Generic, Iterator, Optional, TypeVar
 
-__all__ = ("Body", "PathParam", "QueryParam")
+__all__ = (
+    "Body",
+    "BodyLimit",
+    "CookieParam",
+    "Depends",
+    "File",
+    "Form",
+    "HeaderParam",
+    "PathParam",
+    "QueryParam",
+)
 
 
 TVBody = TypeVar("TVBody")
+TVForm = TypeVar("TVForm")
 TVPathParam = TypeVar("TVPathParam")
 TVQueryParam = TypeVar("TVQueryParam")
+TVHeaderParam = TypeVar("TVHeaderParam")
+TVCookieParam = TypeVar("TVCookieParam")
 
 
 class Body(Generic[TVBody]):
@@ -22,6 +35,137 @@ class Body(Generic[TVBody]):
         return f"<Body({self._cleaned})>"
 
 
+class Form(Generic[TVForm]):
+    __slots__ = ("_cleaned",)
+
+    @property
+    def cleaned(self) -> TVForm:
+        return self._cleaned
+
+    def __init__(self, cleaned: TVForm) -> None:
+        self._cleaned = cleaned
+
+    def __str__(self) -> str:
+        return f"<Form({self._cleaned})>"
+
+
+class File:
+    # An uploaded file, a field type of form models. Content is spooled to
+    # a temporary file as it's received, so uploads are never buffered whole.
+    __slots__ = ("_filename", "_content_type", "_size", "_file")
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self._filename
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self._content_type
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def file(self) -> IO[bytes]:
+        return self._file
+
+    def __init__(
+        self,
+        *,
+        file: IO[bytes],
+        size: int,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> None:
+        self._file = file
+        self._size = size
+        self._filename = filename
+        self._content_type = content_type
+
+    def __str__(self) -> str:
+        return f"<File({self._filename}, {self._size})>"
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def close(self) -> None:
+        self._file.close()
+
+    @classmethod
+    def __get_validators__(cls) -> Iterator[Callable[[Any], "File"]]:
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: Any) -> "File":
+        if not isinstance(value, cls):
+            raise TypeError("file expected")
+
+        return value
+
+    @classmethod
+    def __modify_schema__(cls, field_schema: Dict[str, Any]) -> None:
+        field_schema.update(type="string", format="binary")
+
+    # Hooks of `pydantic` v2, the ones above are used by `pydantic` v1.
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        from pydantic_core import core_schema
+
+        # Plain validators of `pydantic` v2 can't raise `TypeError`, so the error
+        # of `validate` is reproduced by a custom one.
+        return core_schema.custom_error_schema(
+            core_schema.is_instance_schema(cls),
+            "type_error",
+            custom_error_message="file expected",
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> Dict[str, Any]:
+        return {"type": "string", "format": "binary"}
+
+
+class Depends:
+    # Used as a default value of a handler parameter, e.g.
+    # `db: Pool = Depends(get_db, scope="app")`. Results of providers are cached
+    # per request, or per application for `app` scope.
+    __slots__ = ("_provider", "_scope")
+
+    @property
+    def provider(self) -> Callable[..., Any]:
+        return self._provider
+
+    @property
+    def scope(self) -> str:
+        return self._scope
+
+    def __init__(self, provider: Callable[..., Any], *, scope: str = "request") -> None:
+        if scope not in ("request", "app"):
+            raise ValueError(f"Unknown dependency scope: {scope}")
+
+        self._provider = provider
+        self._scope = scope
+
+    def __repr__(self) -> str:
+        return f"Depends({self._provider!r}, scope={self._scope!r})"
+
+
+class BodyLimit:
+    # Used as `Annotated` metadata of a body type, e.g.
+    # `Body[Annotated[User, BodyLimit(max_size=1024)]]`.
+    __slots__ = ("_max_size",)
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def __init__(self, *, max_size: int) -> None:
+        self._max_size = max_size
+
+    def __repr__(self) -> str:
+        return f"BodyLimit(max_size={self._max_size})"
+
+
 class PathParam(Generic[TVPathParam]):
     __slots__ = ("_cleaned",)
 
@@ -48,3 +192,31 @@ class QueryParam(Generic[TVQueryParam]):
 
     def __str__(self) -> str:
         return f"<QueryParam({self._cleaned})>"
+
+
+class HeaderParam(Generic[TVHeaderParam]):
+    __slots__ = ("_cleaned",)
+
+    @property
+    def cleaned(self) -> TVHeaderParam:
+        return self._cleaned
+
+    def __init__(self, cleaned: TVHeaderParam) -> None:
+        self._cleaned = cleaned
+
+    def __str__(self) -> str:
+        return f"<HeaderParam({self._cleaned})>"
+
+
+class CookieParam(Generic[TVCookieParam]):
+    __slots__ = ("_cleaned",)
+
+    @property
+    def cleaned(self) -> TVCookieParam:
+        return self._cleaned
+
+    def __init__(self, cleaned: TVCookieParam) -> None:
+        self._cleaned = cleaned
+
+    def __str__(self) -> str:
+        return f"<CookieParam({self._cleaned})>"
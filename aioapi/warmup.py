@@ -0,0 +1,56 @@
+import gc
+from typing import Any, Callable, Dict, Iterator
+
+from aiohttp import hdrs, web
+from aiohttp.abc import AbstractView
+
+__all__ = ("WARMUP_TIMINGS_KEY", "prefork", "setup_warmup", "warmup_handlers")
+
+WARMUP_TIMINGS_KEY = "aioapi_warmup_timings"
+
+
+def setup_warmup(app: web.Application) -> None:
+    async def on_startup(app: web.Application) -> None:
+        app[WARMUP_TIMINGS_KEY] = warmup_handlers(app)
+
+    app.on_startup.append(on_startup)
+
+
+def prefork(app: web.Application) -> Dict[str, float]:
+    # Meant to be called in a master process before workers are forked, e.g. from
+    # gunicorn's `when_ready` hook with `preload_app` enabled. Compiled handlers
+    # and models are moved to the permanent generation, so garbage collection in
+    # workers doesn't touch them and they stay shared between processes.
+    timings = warmup_handlers(app)
+    gc.collect()
+    gc.freeze()
+
+    return timings
+
+
+def warmup_handlers(app: web.Application) -> Dict[str, float]:
+    # Compiles handlers of routes declared with `lazy=True` and returns time spent
+    # to compile every handler of the application, including eager ones.
+    timings = {}
+    for handler in _iter_handlers(app):
+        warmup = getattr(handler, "warmup", None)
+        if warmup is not None:
+            handler = warmup()
+
+        meta = getattr(handler, "handler_meta", None)
+        if meta is not None:
+            timings[meta.name] = handler.compile_time  # type: ignore
+
+    return timings
+
+
+def _iter_handlers(app: web.Application) -> Iterator[Callable[..., Any]]:
+    for route in app.router.routes():
+        handler = route.handler
+        if isinstance(handler, type) and issubclass(handler, AbstractView):
+            for method in hdrs.METH_ALL:
+                method_handler = getattr(handler, method.lower(), None)
+                if method_handler is not None:
+                    yield method_handler
+        else:
+            yield handler
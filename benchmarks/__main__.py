@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.pipeline import CASES, run
+
+METRICS = ("rps", "p50", "p90", "p99", "peak_kib", "blocks")
+# Lower is better for every metric, but requests per second.
+HIGHER_IS_BETTER = frozenset(("rps",))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument("-k", "--cases", nargs="*", help="run only given cases")
+    parser.add_argument("--save", metavar="PATH", help="save results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative regression of p50 and peak memory, 0.1 by default",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args.cases, requests=args.requests))
+    baseline = _load(args.compare) if args.compare else None
+
+    regressions = _report(results, baseline, tolerance=args.tolerance)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+async def _run(names, *, requests):
+    results = {}
+    for case in CASES:
+        if names and case.name not in names:
+            continue
+
+        case_results = await run(case, requests=requests)
+        results[case.name] = {k: v.asdict() for k, v in case_results.items()}
+
+    return results
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _report(results, baseline, *, tolerance):
+    print(
+        f"{'case':<12}{'handler':<9}{'rps':>9}{'p50 us':>9}{'p90 us':>9}"
+        f"{'p99 us':>9}{'peak KiB':>10}{'blocks':>8}{'p50 vs baseline':>17}"
+    )
+
+    regressions = []
+    for name, case_results in results.items():
+        for kind, result in case_results.items():
+            line = (
+                f"{name:<12}{kind:<9}{result['rps']:>9.0f}{result['p50']:>9.1f}"
+                f"{result['p90']:>9.1f}{result['p99']:>9.1f}"
+                f"{result['peak_kib']:>10.2f}{result['blocks']:>8d}"
+            )
+
+            previous = (baseline or {}).get(name, {}).get(kind)
+            if previous:
+                line += f"{(result['p50'] / previous['p50'] - 1) * 100:>+16.1f}%"
+                for metric in ("p50", "peak_kib"):
+                    if result[metric] > previous[metric] * (1 + tolerance):
+                        regressions.append(f"{name}/{kind}/{metric}")
+
+            print(line)
+
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# Measures the cost `AIOAPI` adds on top of plain `AIOHTTP` handlers. Every case is
+# served twice: by a plain handler doing the same job by hand and by a handler
+# wrapped by `AIOAPI`. Run with `python -m benchmarks`.
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer, make_mocked_request
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi import Body, PathParam, QueryParam
+
+__all__ = ("CASES", "Case", "Result", "run")
+
+
+class User(BaseModel):
+    name: str
+    age: int = 42
+
+
+class Users(BaseModel):
+    users: List[User]
+
+
+SMALL_BODY = {"name": "Walter", "age": 50}
+LARGE_BODY = {"users": [{"name": f"user{i}", "age": i} for i in range(1000)]}
+
+
+async def raw_components(request):
+    return web.json_response({"app": id(request.app)})
+
+
+async def api_components(request: web.Request, app: web.Application):
+    return web.json_response({"app": id(app)})
+
+
+async def raw_path(request):
+    return web.json_response({"user_id": int(request.match_info["user_id"])})
+
+
+async def api_path(user_id: PathParam[int]):
+    return web.json_response({"user_id": user_id.cleaned})
+
+
+async def raw_query(request):
+    limit = int(request.query["limit"])
+    offset = int(request.query.get("offset", 0))
+    return web.json_response({"limit": limit, "offset": offset})
+
+
+async def api_query(limit: QueryParam[int], offset: QueryParam[int] = QueryParam(0)):
+    return web.json_response({"limit": limit.cleaned, "offset": offset.cleaned})
+
+
+async def raw_body_small(request):
+    body = await request.json()
+    return web.json_response({"name": body["name"]})
+
+
+async def api_body_small(body: Body[User]):
+    return web.json_response({"name": body.cleaned.name})
+
+
+async def raw_body_large(request):
+    body = await request.json()
+    return web.json_response({"count": len(body["users"])})
+
+
+async def api_body_large(body: Body[Users]):
+    return web.json_response({"count": len(body.cleaned.users)})
+
+
+class RawView(web.View):
+    async def get(self):
+        return web.json_response({"limit": int(self.request.query["limit"])})
+
+
+def create_api_view():
+    class APIView(web.View):
+        async def get(self, limit: QueryParam[int]):
+            return web.json_response({"limit": limit.cleaned})
+
+    return APIView
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    # Routes are created for every run, because views are wrapped in place.
+    raw: Callable[[], web.RouteDef]
+    api: Callable[[], web.RouteDef]
+    method: str = "GET"
+    path: str = "/"
+    match_info: Optional[Dict[str, str]] = None
+    body: Any = None
+
+
+CASES = (
+    Case(
+        name="components",
+        raw=lambda: web.get("/", raw_components),
+        api=lambda: api.get("/", api_components),
+    ),
+    Case(
+        name="path",
+        raw=lambda: web.get("/users/{user_id}", raw_path),
+        api=lambda: api.get("/users/{user_id}", api_path),
+        path="/users/42",
+        match_info={"user_id": "42"},
+    ),
+    Case(
+        name="query",
+        raw=lambda: web.get("/", raw_query),
+        api=lambda: api.get("/", api_query),
+        path="/?limit=10&offset=20",
+    ),
+    Case(
+        name="body_small",
+        raw=lambda: web.post("/", raw_body_small),
+        api=lambda: api.post("/", api_body_small),
+        method="POST",
+        body=SMALL_BODY,
+    ),
+    Case(
+        name="body_large",
+        raw=lambda: web.post("/", raw_body_large),
+        api=lambda: api.post("/", api_body_large),
+        method="POST",
+        body=LARGE_BODY,
+    ),
+    Case(
+        name="view",
+        raw=lambda: web.view("/", RawView),
+        api=lambda: api.view("/", create_api_view()),
+        path="/?limit=10",
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Result:
+    rps: float
+    p50: float
+    p90: float
+    p99: float
+    peak_kib: float
+    blocks: int
+
+    def asdict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+async def run(case: Case, *, requests: int) -> Dict[str, Result]:
+    return {
+        "raw": await _measure(case, case.raw(), requests=requests),
+        "api": await _measure(case, case.api(), requests=requests),
+    }
+
+
+async def _measure(case: Case, route: web.RouteDef, *, requests: int) -> Result:
+    app = web.Application()
+    app.add_routes([route])
+
+    body = json.dumps(case.body).encode() if case.body is not None else None
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+
+    latencies = []
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with ClientSession() as session:
+            url = server.make_url(case.path)
+            for i in range(requests + requests // 10):
+                started_at = time.perf_counter()
+                async with session.request(
+                    case.method, url, data=body, headers=headers
+                ) as resp:
+                    await resp.read()
+                    assert resp.status == 200, await resp.text()
+                # The first 10% of requests are just a warm up.
+                if i >= requests // 10:
+                    latencies.append(time.perf_counter() - started_at)
+    finally:
+        await server.close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    peak_kib, blocks = await _measure_memory(case, app, route, body)
+    return Result(
+        rps=len(latencies) / sum(latencies),
+        p50=quantiles[49] * 1e6,
+        p90=quantiles[89] * 1e6,
+        p99=quantiles[98] * 1e6,
+        peak_kib=peak_kib,
+        blocks=blocks,
+    )
+
+
+async def _measure_memory(
+    case: Case, app: web.Application, route: web.RouteDef, body: Optional[bytes]
+) -> Tuple[float, int]:
+    # Handlers are called directly, so only the work done by a handler, and by
+    # `AIOAPI` for wrapped handlers, is measured.
+    request = make_mocked_request(
+        case.method,
+        case.path,
+        headers={"Content-Type": "application/json"},
+        match_info=case.match_info or {},
+        app=app,
+    )
+    if body is not None:
+        request._read_bytes = body
+
+    await route.handler(request)
+
+    # Tracing starts afresh, so the peak is the one of this case only, without
+    # `tracemalloc.reset_peak`, which requires Python 3.9. The response is kept
+    # until the second snapshot, so blocks are the ones allocated for it,
+    # temporary blocks are freed already.
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    current, _ = tracemalloc.get_traced_memory()
+    resp = await route.handler(request)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    assert resp.status == 200
+    return (peak - current) / 1024, _blocks(before, after)
+
+
+def _blocks(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> int:
+    # Snapshots themselves are allocated by `tracemalloc`, they are not counted.
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    return sum(
+        stat.count_diff
+        for stat in after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "filename"
+        )
+    )
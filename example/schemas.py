@@ -1,8 +1,13 @@
 from pydantic import BaseModel
 
-__all__ = ("HelloBodyRequest",)
+__all__ = ("HelloBodyRequest", "HelloBodyResponse")
 
 
 class HelloBodyRequest(BaseModel):
     name: str
     age: int = 27
+
+
+class HelloBodyResponse(BaseModel):
+    whoami: str
+    age: int
@@ -1,7 +1,7 @@
 from aiohttp import web
 
 from aioapi import Body, PathParam, QueryParam
-from example.schemas import HelloBodyRequest
+from example.schemas import HelloBodyRequest, HelloBodyResponse
 
 __all__ = (
     "HelloView",
@@ -37,9 +37,9 @@ async def hello_components(request: web.Request, app: web.Application):
     return web.json_response({"whoami": id(request), "whoareyou": id(app)})
 
 
-async def hello_body(body: Body[HelloBodyRequest]):
+async def hello_body(body: Body[HelloBodyRequest]) -> HelloBodyResponse:
     cleaned = body.cleaned
-    return web.json_response({"whoami": cleaned.name, "age": cleaned.age})
+    return HelloBodyResponse(whoami=cleaned.name, age=cleaned.age)
 
 
 async def hello_path(name: PathParam[str]):
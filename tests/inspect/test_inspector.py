@@ -1,13 +1,25 @@
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Union
+
 import pytest
 from aiohttp import web
 from pydantic import BaseModel
+from typing_extensions import Annotated
 
-from aioapi import Body, PathParam, QueryParam
+from aioapi import (
+    Body,
+    BodyLimit,
+    CookieParam,
+    Depends,
+    Form,
+    HeaderParam,
+    PathParam,
+    QueryParam,
+)
 from aioapi.inspect.exceptions import (
     HandlerMultipleBodyError,
     HandlerParamUnknownTypeError,
 )
-from aioapi.inspect.inspector import HandlerInspector
+from aioapi.inspect.inspector import REQUIRED, HandlerInspector
 
 
 class TestInspector:
@@ -80,6 +92,101 @@ class TestInspector:
         assert exc_info.value.handler == "test_inspector.handler"
         assert exc_info.value.param == "b2"
 
+    def test_body_stream(self):
+        async def handler(b: Body[AsyncIterator[BaseModel]]):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.request_type is None
+        assert meta.request_body_pair is None
+        assert meta.request_body_stream_pair == ("b", BaseModel)
+
+    @pytest.mark.parametrize(
+        "type_", (Annotated[BaseModel, BodyLimit(max_size=1024)], BaseModel)
+    )
+    def test_body_limit(self, type_):
+        async def handler(b: Body[type_]):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.request_body_pair == ("b", (BaseModel, REQUIRED))
+        assert meta.request_body_max_size == (1024 if type_ is not BaseModel else None)
+
+    def test_body_stream_limit(self):
+        async def handler(
+            b: Body[Annotated[AsyncIterator[BaseModel], BodyLimit(max_size=1024)]],
+        ):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.request_body_stream_pair == ("b", BaseModel)
+        assert meta.request_body_max_size == 1024
+
+    def test_form(self):
+        async def handler(f: Form[BaseModel]):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.request_body_pair == ("f", (BaseModel, REQUIRED))
+        assert meta.request_body_form
+
+    def test_form_unknown(self):
+        async def handler(f: Form[int]):
+            pass
+
+        with pytest.raises(HandlerParamUnknownTypeError) as exc_info:
+            HandlerInspector(handler=handler)()
+        assert exc_info.value.param == "f"
+
+    def test_form_multiple(self):
+        async def handler(b: Body[int], f: Form[BaseModel]):
+            pass
+
+        with pytest.raises(HandlerMultipleBodyError) as exc_info:
+            HandlerInspector(handler=handler)()
+        assert exc_info.value.param == "f"
+
+    def test_body_stream_unknown(self):
+        async def handler(b: Body[AsyncIterator[int]]):
+            pass
+
+        with pytest.raises(HandlerParamUnknownTypeError) as exc_info:
+            HandlerInspector(handler=handler)()
+        assert exc_info.value.param == "b"
+
+    def test_body_stream_multiple(self):
+        async def handler(b1: Body[AsyncIterator[BaseModel]], b2: Body[int]):
+            pass
+
+        with pytest.raises(HandlerMultipleBodyError) as exc_info:
+            HandlerInspector(handler=handler)()
+        assert exc_info.value.param == "b2"
+
+    def test_header_and_cookie_params(self):
+        async def handler(
+            x_token: HeaderParam[str],
+            session: CookieParam[str] = CookieParam("default"),  # noqa: B009
+        ):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.request_header_mapping == {"x_token": (str, REQUIRED)}
+        assert meta.request_cookie_mapping == {"session": (str, "default")}
+        assert set(meta.request_type.__fields__) == {"header", "cookie"}
+
+    def test_dependencies(self):
+        def provider():
+            pass
+
+        depends = Depends(provider)
+
+        async def handler(value: int = depends):
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.dependencies_mapping == {"value": depends}
+        assert meta.request_type is None
+
     def test_path_param(self):
         async def handler(
             pp: PathParam[int], ppd: PathParam[float] = PathParam(5.1)  # noqa: B009
@@ -125,3 +232,62 @@ class TestInspector:
         assert meta.request_body_pair == ("b", (int, ...))
         assert meta.request_path_mapping == {"pp": (int, ...)}
         assert meta.request_query_mapping == {"qp": (str, ...), "qpd": (bool, False)}
+
+    def test_flat(self):
+        async def handler(
+            b: Body[int],
+            pp: PathParam[int],
+            qp: QueryParam[str],
+            qpd: QueryParam[bool] = QueryParam(False),  # noqa: B009
+        ):
+            pass
+
+        meta = HandlerInspector(handler=handler, flat=True)()
+        assert meta.request_flat is True
+        assert issubclass(meta.request_type, BaseModel)
+        assert list(meta.request_type.__fields__) == [
+            "body",
+            "path__pp",
+            "query__qp",
+            "query__qpd",
+        ]
+        assert meta.request_body_pair == ("b", (int, ...))
+        assert meta.request_path_mapping == {"pp": (int, ...)}
+        assert meta.request_query_mapping == {"qp": (str, ...), "qpd": (bool, False)}
+
+    @pytest.mark.parametrize(
+        "annotation, response_type",
+        (
+            (BaseModel, BaseModel),
+            (List[BaseModel], List[BaseModel]),
+            (AsyncIterator[BaseModel], AsyncIterator[BaseModel]),
+            (AsyncGenerator[BaseModel, None], AsyncIterator[BaseModel]),
+            (AsyncIterator[int], None),
+            (List[int], None),
+            (Dict[str, BaseModel], None),
+            (web.Response, None),
+            (Union[BaseModel, web.Response], BaseModel),
+            (Union[List[BaseModel], web.StreamResponse], List[BaseModel]),
+            (Union[BaseModel, int, web.Response], None),
+        ),
+    )
+    def test_response_type(self, annotation, response_type):
+        async def handler() -> annotation:
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.response_type == response_type
+
+    def test_response_type_empty(self):
+        async def handler():
+            pass
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.response_type is None
+
+    def test_response_type_async_gen(self):
+        async def handler():
+            yield
+
+        meta = HandlerInspector(handler=handler)()
+        assert meta.response_type == AsyncIterator[Any]
@@ -0,0 +1,155 @@
+import json
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+
+from aioapi import adapters
+from aioapi.adapters import (
+    PYDANTIC_V2,
+    errors_of,
+    field_types_of,
+    form_error,
+    json_dumper,
+    json_error,
+    json_validator,
+    list_fields_of,
+    model_validator,
+    relocate_errors,
+)
+from aioapi.typedefs import File
+
+
+class User(BaseModel):
+    name: str
+    age: int
+
+
+class Limits(BaseModel):
+    count: int = Field(..., gt=0)
+    name: str = Field(..., min_length=2)
+
+
+class Upload(BaseModel):
+    files: List[File]
+    tags: Optional[List[str]] = None
+    title: str
+
+
+def test_relocate_errors():
+    with pytest.raises(ValidationError) as e:
+        model_validator(User)({"age": "old"})
+
+    error = relocate_errors(e.value, lambda loc: ("body",) + loc, User)
+
+    assert [err["loc"] for err in errors_of(error)] == [
+        ("body", "name"),
+        ("body", "age"),
+    ]
+    assert [err["msg"] for err in errors_of(error)] == [
+        err["msg"] for err in errors_of(e.value)
+    ]
+
+
+@pytest.mark.parametrize(
+    "model, data, errors",
+    (
+        (
+            User,
+            {"age": "old"},
+            [
+                {
+                    "loc": ("body", "name"),
+                    "msg": "field required",
+                    "type": "value_error.missing",
+                },
+                {
+                    "loc": ("body", "age"),
+                    "msg": "value is not a valid integer",
+                    "type": "type_error.integer",
+                },
+            ],
+        ),
+        (
+            Limits,
+            {"count": 0, "name": "a"},
+            [
+                {
+                    "loc": ("body", "count"),
+                    "msg": "ensure this value is greater than 0",
+                    "type": "value_error.number.not_gt",
+                },
+                {
+                    "loc": ("body", "name"),
+                    "msg": "ensure this value has at least 2 characters",
+                    "type": "value_error.any_str.min_length",
+                },
+            ],
+        ),
+    ),
+)
+def test_errors_of(model, data, errors):
+    # Errors are rendered the same way by both versions of `pydantic`.
+    with pytest.raises(ValidationError) as e:
+        model_validator(model)(data)
+
+    error = relocate_errors(e.value, lambda loc: ("body",) + loc, model)
+
+    assert [
+        {"loc": err["loc"], "msg": err["msg"], "type": err["type"]}
+        for err in errors_of(error)
+    ] == errors
+
+
+@pytest.mark.parametrize(
+    "error, msg", ((json_error, "Invalid JSON"), (form_error, "Invalid form"))
+)
+def test_errors(error, msg):
+    errors = errors_of(error(("body",), User))
+
+    assert len(errors) == 1
+    assert errors[0]["loc"] == ("body",)
+    assert errors[0]["msg"] == msg
+    assert sorted(errors[0]) == ["loc", "msg", "type"]
+
+
+def test_list_fields_of():
+    assert list_fields_of(Upload) == frozenset({"files", "tags"})
+
+
+def test_field_types_of():
+    assert field_types_of(Upload) == (File, str, str)
+
+
+@pytest.mark.skipif(not PYDANTIC_V2, reason="pydantic v2 only")
+def test_json_validator():
+    validate_json = json_validator(User)
+
+    assert validate_json(b'{"name": "Walter", "age": 42}') == User(
+        name="Walter", age=42
+    )
+    with pytest.raises(ValidationError):
+        validate_json(b'{"name": "Walter"}')
+
+
+@pytest.mark.skipif(not PYDANTIC_V2, reason="pydantic v2 only")
+def test_json_dumper():
+    dump_json = json_dumper(List[User])
+
+    assert json.loads(dump_json([User(name="Walter", age=42)])) == [
+        {"name": "Walter", "age": 42}
+    ]
+
+
+@pytest.mark.skipif(PYDANTIC_V2, reason="pydantic v1 only")
+def test_json_dumper_v1():
+    assert json_dumper(User) is None
+
+
+@pytest.mark.skipif(PYDANTIC_V2, reason="pydantic v1 only")
+def test_json_validator_v1():
+    assert json_validator(User) is None
+    assert adapters.dump_model(User(name="Walter", age=42)) == {
+        "name": "Walter",
+        "age": 42,
+    }
@@ -0,0 +1,79 @@
+from aioapi.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set():
+    cache = LRUCache(maxsize=2)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b", 42) == 42
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl():
+    clock = Clock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_clear():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_ttl_per_entry():
+    clock = Clock()
+    cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1, ttl=1)
+    cache.set("b", 2)
+
+    clock.now = 5
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_maxbytes():
+    cache = LRUCache(maxsize=8, maxbytes=10)
+    cache.set("a", 1, nbytes=4)
+    cache.set("b", 2, nbytes=4)
+    cache.set("a", 3, nbytes=5)
+    assert cache.nbytes == 9
+
+    cache.set("c", 4, nbytes=4)
+    assert cache.get("b") is None
+    assert cache.nbytes == 9
+
+    cache.set("d", 5, nbytes=11)
+    assert cache.get("d") is None
+    assert cache.nbytes == 9
@@ -0,0 +1,199 @@
+import gzip
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import AsyncIterator, List
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi import compression
+from aioapi.compression import negotiate_encoding
+from aioapi.middlewares import response_cache_middleware
+
+
+class User(BaseModel):
+    name: str
+
+
+USERS = [User(name=f"Walter {i}") for i in range(100)]
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, coding",
+    (
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip", "gzip"),
+        ("gzip;q=0.5, deflate", "deflate"),
+        ("gzip;q=0, deflate;q=0", None),
+        ("GZIP", "gzip"),
+        ("*", "gzip"),
+        ("*, gzip;q=0", "deflate"),
+        ("gzip;q=bad", None),
+    ),
+)
+def test_negotiate_encoding(accept_encoding, coding):
+    assert negotiate_encoding(accept_encoding, ("gzip", "deflate")) == coding
+
+
+@pytest.fixture
+def client_for(aiohttp_client):
+    async def _client_for(*, routes):
+        app = web.Application()
+        app.add_routes(routes)
+        app.middlewares.append(response_cache_middleware())
+
+        return await aiohttp_client(app, auto_decompress=False)
+
+    return _client_for
+
+
+@pytest.fixture
+def compressed(monkeypatch):
+    calls = []
+    compress = compression.compress
+
+    def compress_counted(body, coding):
+        calls.append(coding)
+        return compress(body, coding)
+
+    monkeypatch.setattr(compression, "compress", compress_counted)
+    return calls
+
+
+async def get_users() -> List[User]:
+    return USERS
+
+
+@pytest.mark.parametrize(
+    "coding, decompress",
+    (("gzip", gzip.decompress), ("deflate", zlib.decompress)),
+)
+async def test_compress(client_for, coding, decompress):
+    client = await client_for(routes=[api.get("/users", get_users, compress=True)])
+
+    resp = await client.get("/users", headers={"Accept-Encoding": coding})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["Content-Encoding"] == coding
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert decompress(await resp.read()).startswith(b'[{"name":')
+
+
+async def test_compress_identity(client_for):
+    client = await client_for(routes=[api.get("/users", get_users, compress=True)])
+
+    resp = await client.get("/users", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert (await resp.read()).startswith(b'[{"name":')
+
+
+async def test_compress_small_body(client_for):
+    async def handler() -> User:
+        return User(name="Walter")
+
+    client = await client_for(routes=[api.get("/user", handler, compress=True)])
+
+    resp = await client.get("/user", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert "Vary" not in resp.headers
+
+
+async def test_compress_content_type(client_for):
+    async def handler():
+        return web.Response(body=b"\0" * 2048, content_type="image/png")
+
+    client = await client_for(routes=[api.get("/image", handler, compress=True)])
+
+    resp = await client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+
+
+async def test_compress_cached(client_for, compressed):
+    route = api.get("/users", get_users, compress=True, response_cache_ttl=60)
+    client = await client_for(routes=[route])
+
+    resp = await client.get("/users", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    etag = resp.headers["ETag"]
+    assert etag.endswith('-gzip"')
+    body = await resp.read()
+
+    resp = await client.get("/users", headers={"Accept-Encoding": "gzip"})
+    assert await resp.read() == body
+    assert resp.headers["ETag"] == etag
+    # Encoded bodies of cached responses are reused.
+    assert compressed == ["gzip"]
+
+    resp = await client.get(
+        "/users", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["ETag"] == etag
+
+    resp = await client.get(
+        "/users", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["ETag"] != etag
+
+
+async def test_compress_cached_headers(client_for):
+    route = api.get(
+        "/users",
+        get_users,
+        compress=True,
+        response_cache_ttl=60,
+        response_cache_headers=("Accept-Language",),
+    )
+    client = await client_for(routes=[route])
+
+    headers = {"Accept-Encoding": "gzip", "Accept-Language": "en"}
+    resp = await client.get("/users", headers=headers)
+    assert resp.headers["Vary"] == "Accept-Language, Accept-Encoding"
+
+    resp = await client.get(
+        "/users", headers={**headers, "If-None-Match": resp.headers["ETag"]}
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["Vary"] == "Accept-Language, Accept-Encoding"
+
+
+async def test_compress_offload(client_for, monkeypatch):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        submitted = []
+        submit = executor.submit
+        monkeypatch.setattr(
+            executor, "submit", lambda *args: submitted.append(args) or submit(*args)
+        )
+        route = api.get(
+            "/users",
+            get_users,
+            compress=True,
+            offload_executor=executor,
+            compress_offload_min_size=0,
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.get("/users", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(await resp.read()).startswith(b'[{"name":')
+        assert len(submitted) == 1
+
+
+async def test_compress_stream(client_for):
+    async def handler() -> AsyncIterator[User]:
+        for user in USERS:
+            yield user
+
+    client = await client_for(routes=[api.get("/users", handler, compress=True)])
+
+    resp = await client.get("/users", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(await resp.read()).startswith(b'[{"name":')
@@ -0,0 +1,290 @@
+import asyncio
+from http import HTTPStatus
+from typing import AsyncIterator
+
+import pytest
+from aiohttp import FormData, web
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi import forms
+from aioapi.dependencies import compile_dependencies, setup_dependencies
+from aioapi.inspect.exceptions import (
+    HandlerDependencyCycleError,
+    HandlerDependencyScopeError,
+    HandlerParamUnknownTypeError,
+)
+
+
+async def test_dependencies(client_for):
+    calls = []
+
+    def get_settings(app: web.Application):
+        calls.append("settings")
+        return {"app": id(app)}
+
+    async def get_user(request: web.Request, settings=api.Depends(get_settings)):
+        calls.append("user")
+        return {"name": request.headers["X-User"], "settings": settings}
+
+    async def handler(
+        user=api.Depends(get_user),
+        settings=api.Depends(get_settings),
+        q: api.QueryParam[int] = api.QueryParam(0),
+    ):
+        return web.json_response(
+            {"user": user["name"], "same": user["settings"] is settings, "q": q.cleaned}
+        )
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test", params={"q": 1}, headers={"X-User": "Walter"})
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == {"user": "Walter", "same": True, "q": 1}
+    assert calls == ["settings", "user"]
+
+
+async def test_concurrent(client_for):
+    running = 0
+    max_running = 0
+
+    async def provider():
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return 1
+
+    async def other_provider():
+        return await provider()
+
+    async def handler(a=api.Depends(provider), b=api.Depends(other_provider)):
+        return web.json_response({"result": a + b})
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test")
+    assert await resp.json() == {"result": 2}
+    assert max_running == 2
+
+
+async def test_cleanup(client_for):
+    events = []
+
+    async def get_connection():
+        events.append("open")
+        yield "connection"
+        events.append("close")
+
+    def get_transaction(connection=api.Depends(get_connection)):
+        events.append("begin")
+        yield f"transaction on {connection}"
+        events.append("commit")
+
+    async def handler(transaction=api.Depends(get_transaction)):
+        events.append("handler")
+        return web.json_response({"transaction": transaction})
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test")
+    assert await resp.json() == {"transaction": "transaction on connection"}
+    assert events == ["open", "begin", "handler", "commit", "close"]
+
+
+async def test_cleanup_on_error(client_for):
+    events = []
+
+    async def get_connection():
+        events.append("open")
+        yield "connection"
+        events.append("close")
+
+    async def fail(connection=api.Depends(get_connection)):
+        raise web.HTTPForbidden()
+
+    async def handler(connection=api.Depends(get_connection), _=api.Depends(fail)):
+        pass
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test")
+    assert resp.status == HTTPStatus.FORBIDDEN
+    assert events == ["open", "close"]
+
+
+async def test_cleanup_after_stream(client_for):
+    events = []
+
+    async def get_connection():
+        events.append("open")
+        yield events
+        events.append("close")
+
+    async def handler(connection=api.Depends(get_connection)) -> AsyncIterator[int]:
+        for i in range(3):
+            # Items are produced while the response is written, long after the
+            # handler returns.
+            assert connection[-1] == "open"
+            yield i
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test")
+    assert await resp.json() == [0, 1, 2]
+    assert events == ["open", "close"]
+
+
+async def test_app_scope(aiohttp_client):
+    events = []
+
+    async def get_pool(app: web.Application):
+        events.append("open")
+        yield object()
+        events.append("close")
+
+    async def handler(pool=api.Depends(get_pool, scope="app")):
+        return web.json_response({"pool": id(pool)})
+
+    app = web.Application()
+    app.add_routes([api.get("/test", handler)])
+    setup_dependencies(app)
+    client = await aiohttp_client(app)
+
+    results = await asyncio.gather(*(client.get("/test") for _ in range(3)))
+    pools = {(await resp.json())["pool"] for resp in results}
+    assert len(pools) == 1
+    assert events == ["open"]
+
+    await client.close()
+    assert events == ["open", "close"]
+
+
+def test_unknown_scope():
+    with pytest.raises(ValueError):
+        api.Depends(lambda: None, scope="session")
+
+
+def test_cycle():
+    def a(b=api.Depends(lambda: None)):
+        pass
+
+    def b(a=api.Depends(a)):
+        pass
+
+    a.__defaults__ = (api.Depends(b),)
+
+    with pytest.raises(HandlerDependencyCycleError):
+        compile_dependencies({"a": api.Depends(a)}, handler_name="handler")
+
+
+def test_app_scope_depends_on_request():
+    def get_request(request: web.Request):
+        return request
+
+    def get_value(value=api.Depends(get_request)):
+        return value
+
+    def get_value_directly(request: web.Request):
+        return request
+
+    for func in (get_value, get_value_directly):
+        with pytest.raises(HandlerDependencyScopeError):
+            compile_dependencies(
+                {"value": api.Depends(func, scope="app")}, handler_name="handler"
+            )
+
+
+def test_unknown_param():
+    def provider(unknown: int):
+        pass
+
+    with pytest.raises(HandlerParamUnknownTypeError) as exc_info:
+        compile_dependencies({"value": api.Depends(provider)}, handler_name="handler")
+    assert exc_info.value.param == "unknown"
+
+
+async def test_resolved_while_body_is_received(client_for):
+    provider_called = asyncio.Event()
+
+    async def provider():
+        provider_called.set()
+        return "value"
+
+    async def handler(body: api.Body[dict], value=api.Depends(provider)):
+        return web.json_response({"body": body.cleaned, "value": value})
+
+    async def chunks():
+        yield b'{"a":'
+        # The rest of the body is sent only after the provider is called.
+        await provider_called.wait()
+        yield b" 1}"
+
+    client = await client_for(routes=[api.post("/test", handler)])
+
+    resp = await asyncio.wait_for(client.post("/test", data=chunks()), timeout=5)
+    assert await resp.json() == {"body": {"a": 1}, "value": "value"}
+
+
+async def test_invalid_body_cleanup(client_for):
+    events = []
+
+    async def provider():
+        events.append("open")
+        yield
+        events.append("close")
+
+    async def handler(body: api.Body[int], _=api.Depends(provider)):
+        pass
+
+    client = await client_for(routes=[api.post("/test", handler)])
+
+    resp = await client.post("/test", json="random")
+    assert resp.status == HTTPStatus.BAD_REQUEST
+    assert events == ["open", "close"]
+
+
+async def test_failed_dependency_closes_files(client_for, monkeypatch):
+    files = []
+    spool = forms.tempfile.SpooledTemporaryFile
+
+    def spool_tracked(*args, **kwargs):
+        files.append(spool(*args, **kwargs))
+        return files[-1]
+
+    monkeypatch.setattr(forms.tempfile, "SpooledTemporaryFile", spool_tracked)
+
+    class Upload(BaseModel):
+        file: api.File
+
+    async def fail():
+        raise web.HTTPForbidden()
+
+    async def handler(form: api.Form[Upload], _=api.Depends(fail)):
+        pass
+
+    client = await client_for(routes=[api.post("/test", handler)])
+
+    data = FormData()
+    data.add_field("file", b"file content", filename="a.txt")
+    resp = await client.post("/test", data=data)
+    assert resp.status == HTTPStatus.FORBIDDEN
+    assert len(files) == 1
+    assert files[0].closed
+
+
+async def test_invalid_params(client_for):
+    calls = []
+
+    def provider():
+        calls.append(1)
+
+    async def handler(q: api.QueryParam[int], _=api.Depends(provider)):
+        pass
+
+    client = await client_for(routes=[api.get("/test", handler)])
+
+    resp = await client.get("/test", params={"q": "random"})
+    assert resp.status == HTTPStatus.BAD_REQUEST
+    assert calls == []
@@ -0,0 +1,136 @@
+from http import HTTPStatus
+from typing import List, Optional
+
+import pytest
+from aiohttp import web
+from typing_extensions import Annotated
+
+import aioapi as api
+from aioapi import engines
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+requires_msgspec = pytest.mark.skipif(msgspec is None, reason="msgspec is required")
+
+
+def test_get_engine():
+    assert engines.get_engine().name == "pydantic"
+
+    with pytest.raises(engines.ValidationEngineUnknownError) as exc_info:
+        engines.get_engine("unknown")
+    assert exc_info.value.name == "unknown"
+
+
+def test_set_default_engine_unknown():
+    with pytest.raises(engines.ValidationEngineUnknownError):
+        engines.set_default_engine("unknown")
+
+
+@requires_msgspec
+class TestStructEngine:
+    @pytest.fixture
+    def user_type(self):
+        class User(msgspec.Struct):
+            name: str
+            age: int = 42
+
+        return User
+
+    @pytest.fixture
+    async def client(self, client_for, user_type):
+        async def handler(
+            user_id: api.PathParam[Annotated[int, msgspec.Meta(ge=1)]],
+            body: api.Body[user_type],
+            ids: api.QueryParam[List[int]] = api.QueryParam([]),
+            q: api.QueryParam[Optional[str]] = api.QueryParam(None),
+        ):
+            assert isinstance(body.cleaned, user_type)
+            return web.json_response(
+                {
+                    "user_id": user_id.cleaned,
+                    "body": msgspec.to_builtins(body.cleaned),
+                    "ids": ids.cleaned,
+                    "q": q.cleaned,
+                }
+            )
+
+        return await client_for(
+            routes=[api.post("/users/{user_id}", handler, validation_engine="msgspec")]
+        )
+
+    async def test_valid(self, client):
+        resp = await client.post(
+            "/users/1?ids=1&ids=2", json={"name": "Walter", "age": "5"}
+        )
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {
+            "user_id": 1,
+            "body": {"name": "Walter", "age": 5},
+            "ids": [1, 2],
+            "q": None,
+        }
+
+    @pytest.mark.parametrize(
+        "url, body, invalid_params",
+        (
+            (
+                "/users/0",
+                b'{"name": "Walter"}',
+                [
+                    {
+                        "loc": ["path", "user_id"],
+                        "msg": "Expected `int` >= 1",
+                        "type": "value_error",
+                    }
+                ],
+            ),
+            (
+                "/users/1?ids=1&ids=a",
+                b'{"name": "Walter"}',
+                [
+                    {
+                        "loc": ["query", "ids", 1],
+                        "msg": "Expected `int`, got `str`",
+                        "type": "value_error",
+                    }
+                ],
+            ),
+            (
+                "/users/1",
+                b'{"age": 5}',
+                [
+                    {
+                        "loc": ["body", "name"],
+                        "msg": "field required",
+                        "type": "value_error.missing",
+                    }
+                ],
+            ),
+            (
+                "/users/1",
+                b'{"name": ',
+                [{"loc": ["body"], "msg": "Invalid JSON", "type": "value_error.json"}],
+            ),
+        ),
+    )
+    async def test_invalid(self, client, url, body, invalid_params):
+        resp = await client.post(url, data=body)
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == invalid_params
+
+    async def test_default_engine(self, client_for, user_type):
+        async def handler(body: api.Body[user_type]):
+            return web.json_response(msgspec.to_builtins(body.cleaned))
+
+        engines.set_default_engine("msgspec")
+        try:
+            client = await client_for(routes=[api.post("/test", handler)])
+        finally:
+            engines.set_default_engine("pydantic")
+
+        resp = await client.post("/test", json={"name": "Walter"})
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"name": "Walter", "age": 42}
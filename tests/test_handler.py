@@ -1,10 +1,29 @@
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from http import HTTPStatus
+from typing import AsyncIterator, List, Optional, Union
+from uuid import UUID
 
 import pytest
-from aiohttp import web
+from aiohttp import FormData, web
 from pydantic import BaseModel
+from typing_extensions import Annotated
 
 import aioapi as api
+from aioapi import engines, forms
+from aioapi.options import HandlerOptionsConflictError
+
+
+class OffloadedUser(BaseModel):
+    # Defined at module level, so it can be pickled and sent to other processes.
+    name: str
+    age: int
+
+
+class Upload(BaseModel):
+    title: str
+    tags: List[str] = []
+    file: Optional[api.File] = None
 
 
 class TestSimple:
@@ -442,3 +461,995 @@ class TestCBV:
 
         assert resp.status == resp_status
         assert await resp.json() == resp_body
+
+    async def test_multiple_paths(self, client_for):
+        class View(web.View):
+            async def get(self, qp: api.QueryParam[int]):
+                return web.json_response({"qp": qp.cleaned})
+
+        routes = [api.view("/a", View), api.view("/b", View)]
+        get = View.get
+        client = await client_for(routes=routes + [api.view("/c", View)])
+
+        assert View.get is get
+        assert View.get.handler_meta.name == "test_handler.View.get"
+        for path in ("/a", "/b", "/c"):
+            resp = await client.get(path, params={"qp": "42"})
+            assert resp.status == HTTPStatus.OK
+            assert await resp.json() == {"qp": 42}
+
+    async def test_method_not_allowed(self, client_for):
+        class View(web.View):
+            async def get(self):
+                return web.json_response({})
+
+            async def post(self):
+                return web.json_response({})
+
+        client = await client_for(routes=[api.view("/test", View)])
+
+        resp = await client.delete("/test")
+        assert resp.status == HTTPStatus.METHOD_NOT_ALLOWED
+        assert resp.headers["Allow"] == "GET,OPTIONS,POST"
+
+        resp = await client.options("/test")
+        assert resp.status == HTTPStatus.OK
+        assert resp.headers["Allow"] == "GET,OPTIONS,POST"
+
+    async def test_options(self, client_for):
+        class View(web.View):
+            async def options(self):
+                return web.Response(text="options")
+
+        client = await client_for(routes=[api.view("/test", View)])
+
+        resp = await client.options("/test")
+        assert resp.status == HTTPStatus.OK
+        assert await resp.text() == "options"
+
+    async def test_subclass(self, client_for):
+        class View(web.View):
+            async def get(self, qp: api.QueryParam[int]):
+                return web.json_response({"qp": qp.cleaned})
+
+        class SubView(View):
+            async def post(self, qp: api.QueryParam[str]):
+                return web.json_response({"qp": qp.cleaned})
+
+        client = await client_for(
+            routes=[api.view("/view", View), api.view("/subview", SubView)]
+        )
+
+        assert SubView.get is View.get
+        resp = await client.get("/subview", params={"qp": "42"})
+        assert await resp.json() == {"qp": 42}
+        resp = await client.post("/subview", params={"qp": "42"})
+        assert await resp.json() == {"qp": "42"}
+        resp = await client.post("/view", params={"qp": "42"})
+        assert resp.status == HTTPStatus.METHOD_NOT_ALLOWED
+
+    async def test_multiple_paths_options_conflict(self, client_for):
+        class View(web.View):
+            async def post(self, body: api.Body[dict]):
+                return web.json_response(body.cleaned)
+
+        routes = [
+            api.view("/a", View, body_max_size=8),
+            api.view("/b", View, body_max_size=8),
+        ]
+        with pytest.raises(HandlerOptionsConflictError) as e:
+            api.view("/c", View, body_max_size=1024)
+        assert e.value.handler == "test_handler.View"
+
+        client = await client_for(routes=routes)
+        resp = await client.post("/b", json={"key": "value"})
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    async def test_subclass_options_conflict(self):
+        class View(web.View):
+            async def get(self):
+                return web.json_response({})
+
+        class SubView(View):
+            pass
+
+        api.view("/view", View)
+        with pytest.raises(HandlerOptionsConflictError):
+            api.view("/subview", SubView, body_max_size=8)
+
+
+class TestFlatValidation:
+    @pytest.mark.parametrize(
+        "req, resp_status, resp_body",
+        (
+            (
+                {"path": 42, "query": {"qp": 84}, "body": {"name": "Walter"}},
+                HTTPStatus.OK,
+                {
+                    "user": {"name": "Walter", "age": 42},
+                    "pp": 42,
+                    "qp": 84,
+                    "qpd": "random",
+                },
+            ),
+            (
+                {"path": 42, "query": {"qp": "random"}, "body": {}},
+                HTTPStatus.BAD_REQUEST,
+                {
+                    "type": "validation_error",
+                    "title": "Your request parameters didn't validate.",
+                    "invalid_params": [
+                        {
+                            "loc": ["body", "name"],
+                            "msg": "field required",
+                            "type": "value_error.missing",
+                        },
+                        {
+                            "loc": ["query", "qp"],
+                            "msg": "value is not a valid integer",
+                            "type": "type_error.integer",
+                        },
+                    ],
+                },
+            ),
+        ),
+    )
+    async def test_multiple(self, client_for, req, resp_status, resp_body):
+        class User(BaseModel):
+            name: str
+            age: int = 42
+
+        async def handler(
+            request: web.Request,
+            body: api.Body[User],
+            pp: api.PathParam[int],
+            qp: api.QueryParam[int],
+            qpd: api.QueryParam[str] = api.QueryParam("random"),  # noqa: B009
+        ):
+            return web.json_response(
+                {
+                    "user": body.cleaned.dict(),
+                    "pp": pp.cleaned,
+                    "qp": qp.cleaned,
+                    "qpd": qpd.cleaned,
+                }
+            )
+
+        client = await client_for(
+            routes=[api.put("/test/{pp}", handler, flat_validation=True)]
+        )
+        resp = await client.put(
+            f"/test/{req['path']}", json=req["body"], params=req["query"]
+        )
+
+        assert resp.status == resp_status
+        assert await resp.json() == resp_body
+
+    async def test_same_name(self, client_for):
+        class View(web.View):
+            async def get(self, key: api.PathParam[int], q: api.QueryParam[str]):
+                return web.json_response({"key": key.cleaned, "q": q.cleaned})
+
+        client = await client_for(
+            routes=[api.view("/test/{key}", View, flat_validation=True)]
+        )
+        resp = await client.get("/test/42", params={"q": "query", "key": "ignored"})
+
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"key": 42, "q": "query"}
+
+
+class TestQueryList:
+    @pytest.mark.parametrize("flat", (False, True))
+    async def test_query_list(self, client_for, flat):
+        async def handler(
+            ids: api.QueryParam[List[int]],
+            q: api.QueryParam[str] = api.QueryParam(""),
+            tags: api.QueryParam[List[str]] = api.QueryParam([]),
+        ):
+            return web.json_response(
+                {"ids": ids.cleaned, "q": q.cleaned, "tags": tags.cleaned}
+            )
+
+        client = await client_for(
+            routes=[api.get("/test", handler, flat_validation=flat)]
+        )
+
+        resp = await client.get(
+            "/test", params=[("ids", "1"), ("q", "a"), ("ids", "2"), ("q", "b")]
+        )
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"ids": [1, 2], "q": "a", "tags": []}
+
+        resp = await client.get("/test", params=[("ids", "1"), ("ids", "random")])
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == [
+            {
+                "loc": ["query", "ids", 1],
+                "msg": "value is not a valid integer",
+                "type": "type_error.integer",
+            }
+        ]
+
+    async def test_validation_cache(self, client_for):
+        async def handler(ids: api.QueryParam[List[int]]):
+            return web.json_response({"ids": ids.cleaned})
+
+        route = api.get("/test", handler, validation_cache_size=8)
+        client = await client_for(routes=[route])
+
+        for ids in ((1, 2), (1,), (1, 2)):
+            resp = await client.get("/test", params=[("ids", i) for i in ids])
+            assert await resp.json() == {"ids": list(ids)}
+
+        cache = route.handler.validation_cache
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    @pytest.mark.parametrize("flat", (False, True))
+    def test_list_fields_of_once(self, monkeypatch, flat):
+        engine = engines.get_engine()
+        calls = []
+
+        def list_fields_of(mapping):
+            calls.append(mapping)
+            return engine.list_fields_of(mapping)
+
+        monkeypatch.setitem(
+            engines._engines,
+            engine.name,
+            dataclasses.replace(engine, list_fields_of=list_fields_of),
+        )
+
+        async def handler(ids: api.QueryParam[List[int]]):
+            pass
+
+        api.get("/test", handler, flat_validation=flat, validation_cache_size=8)
+
+        assert len(calls) == 1
+
+
+class TestHeaderAndCookie:
+    @pytest.mark.parametrize("flat", (False, True))
+    async def test_header_and_cookie(self, client_for, flat):
+        async def handler(
+            x_request_id: api.HeaderParam[int],
+            session: api.CookieParam[str],
+            accept_language: api.HeaderParam[str] = api.HeaderParam("en"),
+        ):
+            return web.json_response(
+                {
+                    "x_request_id": x_request_id.cleaned,
+                    "session": session.cleaned,
+                    "accept_language": accept_language.cleaned,
+                }
+            )
+
+        client = await client_for(
+            routes=[api.get("/test", handler, flat_validation=flat)]
+        )
+
+        resp = await client.get(
+            "/test", headers={"x-request-id": "42"}, cookies={"session": "abc"}
+        )
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {
+            "x_request_id": 42,
+            "session": "abc",
+            "accept_language": "en",
+        }
+
+        resp = await client.get("/test", headers={"X-Request-Id": "random"})
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == [
+            {
+                "loc": ["header", "x_request_id"],
+                "msg": "value is not a valid integer",
+                "type": "type_error.integer",
+            },
+            {
+                "loc": ["cookie", "session"],
+                "msg": "field required",
+                "type": "value_error.missing",
+            },
+        ]
+
+    async def test_validation_cache(self, client_for):
+        async def handler(x_user_id: api.HeaderParam[int]):
+            return web.json_response({"x_user_id": x_user_id.cleaned})
+
+        route = api.get("/test", handler, validation_cache_size=8)
+        client = await client_for(routes=[route])
+
+        for user_id in (1, 2, 1):
+            resp = await client.get("/test", headers={"X-User-Id": str(user_id)})
+            assert await resp.json() == {"x_user_id": user_id}
+
+        cache = route.handler.validation_cache
+        assert (cache.hits, cache.misses) == (1, 2)
+
+
+class TestResponse:
+    async def test_model(self, client_for):
+        class User(BaseModel):
+            user_id: UUID
+            name: str
+
+        async def handler(pp: api.PathParam[UUID]) -> User:
+            return User(user_id=pp.cleaned, name="Walter")
+
+        client = await client_for(routes=[api.get("/test/{pp}", handler)])
+        resp = await client.get("/test/3e0e6a3e-1e8b-4a3c-9c5a-6b1e2f3d4c5b")
+
+        assert resp.status == HTTPStatus.OK
+        assert resp.content_type == "application/json"
+        assert await resp.json() == {
+            "user_id": "3e0e6a3e-1e8b-4a3c-9c5a-6b1e2f3d4c5b",
+            "name": "Walter",
+        }
+
+    async def test_models(self, client_for):
+        class User(BaseModel):
+            name: str
+
+        class View(web.View):
+            async def get(self) -> List[User]:
+                return [User(name="Walter"), User(name="Jesse")]
+
+        client = await client_for(routes=[api.view("/test/list", View)])
+        resp = await client.get("/test/list")
+
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == [{"name": "Walter"}, {"name": "Jesse"}]
+
+    async def test_response_passthrough(self, client_for):
+        class User(BaseModel):
+            name: str
+
+        async def handler() -> Union[User, web.Response]:
+            return web.json_response({"super": "simple"}, status=HTTPStatus.CREATED)
+
+        client = await client_for(routes=[api.get("/test/simple", handler)])
+        resp = await client.get("/test/simple")
+
+        assert resp.status == HTTPStatus.CREATED
+        assert await resp.json() == {"super": "simple"}
+
+
+class TestBodyStream:
+    @pytest.mark.parametrize(
+        "req, content_type, resp_status, resp_body",
+        (
+            (
+                b'[{"name": "Walter"}, {"name": "Jesse", "age": 25}]',
+                "application/json",
+                HTTPStatus.OK,
+                {
+                    "users": [
+                        {"name": "Walter", "age": 42},
+                        {"name": "Jesse", "age": 25},
+                    ]
+                },
+            ),
+            (
+                b'{"name": "Walter"}\n{"name": "Jesse", "age": 25}\n',
+                "application/x-ndjson",
+                HTTPStatus.OK,
+                {
+                    "users": [
+                        {"name": "Walter", "age": 42},
+                        {"name": "Jesse", "age": 25},
+                    ]
+                },
+            ),
+            (
+                b'[{"name": "Walter"}, {"age": 25}]',
+                "application/json",
+                HTTPStatus.BAD_REQUEST,
+                {
+                    "type": "validation_error",
+                    "title": "Your request parameters didn't validate.",
+                    "invalid_params": [
+                        {
+                            "loc": ["body", 1, "name"],
+                            "msg": "field required",
+                            "type": "value_error.missing",
+                        }
+                    ],
+                },
+            ),
+            (
+                b'[{"name": "Walter"}, {"name": ]',
+                "application/json",
+                HTTPStatus.BAD_REQUEST,
+                {
+                    "type": "validation_error",
+                    "title": "Your request parameters didn't validate.",
+                    "invalid_params": [
+                        {
+                            "loc": ["body", 1],
+                            "msg": "Invalid JSON",
+                            "type": "value_error.json",
+                        }
+                    ],
+                },
+            ),
+        ),
+    )
+    async def test_body_stream(
+        self, client_for, req, content_type, resp_status, resp_body
+    ):
+        class User(BaseModel):
+            name: str
+            age: int = 42
+
+        async def handler(body: api.Body[AsyncIterator[User]]):
+            return web.json_response(
+                {"users": [user.dict() async for user in body.cleaned]}
+            )
+
+        client = await client_for(routes=[api.post("/test/body", handler)])
+        resp = await client.post(
+            "/test/body", data=req, headers={"Content-Type": content_type}
+        )
+
+        assert resp.status == resp_status
+        assert await resp.json() == resp_body
+
+
+class TestBodyLimit:
+    async def test_content_length(self, client_for):
+        async def handler(body: api.Body[Annotated[dict, api.BodyLimit(max_size=8)]]):
+            return web.json_response(body.cleaned)
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post("/test", json={"a": 1})
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"a": 1}
+
+        resp = await client.post("/test", json={"a": 1, "b": 2})
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    async def test_chunked(self, client_for):
+        async def handler(body: api.Body[dict]):
+            return web.json_response(body.cleaned)
+
+        async def chunks(*items):
+            for item in items:
+                yield item
+
+        client = await client_for(routes=[api.post("/test", handler, body_max_size=8)])
+
+        resp = await client.post("/test", data=chunks(b'{"a":', b" 1}"))
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"a": 1}
+
+        resp = await client.post("/test", data=chunks(b'{"a": 1', b', "b": 2}'))
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    async def test_route_overrides_annotation(self, client_for):
+        async def handler(body: api.Body[Annotated[dict, api.BodyLimit(max_size=1)]]):
+            return web.json_response(body.cleaned)
+
+        client = await client_for(
+            routes=[api.post("/test", handler, body_max_size=1024)]
+        )
+
+        resp = await client.post("/test", json={"a": 1})
+        assert resp.status == HTTPStatus.OK
+
+    async def test_body_stream(self, client_for):
+        class User(BaseModel):
+            name: str
+
+        async def handler(body: api.Body[AsyncIterator[User]]):
+            return web.json_response([user.name async for user in body.cleaned])
+
+        client = await client_for(routes=[api.post("/test", handler, body_max_size=32)])
+
+        resp = await client.post("/test", data=b'[{"name": "Walter"}]')
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == ["Walter"]
+
+        resp = await client.post("/test", data=b'[{"name": "Walter"}, {"name": "J"}]')
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    async def test_malformed(self, client_for):
+        called = False
+
+        async def handler(body: api.Body[dict]):
+            nonlocal called
+            called = True
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post(
+            "/test", data=b'{"a": ', headers={"Content-Type": "application/json"}
+        )
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert await resp.json() == {
+            "type": "validation_error",
+            "title": "Your request parameters didn't validate.",
+            "invalid_params": [
+                {"loc": ["body"], "msg": "Invalid JSON", "type": "value_error.json"}
+            ],
+        }
+        assert not called
+
+
+class TestForm:
+    async def test_urlencoded(self, client_for):
+        async def handler(form: api.Form[Upload]):
+            return web.json_response(
+                {"title": form.cleaned.title, "tags": form.cleaned.tags}
+            )
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post(
+            "/test", data=[("title", "Hello"), ("tags", "a"), ("tags", "b")]
+        )
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"title": "Hello", "tags": ["a", "b"]}
+
+    async def test_multipart(self, client_for):
+        files = []
+
+        async def handler(form: api.Form[Upload]):
+            file = form.cleaned.file
+            assert file is not None
+            files.append(file)
+            return web.json_response(
+                {
+                    "title": form.cleaned.title,
+                    "filename": file.filename,
+                    "content_type": file.content_type,
+                    "size": file.size,
+                    "content": file.read().decode(),
+                }
+            )
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        data = FormData()
+        data.add_field("title", "Hello")
+        data.add_field(
+            "file", b"file content", filename="a.txt", content_type="text/plain"
+        )
+        resp = await client.post("/test", data=data)
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {
+            "title": "Hello",
+            "filename": "a.txt",
+            "content_type": "text/plain",
+            "size": 12,
+            "content": "file content",
+        }
+        assert files[0].file.closed
+
+    async def test_multipart_stream(self, client_for):
+        files = []
+
+        async def handler(form: api.Form[Upload]) -> AsyncIterator[str]:
+            file = form.cleaned.file
+            assert file is not None
+            files.append(file)
+            for line in file.read().decode().split():
+                yield line
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        data = FormData()
+        data.add_field("title", "Hello")
+        data.add_field("file", b"file content", filename="a.txt")
+        resp = await client.post("/test", data=data)
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == ["file", "content"]
+        assert files[0].file.closed
+
+    @pytest.mark.parametrize(
+        "fields, invalid_params",
+        (
+            (
+                (),
+                [
+                    {
+                        "loc": ["body", "title"],
+                        "msg": "field required",
+                        "type": "value_error.missing",
+                    }
+                ],
+            ),
+            (
+                (("title", "Hello"), ("file", "not a file")),
+                [
+                    {
+                        "loc": ["body", "file"],
+                        "msg": "file expected",
+                        "type": "type_error",
+                    }
+                ],
+            ),
+        ),
+    )
+    async def test_validation(self, client_for, fields, invalid_params):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post("/test", data=[("unknown", "value"), *fields])
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == invalid_params
+
+    async def test_malformed(self, client_for):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post(
+            "/test",
+            data=b"garbage",
+            headers={"Content-Type": "multipart/form-data; boundary=xxx"},
+        )
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == [
+            {"loc": ["body"], "msg": "Invalid form", "type": "value_error.form"}
+        ]
+
+    async def test_unsupported_media_type(self, client_for):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        resp = await client.post("/test", json={"title": "Hello"})
+        assert resp.status == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    async def test_limit(self, client_for):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(
+            routes=[api.post("/test", handler, body_max_size=1024)]
+        )
+
+        data = FormData()
+        data.add_field("title", "Hello")
+        data.add_field("file", b"x" * 2048, filename="a.txt")
+        resp = await client.post("/test", data=data)
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    @pytest.fixture
+    def spooled(self, monkeypatch):
+        files = []
+        spool = forms.tempfile.SpooledTemporaryFile
+
+        def spool_tracked(*args, **kwargs):
+            files.append(spool(*args, **kwargs))
+            return files[-1]
+
+        monkeypatch.setattr(forms.tempfile, "SpooledTemporaryFile", spool_tracked)
+        return files
+
+    async def test_validation_closes_files(self, client_for, spooled):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(routes=[api.post("/test", handler)])
+
+        data = FormData()
+        data.add_field("file", b"file content", filename="a.txt")
+        resp = await client.post("/test", data=data)
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert len(spooled) == 1
+        assert spooled[0].closed
+
+    async def test_limit_closes_files(self, client_for, spooled):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(
+            routes=[api.post("/test", handler, body_max_size=1024)]
+        )
+
+        async def gen_body():
+            # Chunked, so the limit is checked while parts are read.
+            yield b"".join(
+                (
+                    b"--xxx\r\n",
+                    b'Content-Disposition: form-data; name="file"; filename="a.txt"',
+                    b"\r\n\r\nfile content\r\n--xxx\r\n",
+                    b'Content-Disposition: form-data; name="title"\r\n\r\n',
+                    b"x" * 2048,
+                    b"\r\n--xxx--\r\n",
+                )
+            )
+
+        resp = await client.post(
+            "/test",
+            data=gen_body(),
+            headers={"Content-Type": "multipart/form-data; boundary=xxx"},
+        )
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        assert len(spooled) == 1
+        assert spooled[0].closed
+
+    async def test_limit_urlencoded(self, client_for):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        client = await client_for(
+            routes=[api.post("/test", handler, body_max_size=1024)]
+        )
+
+        async def gen_body():
+            yield b"title=" + b"x" * 2048
+
+        resp = await client.post(
+            "/test",
+            data=gen_body(),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        assert resp.status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+class TestResponseStream:
+    @pytest.mark.parametrize(
+        "accept, content_type, resp_body",
+        (
+            (None, "application/json", b'[{"name":"0"},{"name":"1"},{"name":"2"}]'),
+            (
+                "application/x-ndjson",
+                "application/x-ndjson",
+                b'{"name":"0"}\n{"name":"1"}\n{"name":"2"}\n',
+            ),
+        ),
+    )
+    async def test_async_gen(self, client_for, accept, content_type, resp_body):
+        class User(BaseModel):
+            name: str
+
+        async def handler(count: api.QueryParam[int]) -> AsyncIterator[User]:
+            for i in range(count.cleaned):
+                yield User(name=str(i))
+
+        client = await client_for(routes=[api.get("/test/stream", handler)])
+        resp = await client.get(
+            "/test/stream",
+            params={"count": 3},
+            headers={"Accept": accept} if accept else {},
+        )
+
+        assert resp.status == HTTPStatus.OK
+        assert resp.content_type == content_type
+        assert (await resp.read()).replace(b" ", b"") == resp_body
+
+    @pytest.mark.parametrize("count", (0, 1, 10_000))
+    async def test_async_iterator(self, client_for, count):
+        class User(BaseModel):
+            name: str
+
+        async def users():
+            for i in range(count):
+                yield User(name=str(i))
+
+        class View(web.View):
+            async def get(self) -> AsyncIterator[User]:
+                return users()
+
+        client = await client_for(routes=[api.view("/test/stream", View)])
+        resp = await client.get("/test/stream")
+
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == [{"name": str(i)} for i in range(count)]
+
+
+class TestValidationCache:
+    async def test_validation_cache(self, client_for):
+        async def handler(
+            request: web.Request, pp: api.PathParam[int], qp: api.QueryParam[int]
+        ):
+            return web.json_response(
+                {"pp": pp.cleaned, "qp": qp.cleaned, "request": id(request)}
+            )
+
+        route = api.get("/test/{pp}", handler, validation_cache_size=1)
+        cache = route.handler.validation_cache
+        client = await client_for(routes=[route])
+
+        for params in ({"qp": 1}, {"qp": 1, "unknown": 1}, {"qp": 2}, {"qp": 1}):
+            resp = await client.get("/test/42", params=params)
+
+            assert resp.status == HTTPStatus.OK
+            result = await resp.json()
+            assert result["pp"] == 42
+            assert result["qp"] == params["qp"]
+
+        assert (cache.hits, cache.misses) == (1, 3)
+
+    async def test_validation_cache_errors(self, client_for):
+        async def handler(pp: api.PathParam[int]):
+            return web.json_response({"pp": pp.cleaned})
+
+        route = api.get("/test/{pp}", handler, validation_cache_size=8)
+        client = await client_for(routes=[route])
+
+        for _ in range(2):
+            resp = await client.get("/test/string")
+            assert resp.status == HTTPStatus.BAD_REQUEST
+
+        assert len(route.handler.validation_cache) == 0
+
+    async def test_validation_cache_copies(self, client_for):
+        async def handler(ids: api.QueryParam[List[int]]):
+            ids.cleaned.append(0)
+            return web.json_response({"ids": ids.cleaned})
+
+        route = api.get("/test", handler, validation_cache_size=8)
+        client = await client_for(routes=[route])
+
+        for _ in range(3):
+            resp = await client.get("/test", params=[("ids", 1), ("ids", 2)])
+            assert await resp.json() == {"ids": [1, 2, 0]}
+
+        assert route.handler.validation_cache.hits == 2
+
+    async def test_validation_cache_body(self):
+        async def handler(body: api.Body[int], pp: api.PathParam[int]):
+            pass
+
+        route = api.post("/test/{pp}", handler, validation_cache_size=8)
+
+        assert route.handler.validation_cache is None
+
+
+class TestMetrics:
+    async def test_metrics(self, client_for):
+        class User(BaseModel):
+            name: str
+
+        async def handler(body: api.Body[User], pp: api.PathParam[int]) -> User:
+            return body.cleaned
+
+        records = []
+        route = api.put(
+            "/test/{pp}",
+            handler,
+            metrics_sink=lambda name, timings: records.append((name, timings)),
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.put("/test/42", json={"name": "Walter"})
+        assert resp.status == HTTPStatus.OK
+        body = await resp.read()
+
+        [(name, timings)] = records
+        assert name == route.handler.handler_meta.name
+        assert timings.read_body >= 0
+        assert timings.validate >= 0
+        assert timings.build_kwargs >= 0
+        assert timings.handler >= 0
+        assert timings.request_size == len(b'{"name": "Walter"}')
+        assert timings.response_size == len(body)
+
+    async def test_metrics_without_params(self, client_for):
+        async def handler():
+            return web.Response(text="ok")
+
+        records = []
+        route = api.get("/", handler, metrics_sink=lambda *args: records.append(args))
+        client = await client_for(routes=[route])
+
+        resp = await client.get("/")
+        assert resp.status == HTTPStatus.OK
+
+        [(_, timings)] = records
+        assert (timings.read_body, timings.validate, timings.build_kwargs) == (0, 0, 0)
+        assert timings.request_size is None
+        assert timings.response_size == 2
+
+    async def test_metrics_validation_error(self, client_for):
+        async def handler(pp: api.PathParam[int]):
+            pass
+
+        records = []
+        route = api.get(
+            "/test/{pp}", handler, metrics_sink=lambda *args: records.append(args)
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.get("/test/string")
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert records == []
+
+
+class TestOffload:
+    @pytest.fixture
+    def executor(self):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            yield executor
+
+    async def test_offload(self, client_for, executor):
+        async def handler(body: api.Body[OffloadedUser]) -> OffloadedUser:
+            return body.cleaned
+
+        route = api.post(
+            "/test", handler, offload_executor=executor, offload_min_size=0
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.post("/test", json={"name": "Walter", "age": "50"})
+        assert resp.status == HTTPStatus.OK
+        assert await resp.json() == {"name": "Walter", "age": 50}
+
+    async def test_offload_small_body(self, client_for, monkeypatch, executor):
+        async def handler(body: api.Body[OffloadedUser]) -> OffloadedUser:
+            return body.cleaned
+
+        submitted = []
+        submit = executor.submit
+        monkeypatch.setattr(
+            executor, "submit", lambda *args: submitted.append(args) or submit(*args)
+        )
+        route = api.post("/test", handler, offload_executor=executor)
+        client = await client_for(routes=[route])
+
+        resp = await client.post("/test", json={"name": "Walter", "age": 50})
+        assert resp.status == HTTPStatus.OK
+        assert submitted == []
+
+    async def test_offload_validation_error(self, client_for, executor):
+        async def handler(body: api.Body[OffloadedUser]):
+            pass
+
+        route = api.post(
+            "/test", handler, offload_executor=executor, offload_min_size=0
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.post("/test", json={"name": "Walter"})
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert await resp.json() == {
+            "type": "validation_error",
+            "title": "Your request parameters didn't validate.",
+            "invalid_params": [
+                {
+                    "loc": ["body", "age"],
+                    "msg": "field required",
+                    "type": "value_error.missing",
+                }
+            ],
+        }
+
+    async def test_offload_malformed(self, client_for, executor):
+        async def handler(body: api.Body[OffloadedUser]):
+            pass
+
+        route = api.post(
+            "/test", handler, offload_executor=executor, offload_min_size=0
+        )
+        client = await client_for(routes=[route])
+
+        resp = await client.post(
+            "/test", data=b'{"a": ', headers={"Content-Type": "application/json"}
+        )
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert (await resp.json())["invalid_params"] == [
+            {"loc": ["body"], "msg": "Invalid JSON", "type": "value_error.json"}
+        ]
+
+    async def test_offload_process_pool(self, client_for):
+        async def handler(body: api.Body[List[OffloadedUser]]) -> List[OffloadedUser]:
+            return body.cleaned
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            route = api.post(
+                "/test", handler, offload_executor=executor, offload_min_size=0
+            )
+            client = await client_for(routes=[route])
+
+            resp = await client.post("/test", json=[{"name": "Walter", "age": 50}])
+            assert resp.status == HTTPStatus.OK
+            assert await resp.json() == [{"name": "Walter", "age": 50}]
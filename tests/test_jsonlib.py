@@ -0,0 +1,80 @@
+from http import HTTPStatus
+from typing import Dict
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi import jsonlib
+
+
+@pytest.fixture
+def default_backend():
+    name = jsonlib.get_backend().name
+    yield
+    jsonlib.set_default_backend(name)
+
+
+def test_get_backend_unknown():
+    with pytest.raises(jsonlib.JSONBackendUnknownError) as exc_info:
+        jsonlib.get_backend("unknown")
+    assert exc_info.value.name == "unknown"
+
+
+def test_set_default_backend_unknown(default_backend):
+    with pytest.raises(jsonlib.JSONBackendUnknownError):
+        jsonlib.set_default_backend("unknown")
+
+
+def test_register_backend(default_backend):
+    backend = jsonlib.JSONBackend(
+        name="custom", loads=lambda raw: {"custom": True}, dumps=lambda obj: b"{}"
+    )
+    jsonlib.register_backend(backend)
+    jsonlib.set_default_backend("custom")
+
+    assert jsonlib.get_backend() is backend
+    assert jsonlib.get_backend("json").loads(b'{"json": true}') == {"json": True}
+    assert jsonlib.get_backend("json").dumps({"json": True}) == b'{"json": true}'
+
+
+async def test_route_backend(client_for):
+    class User(BaseModel):
+        name: str
+
+    async def handler(body: api.Body[User]):
+        return web.json_response(body.cleaned.dict())
+
+    jsonlib.register_backend(
+        jsonlib.JSONBackend(
+            name="uppercase",
+            loads=lambda raw: {"name": raw.decode().upper()},
+            dumps=lambda obj: b"{}",
+        )
+    )
+    client = await client_for(
+        routes=[api.post("/test/body", handler, json_backend="uppercase")]
+    )
+    resp = await client.post("/test/body", data=b"walter")
+
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == {"name": "WALTER"}
+
+
+@pytest.mark.parametrize("backend", ("json", "ujson", "msgspec", "orjson"))
+async def test_response_non_str_keys(client_for, backend):
+    if backend != "json":
+        pytest.importorskip(backend)
+
+    class Names(BaseModel):
+        names: Dict[int, str]
+
+    async def handler() -> Names:
+        return Names(names={1: "walter", 2: "jesse"})
+
+    client = await client_for(routes=[api.get("/test", handler, json_backend=backend)])
+    resp = await client.get("/test")
+
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == {"names": {"1": "walter", "2": "jesse"}}
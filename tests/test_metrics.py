@@ -0,0 +1,75 @@
+from aiohttp import web
+
+from aioapi.metrics import HistogramSink, PhaseTimings, metrics_handler
+
+
+def timings(seconds, *, request_size=None, response_size=None):
+    return PhaseTimings(
+        read_body=seconds,
+        validate=seconds,
+        build_kwargs=seconds,
+        handler=seconds,
+        request_size=request_size,
+        response_size=response_size,
+    )
+
+
+def test_histogram_sink():
+    sink = HistogramSink(seconds_buckets=(0.1, 1.0), size_buckets=(10,))
+    sink("handler", timings(0.1, request_size=5))
+    sink("handler", timings(0.5, request_size=20))
+    sink("handler", timings(2.0))
+
+    histogram = sink.phase("handler", "validate")
+    assert histogram.counts == [1, 1, 1]
+    assert histogram.cumulative_counts() == [1, 2, 3]
+    assert histogram.count == 3
+    assert histogram.sum == 2.6
+
+    assert sink.size("handler", "request").counts == [1, 1]
+    assert sink.size("handler", "response") is None
+    assert sink.phase("unknown", "validate") is None
+
+
+def test_render_prometheus():
+    sink = HistogramSink(seconds_buckets=(1.0,), size_buckets=(10,))
+    assert sink.render_prometheus() == ""
+
+    sink('a"b', timings(0.5, response_size=5))
+
+    rendered = sink.render_prometheus()
+    assert "# TYPE aioapi_phase_seconds histogram" in rendered
+    assert (
+        'aioapi_phase_seconds_bucket{handler="a\\"b",phase="handler",le="1.0"} 1'
+    ) in rendered
+    assert (
+        'aioapi_phase_seconds_bucket{handler="a\\"b",phase="handler",le="+Inf"} 1'
+    ) in rendered
+    assert 'aioapi_phase_seconds_sum{handler="a\\"b",phase="validate"} 0.5' in rendered
+    assert (
+        'aioapi_payload_bytes_count{handler="a\\"b",direction="response"} 1'
+    ) in rendered
+    assert rendered.endswith("\n")
+
+
+def test_clear():
+    sink = HistogramSink()
+    sink("handler", timings(0.5))
+    sink.clear()
+
+    assert sink.phase("handler", "handler") is None
+
+
+async def test_metrics_handler(aiohttp_client):
+    sink = HistogramSink()
+    sink("handler", timings(0.5))
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler(sink))
+    client = await aiohttp_client(app)
+
+    resp = await client.get("/metrics")
+    assert resp.status == 200
+    assert resp.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert "X-Prometheus-Format" not in resp.headers
+    assert await resp.text() == sink.render_prometheus()
@@ -0,0 +1,242 @@
+from http import HTTPStatus
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi.inspect.exceptions import HandlerResponseCacheError
+from aioapi.middlewares import (
+    create_validation_error_middleware,
+    response_cache_middleware,
+    validation_error_middleware,
+)
+
+
+@pytest.fixture
+def cached_client_for(aiohttp_client):
+    async def _cached_client_for(*, routes, **kwargs):
+        middleware = response_cache_middleware(**kwargs)
+
+        app = web.Application()
+        app.add_routes(routes)
+        app.middlewares.extend((validation_error_middleware, middleware))
+
+        return await aiohttp_client(app), middleware.cache
+
+    return _cached_client_for
+
+
+class Upload(BaseModel):
+    file: api.File
+
+
+class User(BaseModel):
+    user_id: int
+
+
+class TestValidationError:
+    async def test_response(self, aiohttp_client):
+        async def handler(a: api.QueryParam[int], b: api.QueryParam[int]):
+            pass
+
+        seen = []
+
+        @web.middleware
+        async def outer(request, handler):
+            resp = await handler(request)
+            seen.append(resp.status)
+            return resp
+
+        app = web.Application()
+        app.add_routes([api.get("/", handler)])
+        app.middlewares.extend((outer, validation_error_middleware))
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/")
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        assert resp.content_type == "application/json"
+        assert await resp.json() == {
+            "type": "validation_error",
+            "title": "Your request parameters didn't validate.",
+            "invalid_params": [
+                {
+                    "loc": ["query", name],
+                    "msg": "field required",
+                    "type": "value_error.missing",
+                }
+                for name in ("a", "b")
+            ],
+        }
+        # Errors are returned as responses, not raised.
+        assert seen == [HTTPStatus.BAD_REQUEST]
+
+    async def test_max_errors(self, aiohttp_client):
+        async def handler(a: api.QueryParam[int], b: api.QueryParam[int]):
+            pass
+
+        app = web.Application()
+        app.add_routes([api.get("/", handler)])
+        app.middlewares.append(
+            create_validation_error_middleware(max_errors=1, json_backend="json")
+        )
+        client = await aiohttp_client(app)
+
+        resp = await client.get("/")
+        assert resp.status == HTTPStatus.BAD_REQUEST
+        result = await resp.json()
+        assert [e["loc"] for e in result["invalid_params"]] == [["query", "a"]]
+
+
+class TestResponseCache:
+    async def test_cache(self, cached_client_for):
+        calls = []
+
+        async def handler(user_id: api.PathParam[int]) -> User:
+            calls.append(user_id.cleaned)
+            return User(user_id=user_id.cleaned)
+
+        client, cache = await cached_client_for(
+            routes=[api.get("/users/{user_id}", handler, response_cache_ttl=60)]
+        )
+
+        etags = set()
+        for path in ("/users/1", "/users/01", "/users/1", "/users/2"):
+            resp = await client.get(path)
+
+            assert resp.status == HTTPStatus.OK
+            assert await resp.json() == {"user_id": int(path.rsplit("/", 1)[1])}
+            etags.add(resp.headers["ETag"])
+
+        assert calls == [1, 2]
+        assert len(etags) == 2
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    async def test_if_none_match(self, cached_client_for):
+        calls = []
+
+        async def handler() -> User:
+            calls.append(1)
+            return User(user_id=1)
+
+        client, _ = await cached_client_for(
+            routes=[api.get("/users/me", handler, response_cache_ttl=60)]
+        )
+
+        resp = await client.get("/users/me")
+        etag = resp.headers["ETag"]
+
+        resp = await client.get("/users/me", headers={"If-None-Match": f"W/{etag}"})
+        assert resp.status == HTTPStatus.NOT_MODIFIED
+        assert resp.headers["ETag"] == etag
+
+        resp = await client.get("/users/me", headers={"If-None-Match": '"unknown"'})
+        assert resp.status == HTTPStatus.OK
+
+        assert len(calls) == 1
+
+    async def test_headers(self, cached_client_for):
+        async def handler(request: web.Request):
+            return web.json_response({"lang": request.headers.get("Accept-Language")})
+
+        async def params_handler(
+            x_tenant: api.HeaderParam[str],
+            session: api.CookieParam[str],
+            accept_language: api.HeaderParam[str] = api.HeaderParam("en"),
+        ):
+            return web.json_response({"tenant": x_tenant.cleaned})
+
+        client, _ = await cached_client_for(
+            routes=[
+                api.get(
+                    "/lang",
+                    handler,
+                    response_cache_ttl=60,
+                    response_cache_headers=("Accept-Language",),
+                ),
+                api.get(
+                    "/params",
+                    params_handler,
+                    response_cache_ttl=60,
+                    response_cache_headers=("Accept-Language",),
+                ),
+            ]
+        )
+
+        for lang in ("en", "de", "en"):
+            resp = await client.get("/lang", headers={"Accept-Language": lang})
+            assert await resp.json() == {"lang": lang}
+            assert resp.headers["Vary"] == "Accept-Language"
+
+        resp = await client.get(
+            "/lang",
+            headers={"Accept-Language": "en", "If-None-Match": resp.headers["ETag"]},
+        )
+        assert resp.status == HTTPStatus.NOT_MODIFIED
+        assert resp.headers["Vary"] == "Accept-Language"
+
+        for _ in range(2):
+            resp = await client.get(
+                "/params", headers={"X-Tenant": "acme", "Cookie": "session=abc"}
+            )
+            assert await resp.json() == {"tenant": "acme"}
+            assert resp.headers["Vary"] == "Accept-Language, x-tenant, Cookie"
+
+    async def test_uncacheable_handler(self):
+        async def get_user(request: web.Request):
+            return request.headers.get("X-User")
+
+        async def handler(user=api.Depends(get_user)):
+            pass
+
+        with pytest.raises(HandlerResponseCacheError) as exc_info:
+            api.get("/test", handler, response_cache_ttl=60)
+        assert exc_info.value.param == "user"
+
+        # Responses depend only on declared headers.
+        api.get(
+            "/test",
+            handler,
+            response_cache_ttl=60,
+            response_cache_headers=("X-User",),
+        )
+
+    async def test_uncacheable_form(self):
+        async def handler(form: api.Form[Upload]):
+            pass
+
+        with pytest.raises(HandlerResponseCacheError) as exc_info:
+            api.post("/test", handler, response_cache_ttl=60)
+        assert exc_info.value.param == "form"
+
+    @pytest.mark.parametrize(
+        "resp",
+        (
+            web.json_response({}, status=HTTPStatus.CREATED),
+            web.json_response({}, headers={"Cache-Control": "no-store"}),
+            web.StreamResponse(),
+        ),
+    )
+    async def test_not_cacheable(self, cached_client_for, resp):
+        async def handler():
+            return resp
+
+        client, cache = await cached_client_for(
+            routes=[api.get("/test", handler, response_cache_ttl=60)]
+        )
+        await client.get("/test")
+
+        assert len(cache) == 0
+
+    async def test_maxbytes(self, cached_client_for):
+        async def handler(size: api.PathParam[int]):
+            return web.Response(body=b"x" * size.cleaned)
+
+        client, cache = await cached_client_for(
+            routes=[api.get("/test/{size}", handler, response_cache_ttl=60)],
+            maxbytes=10,
+        )
+        for size in (4, 5, 6):
+            await client.get(f"/test/{size}")
+
+        assert cache.nbytes == 6
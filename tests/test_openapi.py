@@ -0,0 +1,249 @@
+from http import HTTPStatus
+from typing import AsyncIterator, List
+
+import pytest
+from aiohttp import web
+from pydantic import BaseModel
+
+import aioapi as api
+from aioapi import openapi
+from aioapi.openapi import OPENAPI_VERSION, build_openapi, setup_openapi
+
+
+class User(BaseModel):
+    name: str
+    age: int = 42
+
+
+class Upload(BaseModel):
+    file: api.File
+    title: str
+
+
+async def get_user(
+    user_id: api.PathParam[int],
+    x_request_id: api.HeaderParam[str],
+    tags: api.QueryParam[List[str]] = api.QueryParam([]),
+) -> User:
+    return User(name="Walter")
+
+
+async def create_users(body: api.Body[List[User]]) -> List[User]:
+    return body.cleaned
+
+
+async def upload(form: api.Form[Upload]):
+    pass
+
+
+async def import_users(body: api.Body[AsyncIterator[User]]) -> AsyncIterator[User]:
+    yield User(name="Walter")
+
+
+async def plain(request):
+    pass
+
+
+def create_view():
+    class UserView(web.View):
+        async def get(self, limit: api.QueryParam[int]) -> List[User]:
+            return []
+
+        async def delete(self):
+            pass
+
+    return UserView
+
+
+def create_app():
+    app = web.Application()
+    app.add_routes(
+        [
+            api.get("/users/{user_id}", get_user),
+            api.post("/users", create_users, lazy=True),
+            api.post("/upload", upload),
+            api.post("/import", import_users),
+            api.view("/view", create_view()),
+            web.get("/plain", plain),
+        ]
+    )
+    return app
+
+
+def test_build_openapi():
+    document = build_openapi(
+        create_app(), title="Users", version="1.0.0", description="Users API"
+    )
+
+    assert document["openapi"] == OPENAPI_VERSION
+    assert document["info"] == {
+        "title": "Users",
+        "version": "1.0.0",
+        "description": "Users API",
+    }
+    assert {path: sorted(ops) for path, ops in document["paths"].items()} == {
+        "/users/{user_id}": ["get"],
+        "/users": ["post"],
+        "/upload": ["post"],
+        "/import": ["post"],
+        "/view": ["delete", "get"],
+    }
+    assert sorted(document["components"]["schemas"]) == [
+        "Upload",
+        "User",
+        "ValidationError",
+    ]
+
+
+def test_build_openapi_parameters():
+    document = build_openapi(create_app(), title="Users", version="1.0.0")
+
+    operation = document["paths"]["/users/{user_id}"]["get"]
+    assert operation["operationId"] == "test_openapi.get_user"
+    assert operation["parameters"] == [
+        {
+            "name": "user_id",
+            "in": "path",
+            "required": True,
+            "schema": {"title": "User Id", "type": "integer"},
+        },
+        {
+            "name": "tags",
+            "in": "query",
+            "required": False,
+            "schema": {
+                "title": "Tags",
+                "default": [],
+                "type": "array",
+                "items": {"type": "string"},
+            },
+        },
+        {
+            "name": "x-request-id",
+            "in": "header",
+            "required": True,
+            "schema": {"title": "X Request Id", "type": "string"},
+        },
+    ]
+    assert operation["responses"]["200"]["content"] == {
+        "application/json": {"schema": {"$ref": "#/components/schemas/User"}}
+    }
+    assert operation["responses"]["400"]["content"] == {
+        "application/json": {"schema": {"$ref": "#/components/schemas/ValidationError"}}
+    }
+
+
+def test_build_openapi_bodies():
+    document = build_openapi(create_app(), title="Users", version="1.0.0")
+    paths = document["paths"]
+    ref = {"$ref": "#/components/schemas/User"}
+
+    body = paths["/users"]["post"]["requestBody"]
+    assert body["required"]
+    assert body["content"]["application/json"]["schema"]["items"] == ref
+
+    body = paths["/upload"]["post"]["requestBody"]
+    assert list(body["content"]) == ["multipart/form-data"]
+    assert document["components"]["schemas"]["Upload"]["properties"]["file"] == {
+        "title": "File",
+        "type": "string",
+        "format": "binary",
+    }
+
+    body = paths["/import"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"] == {
+        "type": "array",
+        "items": ref,
+    }
+    assert body["content"]["application/x-ndjson"]["schema"] == ref
+    content = paths["/import"]["post"]["responses"]["200"]["content"]
+    assert content["application/x-ndjson"]["schema"] == ref
+
+
+def test_build_openapi_view():
+    document = build_openapi(create_app(), title="Users", version="1.0.0")
+    view = document["paths"]["/view"]
+
+    assert view["get"]["operationId"] == "test_openapi.UserView.get"
+    assert [p["name"] for p in view["get"]["parameters"]] == ["limit"]
+    assert view["delete"]["responses"] == {
+        "200": {"description": "Successful response"}
+    }
+
+
+def test_build_openapi_unique_operation_ids():
+    app = web.Application()
+    app.add_routes(
+        [api.get("/a/{user_id}", get_user), api.get("/b/{user_id}", get_user)]
+    )
+
+    document = build_openapi(app, title="Users", version="1.0.0")
+
+    assert document["paths"]["/a/{user_id}"]["get"]["operationId"] == (
+        "test_openapi.get_user"
+    )
+    assert document["paths"]["/b/{user_id}"]["get"]["operationId"] == (
+        "test_openapi.get_user_2"
+    )
+
+
+@pytest.fixture
+async def client(aiohttp_client, monkeypatch):
+    builds = []
+    build = openapi.build_openapi
+
+    def build_counted(*args, **kwargs):
+        builds.append(args)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(openapi, "build_openapi", build_counted)
+
+    app = create_app()
+    setup_openapi(app, title="Users", version="1.0.0")
+    client = await aiohttp_client(app)
+    client.builds = builds
+    return client
+
+
+async def test_setup_openapi(client):
+    resp = await client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert resp.status == HTTPStatus.OK
+    assert resp.content_type == "application/json"
+    assert "Content-Encoding" not in resp.headers
+    document = await resp.json()
+    assert document["info"] == {"title": "Users", "version": "1.0.0"}
+
+    resp = await client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert await resp.json() == document
+    assert len(client.builds) == 1
+
+
+async def test_setup_openapi_gzip(client):
+    resp = await client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    document = await resp.json()
+    assert document["openapi"] == OPENAPI_VERSION
+
+    resp = await client.get("/openapi.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in resp.headers
+
+
+async def test_setup_openapi_etag(client):
+    resp = await client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    etag = resp.headers["ETag"]
+
+    resp = await client.get(
+        "/openapi.json", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers["ETag"] == etag
+
+    # Representations are different, so are their tags.
+    resp = await client.get(
+        "/openapi.json",
+        headers={"Accept-Encoding": "identity", "If-None-Match": etag},
+    )
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers["ETag"] != etag
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from aioapi.streams import JSONArraySplitter, iter_json_array, iter_ndjson
+
+ITEMS = [{"a": 'x"\\],{[', "b": [1, 2, {"c": None}]}, 1, 'q"', [], {}, True, 3.5]
+
+
+async def _chunked(raw, size):
+    for i in range(0, len(raw), size):
+        yield raw[i : i + size]
+
+
+class TestJSONArraySplitter:
+    @pytest.mark.parametrize("size", (1, 2, 3, 7, 1024))
+    def test_feed(self, size):
+        raw = json.dumps(ITEMS).encode()
+        splitter = JSONArraySplitter()
+
+        items = []
+        for i in range(0, len(raw), size):
+            items.extend(splitter.feed(raw[i : i + size]))
+        splitter.close()
+
+        assert [json.loads(item) for item in items] == ITEMS
+
+    @pytest.mark.parametrize("raw", (b"[]", b" [ ] \n"))
+    def test_empty(self, raw):
+        splitter = JSONArraySplitter()
+
+        assert splitter.feed(raw) == []
+        splitter.close()
+
+    @pytest.mark.parametrize(
+        "raw",
+        (b'{"a": 1}', b"x[1]", b"[1,]", b"[,1]", b"[}]", b"[1] x", b"[1, 2"),
+    )
+    def test_invalid(self, raw):
+        splitter = JSONArraySplitter()
+
+        with pytest.raises(ValueError):
+            splitter.feed(raw)
+            splitter.close()
+
+
+async def test_iter_json_array():
+    raw = json.dumps(ITEMS).encode()
+
+    assert [item async for item in iter_json_array(_chunked(raw, 5), json.loads)] == (
+        ITEMS
+    )
+
+
+async def test_iter_ndjson():
+    raw = "\n".join(json.dumps(item) for item in ITEMS).encode() + b"\n\n"
+
+    assert [item async for item in iter_ndjson(_chunked(raw, 5), json.loads)] == ITEMS
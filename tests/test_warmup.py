@@ -0,0 +1,88 @@
+import gc
+from http import HTTPStatus
+
+from aiohttp import web
+
+import aioapi as api
+from aioapi.warmup import WARMUP_TIMINGS_KEY, prefork, setup_warmup, warmup_handlers
+
+
+async def handler(pp: api.PathParam[int]):
+    return web.json_response({"pp": pp.cleaned})
+
+
+def create_view():
+    class View(web.View):
+        async def get(self, qp: api.QueryParam[int]):
+            return web.json_response({"qp": qp.cleaned})
+
+    return View
+
+
+def test_lazy():
+    route = api.get("/test/{pp}", handler, lazy=True)
+
+    assert not hasattr(route.handler, "handler_meta")
+    assert route.handler.warmup() is route.handler.warmup()
+    assert route.handler.warmup().handler_meta.name == "test_warmup.handler"
+
+
+async def test_lazy_dispatch(client_for):
+    client = await client_for(
+        routes=[
+            api.get("/test/{pp}", handler, lazy=True),
+            api.view("/test", create_view(), lazy=True),
+        ]
+    )
+
+    resp = await client.get("/test/42")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.json() == {"pp": 42}
+
+    resp = await client.get("/test", params={"qp": "string"})
+    assert resp.status == HTTPStatus.BAD_REQUEST
+
+
+def test_warmup_handlers():
+    app = web.Application()
+    app.add_routes(
+        [api.get("/test/{pp}", handler), api.view("/test", create_view(), lazy=True)]
+    )
+
+    timings = warmup_handlers(app)
+
+    assert set(timings) == {
+        "test_warmup.handler",
+        "test_warmup.View.get",
+    }
+    assert all(t > 0 for t in timings.values())
+
+
+async def test_setup_warmup(aiohttp_client):
+    app = web.Application()
+    app.add_routes([api.get("/test/{pp}", handler, lazy=True)])
+    setup_warmup(app)
+
+    await aiohttp_client(app)
+
+    assert set(app[WARMUP_TIMINGS_KEY]) == {"test_warmup.handler"}
+
+
+def test_prefork():
+    app = web.Application()
+    app.add_routes([api.get("/test/{pp}", handler, lazy=True)])
+
+    try:
+        timings = prefork(app)
+
+        assert set(timings) == {"test_warmup.handler"}
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_inspect_once():
+    routes = [api.get(f"/test/{i}/{{pp}}", handler) for i in range(2)]
+
+    assert routes[0].handler is not routes[1].handler
+    assert routes[0].handler.handler_meta is routes[1].handler.handler_meta